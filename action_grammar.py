@@ -0,0 +1,134 @@
+# action_grammar.py
+# Characters a valid action call can contain (names are [A-Za-z0-9_]); tokens with any
+# other character can never be allowed, so they are left out of the token trie.
+ACTION_ALPHABET = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_'(), \n")
+
+# Automaton phases (state = (phase, calls_done, a, b))
+_START, _FN, _QUOTE, _NAME, _AFTER_ARG, _SEP, _DONE = range(7)
+
+class _Trie:
+    """Minimal character trie over a set of strings; nodes are integer ids, root is 0."""
+    def __init__(self, words=()):
+        self.children = [{}]
+        self.terminal = {} # node -> value stored at the end of a word
+        for value, word in enumerate(words):
+            self.add(word, value)
+
+    def add(self, word, value):
+        node = 0
+        for ch in word:
+            nxt = self.children[node].get(ch)
+            if nxt is None:
+                nxt = len(self.children)
+                self.children.append({})
+                self.children[node][ch] = nxt
+            node = nxt
+        self.terminal[node] = value
+        return node
+
+class ActionGrammar:
+    """Character-level automaton accepting action calls built from the action list.
+
+    Accepts e.g. toggle_object('electric_switch_wseglt_0') where the function comes from
+    OmniGibsonEnv.action_list and every argument is one of object_names. Up to max_calls
+    calls, separated by newlines, are accepted (1 for the single-action prompt).
+    """
+    def __init__(self, action_list, object_names, max_calls=1):
+        self.function_names = [signature.split('(')[0].strip() for signature in action_list]
+        self.num_args = [self._count_args(signature) for signature in action_list]
+        self.object_names = sorted({name for name in object_names if name and set(name) <= ACTION_ALPHABET and "'" not in name})
+        self.max_calls = max_calls
+        self._fn_trie = _Trie(self.function_names)
+        self._name_trie = _Trie(self.object_names)
+
+    @staticmethod
+    def _count_args(signature):
+        params = signature.split('(', 1)[1].rsplit(')', 1)[0].strip() if '(' in signature else ""
+        return len([p for p in params.split(',') if p.strip()]) if params else 0
+
+    def signature(self):
+        """Hashable description of the accepted language (e.g. for cache keys)."""
+        return (tuple(self.function_names), tuple(self.num_args), tuple(self.object_names), self.max_calls)
+
+    @property
+    def start_state(self):
+        return (_START, 0, 0, 0)
+
+    def advance(self, state, ch):
+        """Returns the state after consuming ch, or None if ch is not allowed."""
+        phase, calls, a, b = state
+        if phase == _START:
+            if calls == 0 and b < 2 and ch in " \n": return (_START, 0, 0, b + 1) # Some leading whitespace before the first call
+            nxt = self._fn_trie.children[0].get(ch)
+            return (_FN, calls, nxt, 0) if nxt is not None else None
+        if phase == _FN:
+            nxt = self._fn_trie.children[a].get(ch)
+            if nxt is not None: return (_FN, calls, nxt, 0)
+            fn = self._fn_trie.terminal.get(a)
+            if fn is not None and ch == '(':
+                return (_QUOTE, calls, fn, 0) if self.num_args[fn] > 0 else (_AFTER_ARG, calls, fn, -1)
+            return None
+        if phase == _QUOTE: # a = function index, b = argument index
+            return (_NAME, calls, (a, b), 0) if ch == "'" else None
+        if phase == _NAME: # a = (function index, argument index), b = name trie node
+            nxt = self._name_trie.children[b].get(ch)
+            if nxt is not None: return (_NAME, calls, a, nxt)
+            if ch == "'" and b in self._name_trie.terminal: return (_AFTER_ARG, calls, a[0], a[1])
+            return None
+        if phase == _AFTER_ARG:
+            if b + 1 < self.num_args[a]:
+                return (_SEP, calls, a, b + 1) if ch == ',' else None
+            return (_DONE, calls + 1, 0, 0) if ch == ')' else None
+        if phase == _SEP:
+            if ch == ' ': return (_QUOTE, calls, a, b)
+            return (_NAME, calls, (a, b), 0) if ch == "'" else None
+        if phase == _DONE:
+            return (_START, calls, 0, 0) if ch == '\n' and calls < self.max_calls else None
+        return None
+
+    def is_accepting(self, state):
+        return state is not None and state[0] == _DONE
+
+    def is_complete(self, state):
+        """True if the output is a full program that cannot be extended further."""
+        return self.is_accepting(state) and state[1] >= self.max_calls
+
+    def accepts(self, text):
+        state = self.start_state
+        for ch in text:
+            state = self.advance(state, ch)
+            if state is None: return False
+        return self.is_accepting(state)
+
+class TokenTrie:
+    """Character trie over the tokenizer vocabulary, restricted to ACTION_ALPHABET.
+
+    Built once per tokenizer (it is independent of the object names in a grammar).
+    """
+    def __init__(self, tokenizer):
+        self.eos_token_id = tokenizer.eos_token_id
+        self.children = [{}]
+        self.token_ids = {} # node -> [token ids whose text ends at this node]
+        special_ids = set(tokenizer.all_special_ids)
+        for token_id, text in enumerate(self._token_texts(tokenizer)):
+            if token_id in special_ids or not text or not set(text) <= ACTION_ALPHABET: continue
+            node = 0
+            for ch in text:
+                nxt = self.children[node].get(ch)
+                if nxt is None:
+                    nxt = len(self.children)
+                    self.children.append({})
+                    self.children[node][ch] = nxt
+                node = nxt
+            self.token_ids.setdefault(node, []).append(token_id)
+
+    @staticmethod
+    def _token_texts(tokenizer):
+        """Surface text of every token id, including the leading space of SentencePiece pieces."""
+        pieces = tokenizer.convert_ids_to_tokens(list(range(len(tokenizer))))
+        texts = []
+        for token_id, piece in enumerate(pieces):
+            text = tokenizer.decode([token_id], clean_up_tokenization_spaces=False)
+            if piece and piece.startswith('▁') and not text.startswith(' '): text = ' ' + text
+            texts.append(text)
+        return texts
@@ -0,0 +1,182 @@
+# action_primitives.py
+import math
+import time
+import numpy as np
+
+import config
+
+def _yaw(quaternion):
+    """Yaw (rad) of an (x, y, z, w) quaternion."""
+    x, y, z, w = quaternion
+    return math.atan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+
+def _is_true(grasp_state):
+    """OmniGibson's is_grasping returns IsGraspingState (TRUE=1, FALSE=0, UNKNOWN=-1); older versions a bool."""
+    return getattr(grasp_state, 'value', grasp_state) == 1
+
+def _wrap(angle):
+    return (angle + math.pi) % (2.0 * math.pi) - math.pi
+
+class PrimitiveResult:
+    """Outcome of one primitive: success, message, simulated ticks and wall time used."""
+    __slots__ = ("success", "message", "ticks", "wall_time_s")
+    def __init__(self, success, message, ticks=0, wall_time_s=0.0):
+        self.success = success
+        self.message = message
+        self.ticks = ticks
+        self.wall_time_s = wall_time_s
+
+class ActionPrimitives:
+    """Multi-tick navigate / pick / place built on env.step.
+
+    Each primitive fills one preallocated action vector per tick (base velocity, gripper)
+    and steps the simulator in a tight loop until its target is reached or its tick budget
+    runs out, so actions cost simulated time rather than wall-clock sleeps. Robots without
+    a base controller are placed next to the target instead and the scene is left to settle.
+    step_fn(action) advances one tick (default env.step; the interface passes a physics-only
+    step when rendering is deferred).
+    """
+    def __init__(self, env, robot, action_dim, step_fn=None):
+        self.env = env
+        self._step = step_fn or env.step
+        self.robot = robot
+        self.action_dim = action_dim
+        self._action = np.zeros(action_dim) # Reused every tick
+        idx = getattr(robot, 'controller_action_idx', None) or {}
+        self._base_idx = np.asarray(idx['base']) if 'base' in idx else None
+        self._gripper_idx = [np.asarray(v) for k, v in idx.items() if k.startswith('gripper')]
+        self.held_object = None
+
+    def _tick(self):
+        self._step(self._action)
+
+    def _robot_pose(self):
+        pos, orn = self.robot.get_position_orientation()
+        return np.asarray(pos, dtype=float), _yaw(orn)
+
+    def _set_gripper(self, command):
+        for gripper_idx in self._gripper_idx: self._action[gripper_idx] = command
+
+    def _settle(self, max_ticks, obj=None, tolerance=1e-3):
+        """Zero-action ticks until obj (if given) stops moving or max_ticks. Returns ticks used."""
+        self._action[:] = 0.0
+        last = None
+        for tick in range(max_ticks):
+            self._tick()
+            if obj is None: continue
+            pos = np.asarray(obj.get_position_orientation()[0], dtype=float)
+            if last is not None and np.linalg.norm(pos - last) < tolerance: return tick + 1
+            last = pos
+        return max_ticks
+
+    def _drive_to(self, target_pos, stop_distance, max_ticks):
+        """Differential-drive steering toward target_pos. Returns (reached, ticks)."""
+        self._action[:] = 0.0
+        for tick in range(max_ticks):
+            pos, yaw = self._robot_pose()
+            delta = target_pos[:2] - pos[:2]
+            distance = float(np.hypot(delta[0], delta[1]))
+            if distance <= stop_distance: return True, tick
+            heading_error = _wrap(math.atan2(delta[1], delta[0]) - yaw)
+            angular = float(np.clip(config.PRIMITIVE_NAV_TURN_GAIN * heading_error, -1.0, 1.0))
+            # Proportional approach with a small floor so the stop distance is actually crossed
+            linear = float(np.clip(config.PRIMITIVE_NAV_DRIVE_GAIN * (distance - stop_distance), 0.1, 1.0)) if abs(heading_error) < 0.5 else 0.0
+            self._action[self._base_idx[0]] = linear
+            self._action[self._base_idx[1]] = angular
+            self._tick()
+        pos, _ = self._robot_pose()
+        return float(np.linalg.norm(target_pos[:2] - pos[:2])) <= stop_distance, max_ticks
+
+    def _place_robot_near(self, target_pos, stop_distance):
+        """Fallback without a base controller: stand stop_distance from the target, facing it."""
+        pos, _ = self._robot_pose()
+        delta = target_pos[:2] - pos[:2]
+        distance = float(np.hypot(delta[0], delta[1]))
+        if distance <= stop_distance: return
+        new_pos = pos.copy()
+        new_pos[:2] = target_pos[:2] - delta / distance * stop_distance
+        yaw = math.atan2(delta[1], delta[0])
+        self.robot.set_position_orientation(new_pos, np.array([0.0, 0.0, math.sin(yaw / 2.0), math.cos(yaw / 2.0)]))
+
+    def _run(self, fn, *args):
+        start_time = time.time()
+        result = fn(*args)
+        result.wall_time_s = time.time() - start_time
+        return result
+
+    def navigate_to(self, obj, stop_distance=config.PRIMITIVE_NAV_STOP_DISTANCE):
+        return self._run(self._navigate_to, obj, stop_distance)
+
+    def _navigate_to(self, obj, stop_distance):
+        target_pos = np.asarray(obj.get_position_orientation()[0], dtype=float)
+        if self._base_idx is not None and len(self._base_idx) >= 2:
+            reached, ticks = self._drive_to(target_pos, stop_distance, config.PRIMITIVE_NAV_MAX_TICKS)
+        else:
+            self._place_robot_near(target_pos, stop_distance)
+            ticks = self._settle(config.PRIMITIVE_SETTLE_TICKS, obj=self.robot)
+            pos, _ = self._robot_pose()
+            reached = float(np.linalg.norm(target_pos[:2] - pos[:2])) <= stop_distance + 1e-6
+        if not reached:
+            return PrimitiveResult(False, f"Could not reach {obj.name} within {ticks} ticks.", ticks)
+        return PrimitiveResult(True, f"Navigated to {obj.name}.", ticks)
+
+    def _approach(self, obj):
+        """Navigates within reach of obj if needed. Returns (result or None, ticks used)."""
+        pos, _ = self._robot_pose()
+        target_pos = np.asarray(obj.get_position_orientation()[0], dtype=float)
+        if float(np.linalg.norm(target_pos[:2] - pos[:2])) <= config.PRIMITIVE_REACH_DISTANCE:
+            return None, 0
+        result = self._navigate_to(obj, config.PRIMITIVE_NAV_STOP_DISTANCE)
+        return (None if result.success else result), result.ticks
+
+    def pick_up(self, obj):
+        return self._run(self._pick_up, obj)
+
+    def _pick_up(self, obj):
+        if self.held_object is not None:
+            return PrimitiveResult(False, f"Already holding {self.held_object.name}.")
+        if getattr(obj, 'fixed_base', False):
+            # Teleporting it would also leave the spatial index (which never refreshes fixed objects) stale
+            return PrimitiveResult(False, f"Cannot pick up {obj.name}: it is fixed in place.")
+        failed, ticks = self._approach(obj)
+        if failed is not None: return failed
+        # Bring the object to the end effector (assisted grasp), then close the gripper over a few ticks
+        if hasattr(self.robot, 'get_eef_position') and hasattr(obj, 'set_position'):
+            obj.set_position(np.asarray(self.robot.get_eef_position(), dtype=float))
+        self._action[:] = 0.0
+        self._set_gripper(-1.0)
+        can_check = hasattr(self.robot, 'is_grasping') # Without it the assisted grasp is trusted
+        grasped = not can_check
+        for _ in range(config.PRIMITIVE_GRASP_TICKS):
+            self._tick()
+            ticks += 1
+            if can_check and _is_true(self.robot.is_grasping(candidate_obj=obj)):
+                grasped = True
+                break
+        if not grasped:
+            self._set_gripper(1.0) # Open again; the object drops where it is
+            self._tick()
+            ticks += 1 + self._settle(config.PRIMITIVE_SETTLE_TICKS, obj=obj)
+            return PrimitiveResult(False, f"Could not grasp {obj.name} within {config.PRIMITIVE_GRASP_TICKS} ticks.", ticks)
+        self.held_object = obj
+        return PrimitiveResult(True, f"Picked up {obj.name}.", ticks)
+
+    def place_on(self, obj_name, surface):
+        return self._run(self._place_on, obj_name, surface)
+
+    def _place_on(self, obj_name, surface):
+        held = self.held_object
+        if held is None or (obj_name and held.name != obj_name):
+            return PrimitiveResult(False, f"Not holding '{obj_name}'.")
+        failed, ticks = self._approach(surface)
+        if failed is not None: return failed
+        surface_pos = np.asarray(surface.get_position_orientation()[0], dtype=float)
+        top = surface.aabb[1][2] if hasattr(surface, 'aabb') else surface_pos[2]
+        if hasattr(held, 'set_position'):
+            held.set_position(np.array([surface_pos[0], surface_pos[1], top + config.PRIMITIVE_PLACE_HEIGHT]))
+        self._action[:] = 0.0
+        self._set_gripper(1.0) # Open
+        self._tick()
+        self.held_object = None
+        ticks += 1 + self._settle(config.PRIMITIVE_SETTLE_TICKS, obj=held)
+        return PrimitiveResult(True, f"Placed {held.name} on {surface.name}.", ticks)
@@ -0,0 +1,77 @@
+# action_program.py
+import ast
+
+class ProgramError(ValueError):
+    """The LLM output is not a valid action program; the message is fed back to the LLM."""
+
+def action_specs(action_list):
+    """{function_name: [parameter names]} from OmniGibsonEnv.action_list signatures."""
+    specs = {}
+    for signature in action_list:
+        name, _, params = signature.partition('(')
+        params = params.rsplit(')', 1)[0]
+        specs[name.strip()] = [p.split(':')[0].strip() for p in params.split(',') if p.strip()]
+    return specs
+
+def _strip_fences(code):
+    lines = [line for line in code.strip().splitlines() if not line.strip().startswith("```")]
+    return "\n".join(lines).strip()
+
+def _leading_call(line):
+    """The line up to the parenthesis closing its first call ("f('a'). Done." -> "f('a')"); the whole line if unbalanced."""
+    depth, quote, escaped = 0, None, False
+    for i, char in enumerate(line):
+        if quote:
+            if escaped: escaped = False
+            elif char == "\\": escaped = True
+            elif char == quote: quote = None
+        elif char in "'\"": quote = char
+        elif char == "(": depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0: return line[:i + 1]
+    return line
+
+def _string_arg(node, function_name):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str): return node.value
+    raise ProgramError(f"Arguments of {function_name} must be string literals.")
+
+def parse_program(code, specs, max_calls=1):
+    """Parses LLM output into [(function_name, [args])] without evaluating it.
+
+    Only bare calls to whitelisted functions with string-literal arguments are allowed;
+    anything else (imports, assignments, attributes, expressions) raises ProgramError.
+    With max_calls=1 only the leading call of the first non-empty line is considered, so
+    trailing chatter after a single call (a comment, ". Done.", further lines) is ignored.
+    """
+    code = _strip_fences(code)
+    if max_calls == 1: code = _leading_call(code.split("\n", 1)[0].strip())
+    if not code: raise ProgramError("Empty program.")
+    try:
+        tree = ast.parse(code, mode="exec")
+    except SyntaxError as e:
+        raise ProgramError(f"Syntax error on line {e.lineno}: {e.msg}.")
+    if len(tree.body) > max_calls:
+        raise ProgramError(f"Program has {len(tree.body)} statements; at most {max_calls} allowed.")
+    calls = []
+    for stmt in tree.body:
+        call = stmt.value if isinstance(stmt, ast.Expr) else None
+        if not isinstance(call, ast.Call) or not isinstance(call.func, ast.Name):
+            raise ProgramError(f"Line {stmt.lineno} is not a plain action call.")
+        function_name = call.func.id
+        params = specs.get(function_name)
+        if params is None:
+            raise ProgramError(f"Unknown action '{function_name}'.")
+        args = [_string_arg(arg, function_name) for arg in call.args]
+        for keyword in call.keywords:
+            if keyword.arg not in params[len(args):]:
+                raise ProgramError(f"Unexpected argument '{keyword.arg}' for {function_name}.")
+        keyword_values = {keyword.arg: _string_arg(keyword.value, function_name) for keyword in call.keywords}
+        args += [keyword_values[p] for p in params[len(args):] if p in keyword_values]
+        if len(args) != len(params):
+            raise ProgramError(f"{function_name} takes {len(params)} argument(s), got {len(args)}.")
+        calls.append((function_name, args))
+    return calls
+
+def format_call(function_name, args):
+    return f"{function_name}({', '.join(repr(a) for a in args)})"
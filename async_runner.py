@@ -0,0 +1,112 @@
+# async_runner.py
+# asyncio agent loop that keeps the LLM and the simulator busy at the same time:
+# physics advances (idle steps) while a prompt decodes, and with several envs one
+# episode's simulation overlaps another episode's generation.
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from run_voyager_omnigibson import Episode
+from tracing import tracer
+
+class AsyncEpisodeRunner:
+    """Runs episodes as coroutines over a shared LLM and one or more envs.
+
+    LLM calls go to an executor with llm_concurrency threads (1 for an in-process model;
+    more when llm is an LLMClient so the server can batch). Each env gets its own
+    single-thread executor, so its simulator is only ever driven from one thread. The
+    episode bookkeeping (result dict, skill replay and storing, event log) is
+    run_voyager_omnigibson.Episode, shared with the sequential loop.
+    """
+    def __init__(self, llm, envs, idle_steps=config.ASYNC_IDLE_SIM_STEPS,
+                 llm_concurrency=config.ASYNC_LLM_CONCURRENCY, max_steps=config.MAX_STEPS_PER_TASK, skills=None):
+        self.llm = llm
+        self.envs = list(envs)
+        self.idle_steps = idle_steps
+        self.max_steps = max_steps
+        self.skills = skills # Optional SkillLibrary (thread-safe), shared by all envs
+        self._llm_executor = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="llm")
+        self._sim_executors = [ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sim-{i}") for i in range(len(self.envs))]
+        self.total_steps = 0
+        self.total_idle_steps = 0
+
+    @staticmethod
+    def _idle_physics(env, max_idle_steps, decision_ready):
+        """Advances physics with zero action until the decision arrives (at most max_idle_steps)."""
+        steps = 0
+        while steps < max_idle_steps and not decision_ready.is_set():
+            if env.interface.step_simulation() is None: break
+            steps += 1
+        return steps
+
+    @staticmethod
+    def _call(executor, fn, *args):
+        """fn(*args) in executor, in a copy of the current context (so its events go to this episode's log)."""
+        return asyncio.get_running_loop().run_in_executor(executor, functools.partial(contextvars.copy_context().run, fn, *args))
+
+    async def run_episode(self, env_idx, task_name, prompt_template):
+        """Async counterpart of run_voyager_omnigibson.run_episode; returns the same result dict plus idle_sim_steps."""
+        env, sim = self.envs[env_idx], self._sim_executors[env_idx]
+        episode = Episode(env, task_name, prompt_template, self.max_steps, self.skills)
+        episode.result["idle_sim_steps"] = 0
+        with episode.logged():
+            if await self._call(sim, episode.setup):
+                for step in episode.llm_steps():
+                    prompt = episode.prompt(step)
+                    generate = functools.partial(self.llm.generate, prompt, **episode.generate_kwargs())
+                    llm_start = tracer.now() if tracer.enabled else 0
+                    llm_future = self._call(self._llm_executor, generate)
+
+                    # Keep the simulator busy while the LLM decodes
+                    decision_ready = threading.Event()
+                    llm_future.add_done_callback(lambda _: decision_ready.set())
+                    idle_future = self._call(sim, self._idle_physics, env, self.idle_steps, decision_ready)
+                    action_code, idle_steps = await asyncio.gather(llm_future, idle_future)
+                    if tracer.enabled: tracer.record("llm_generate", llm_start, args={"env": env_idx, "idle_sim_steps": idle_steps})
+                    episode.result["idle_sim_steps"] += idle_steps
+                    self.total_idle_steps += idle_steps
+
+                    if episode.llm_failed(action_code): break
+                    self.total_steps += 1
+                    if episode.record_step(step, *await self._call(sim, env.step, action_code)): break
+            episode.finish(phase_timing=len(self.envs) == 1) # Spans of concurrent episodes interleave
+        return episode.result
+
+    async def _env_worker(self, env_idx, jobs, prompt_template, results):
+        while True:
+            try:
+                task_name = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results.append(await self.run_episode(env_idx, task_name, prompt_template))
+
+    async def run_async(self, task_names, prompt_template):
+        jobs = asyncio.Queue()
+        for task_name in task_names: jobs.put_nowait(task_name)
+        results = []
+        await asyncio.gather(*(self._env_worker(i, jobs, prompt_template, results) for i in range(len(self.envs))))
+        return results
+
+    def run(self, task_names, prompt_template):
+        """Runs every task (one episode each) across the envs and returns the result dicts."""
+        return asyncio.run(self.run_async(task_names, prompt_template))
+
+    def close(self):
+        self._llm_executor.shutdown(wait=True)
+        for sim in self._sim_executors: sim.shutdown(wait=True)
+
+if __name__ == "__main__":
+    from run_voyager_omnigibson import load_prompt_template, init_components, open_skill_library
+
+    llm, env = init_components()
+    skills = open_skill_library()
+    runner = AsyncEpisodeRunner(llm, [env], skills=skills)
+    try:
+        print(runner.run([config.DEFAULT_TASK], load_prompt_template()))
+    finally:
+        runner.close()
+        env.close()
+        if skills is not None: skills.close()
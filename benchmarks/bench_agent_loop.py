@@ -0,0 +1,143 @@
+# benchmarks/bench_agent_loop.py
+# Offline benchmark of the full run_agent loop: the real OmniGibsonInterface/OmniGibsonEnv
+# over the fake simulator in fake_omnigibson.py, driven by a stub LLM with configurable
+# prefill latency and decode token rate. Reports throughput and per-phase cost (tracing.py).
+# Run: python benchmarks/bench_agent_loop.py [--objects 300 --step-ms 10 --llm-prefill-ms 50 --tokens-per-s 40]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import fake_omnigibson
+import config
+from tracing import tracer, summarize, print_summary
+
+class StubLLM:
+    """generate()-compatible LLM that replays a fixed action script with simulated latency.
+
+    Each call costs prefill_s plus (response tokens / tokens_per_s), where a response is
+    counted as one token per chars_per_token characters.
+    """
+    def __init__(self, actions, prefill_s=0.05, tokens_per_s=40.0, chars_per_token=4):
+        self.actions = list(actions)
+        self.prefill_s = prefill_s
+        self.tokens_per_s = tokens_per_s
+        self.chars_per_token = chars_per_token
+        self.num_calls = 0
+        self.last_num_generated_tokens = 0
+
+    def generate(self, prompt, max_new_tokens=config.LLM_MAX_NEW_TOKENS, prefix=None, grammar=None):
+        response = self.actions[self.num_calls % len(self.actions)]
+        self.num_calls += 1
+        num_tokens = min(max_new_tokens, max(1, len(response) // self.chars_per_token))
+        self.last_num_generated_tokens = num_tokens
+        start = tracer.now()
+        time.sleep(self.prefill_s)
+        first = tracer.now()
+        time.sleep(num_tokens / self.tokens_per_s)
+        if tracer.enabled:
+            tracer.record("prefill", start, first)
+            tracer.record("decode", first)
+        return response
+
+def task_objects(task):
+    """Goal objects of a task config with their goal states set to the opposite of the target."""
+    objects = {}
+    def visit(node):
+        if isinstance(node, list):
+            for child in node: visit(child)
+        elif isinstance(node, dict):
+            for key in ("all", "and", "any", "or", "not"):
+                if key in node: visit(node[key])
+            if node.get('object_name') and node.get('type'):
+                target = node.get('target_value', True)
+                objects.setdefault(node['object_name'], {})[node['type']] = (not target) if isinstance(target, bool) else 0
+    visit(task.get('goal_conditions', []))
+    return objects
+
+def stub_name(name, style):
+    """name as a sloppy LLM might write it ('electric_switch_wseglt_0' -> 'electric_switch_wseglt' / 'electric_switch' / 'electric_swtch_wseglt_0')."""
+    if style == "stem": return name.rsplit('_', 1)[0]
+    if style == "category": return name.rsplit('_', 2)[0]
+    if style == "typo": return name[:5] + name[6:]
+    return name
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--task", default=config.DEFAULT_TASK)
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--objects", type=int, default=300, help="Filler objects in the fake scene.")
+    parser.add_argument("--step-ms", type=float, default=10.0, help="Fake physics step latency.")
+    parser.add_argument("--render-ms", type=float, default=0.0, help="Fake render latency per vision modality.")
+    parser.add_argument("--modalities", default="rgb", help="Comma-separated robot obs_modalities (config.SENSOR_MODALITIES; empty = the fake robot's rgb+proprio).")
+    parser.add_argument("--eager-render", action="store_true", help="Render every step (LAZY_RENDERING off).")
+    parser.add_argument("--reset-ms", type=float, default=500.0, help="Fake env.reset() latency.")
+    parser.add_argument("--state-us", type=float, default=0.0, help="Fake state get_value() latency.")
+    parser.add_argument("--llm-prefill-ms", type=float, default=50.0)
+    parser.add_argument("--tokens-per-s", type=float, default=40.0)
+    parser.add_argument("--program", action="store_true", help="ACTION_PROGRAM_MODE: the stub emits the whole plan in one call.")
+    parser.add_argument("--skills", action="store_true", help="Enable the skill library (fresh store per run).")
+    parser.add_argument("--names", choices=["full", "stem", "category", "typo"], default="full",
+                        help="How the stub writes object names: full, without the instance suffix, category only, or with a typo.")
+    parser.add_argument("--exact-names", action="store_true", help="Disable fuzzy object name resolution (OBJECT_NAME_FUZZY off).")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent loop's own output.")
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_DIR, config.TASK_CONFIG_DIR, f"{args.task}.yaml"), 'r') as f:
+        task = yaml.safe_load(f) or {}
+    goal_objects = task_objects(task)
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=args.objects, task_objects=goal_objects, step_latency_s=args.step_ms / 1e3,
+        reset_latency_s=args.reset_ms / 1e3, state_get_latency_s=args.state_us / 1e6, render_latency_s=args.render_ms / 1e3,
+    ))
+    # Point the config at the repo's tasks/prompts and a minimal env config for the fake
+    config.TASK_CONFIG_DIR = os.path.join(REPO_DIR, config.TASK_CONFIG_DIR)
+    config.PROMPT_DIR = os.path.join(REPO_DIR, config.PROMPT_DIR)
+    config.ENV_CONFIG_PATH = os.path.join(tempfile.mkdtemp(prefix="fake_env_"), "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": task.get('scene_id', config.DEFAULT_SCENE_ID)}, "robots": [{"type": "Fetch"}]}, f)
+    config.SENSOR_MODALITIES = [m for m in args.modalities.split(",") if m] or None
+    config.LAZY_RENDERING = not args.eager_render
+    config.TOKENIZER_PATH = None # Stub LLM: observation token counts are estimated
+    config.TRACE_ENABLED = tracer.enabled = True
+    config.ACTION_PROGRAM_MODE = args.program
+    config.SKILL_LIBRARY = args.skills
+    config.SKILL_LIBRARY_PATH = os.path.join(tempfile.mkdtemp(prefix="skills_"), "skills.sqlite")
+    config.OBJECT_NAME_FUZZY = not args.exact_names
+
+    from run_voyager_omnigibson import run_agent
+    actions = [action for name in map(lambda n: stub_name(n, args.names), goal_objects)
+               for action in (f"navigate_to_object('{name}')", f"toggle_object('{name}')")]
+    if args.program: actions = ["\n".join(actions)]
+    llm = StubLLM(actions, prefill_s=args.llm_prefill_ms / 1e3, tokens_per_s=args.tokens_per_s)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        results = run_agent(llm=llm, task_names=[args.task] * args.episodes)
+    elapsed = time.perf_counter() - start
+
+    steps = sum(r["steps"] for r in results)
+    actions = sum(r.get("actions", 0) for r in results)
+    episode_time = sum(r.get("wall_time_s", 0.0) for r in results)
+    successes = sum(r["success"] for r in results)
+    print(f"Fake scene: {args.objects + len(goal_objects)} objects, step {args.step_ms} ms, reset {args.reset_ms} ms, "
+          f"render {args.render_ms} ms x {len(config.SENSOR_MODALITIES or ['rgb'])} modalities ({'eager' if args.eager_render else 'lazy'}); "
+          f"stub LLM: {args.llm_prefill_ms} ms prefill, {args.tokens_per_s} tokens/s")
+    print(f"{len(results)} episodes ({successes} solved), {steps} steps in {elapsed:.2f} s total "
+          f"({elapsed - episode_time:.2f} s startup/teardown)")
+    print(f"LLM calls: {steps} ({steps / max(successes, 1):.1f} per solved task) for {actions} executed actions "
+          f"(object names: {args.names}, {'exact' if args.exact_names else 'fuzzy'} resolution)")
+    print(f"Throughput: {steps / episode_time:.2f} steps/s, {len(results) / episode_time:.2f} episodes/s "
+          f"({1e3 * episode_time / max(steps, 1):.1f} ms per step incl. reset)")
+    print(f"Fake simulator calls: {fake_omnigibson.CALLS}")
+    print_summary(summarize(tracer.spans()), title="Per-phase cost")
+
+if __name__ == "__main__":
+    main()
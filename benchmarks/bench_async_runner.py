@@ -0,0 +1,113 @@
+# benchmarks/bench_async_runner.py
+# Decision steps per second of the sequential run_episode loop vs AsyncEpisodeRunner,
+# with stub LLM/env backends whose latencies are configurable. Also checks that both loops
+# return the same result schema and that the async loop replays and stores skills.
+# Run: python benchmarks/bench_async_runner.py [--llm-ms 200 --step-ms 80 --episodes 4]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_runner import AsyncEpisodeRunner
+from run_voyager_omnigibson import run_episode, load_prompt_template
+from skill_library import SkillLibrary
+
+SWITCH = "electric_switch_wseglt_0"
+
+class StubLLM:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+
+    def generate(self, prompt, max_new_tokens=50, prefix=None, grammar=None):
+        time.sleep(self.latency_s)
+        return f"toggle_object('{SWITCH}')"
+
+class StubInterface:
+    def __init__(self, step_latency_s):
+        self.step_latency_s = step_latency_s
+
+    def step_simulation(self):
+        time.sleep(self.step_latency_s)
+        return {}
+
+class StubEnv:
+    """Env-level surface used by the agent loops; succeeds after steps_to_success decisions."""
+    def __init__(self, step_latency_s, steps_to_success=5):
+        self.interface = StubInterface(step_latency_s)
+        self.steps_to_success = steps_to_success
+        self._steps = 0
+
+    def reset(self, task_name):
+        self._steps = 0
+        return "Robot is holding: Nothing."
+
+    def get_task_goal_description(self):
+        return "Turn on the switch."
+
+    def get_action_grammar(self):
+        return None
+
+    def get_goal_conditions(self):
+        return [{"type": "ToggledOn", "object_name": SWITCH}]
+
+    def get_scene_id(self):
+        return "Stub_int"
+
+    def step(self, action_code):
+        self.interface.step_simulation() # Action execution + one physics step
+        self._steps += 1
+        done = self._steps >= self.steps_to_success
+        info = {'action_success': True, 'parsed_function': "toggle_object", 'parsed_args': [SWITCH], 'num_executed': 1}
+        return "Robot is holding: Nothing.", 1.0 if done else 0.0, done, info
+
+def check_shared_episode(template):
+    """The async loop returns the sequential loop's result keys (plus idle_sim_steps) and uses the skill library."""
+    sequential = run_episode(StubEnv(0.001), StubLLM(0.001), "stub_task", template)
+    runner = AsyncEpisodeRunner(StubLLM(0.001), [StubEnv(0.001)], idle_steps=0, skills=SkillLibrary(None))
+    first, second = runner.run(["stub_task", "stub_task"], template)
+    runner.close()
+    problems = []
+    if set(first) != set(sequential) | {"idle_sim_steps"}: problems.append(f"async result keys {sorted(first)} vs sequential {sorted(sequential)}")
+    if not (second.get("skill_replayed") and second["success"] and second["steps"] == 0 and second["actions"] == first["actions"]):
+        problems.append(f"second async episode did not replay the stored skill: {second}")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-ms", type=float, default=200.0)
+    parser.add_argument("--step-ms", type=float, default=80.0)
+    parser.add_argument("--idle-steps", type=int, default=2)
+    parser.add_argument("--episodes", type=int, default=4)
+    args = parser.parse_args()
+    llm_s, step_s = args.llm_ms / 1000.0, args.step_ms / 1000.0
+    template = load_prompt_template()
+    tasks = ["stub_task"] * args.episodes
+
+    start = time.perf_counter()
+    env = StubEnv(step_s)
+    steps = sum(run_episode(env, StubLLM(llm_s), task, template)["steps"] for task in tasks)
+    elapsed = time.perf_counter() - start
+    rows = [("sequential run_episode", steps / elapsed, steps / elapsed)]
+
+    for num_envs in (1, 2, 4):
+        runner = AsyncEpisodeRunner(StubLLM(llm_s), [StubEnv(step_s) for _ in range(num_envs)], idle_steps=args.idle_steps)
+        start = time.perf_counter()
+        results = runner.run(tasks, template)
+        elapsed = time.perf_counter() - start
+        runner.close()
+        steps = sum(r["steps"] for r in results)
+        rows.append((f"async, {num_envs} env(s)", steps / elapsed, (steps + runner.total_idle_steps) / elapsed))
+
+    print(f"\nLLM latency {args.llm_ms:.0f} ms, sim step {args.step_ms:.0f} ms, {args.episodes} episodes")
+    print(f"{'loop':<24} {'decisions/s':>12} {'sim steps/s':>12}")
+    for name, decisions_per_s, sim_steps_per_s in rows:
+        print(f"{name:<24} {decisions_per_s:>12.2f} {sim_steps_per_s:>12.2f}")
+
+    problems = check_shared_episode(template)
+    for problem in problems: print(f"FAILED: {problem}")
+    if problems: sys.exit(1)
+    print("Async and sequential loops: same result schema, skill stored and replayed")
+
+if __name__ == "__main__":
+    main()
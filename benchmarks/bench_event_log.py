@@ -0,0 +1,95 @@
+# benchmarks/bench_event_log.py
+# Cost of hot-path logging: a synchronous print of a step's observation and info dict (what
+# the agent loop used to do) vs EventLogger calls that are filtered out by level, and calls
+# that are queued for the writer thread (console + per-episode JSONL). Each is timed on the
+# calling thread (median step) back to back, and with a gap between steps that releases the
+# GIL as the simulator and LLM calls do; the CPU column is the mean process CPU time over all
+# threads (the writer's formatting and I/O included) per step of the gap loop, above an empty
+# loop's. Also shows the
+# drop policy under a burst that overflows a small queue.
+# Run: python benchmarks/bench_event_log.py [--calls 20000 --steps 2000 --gap-ms 1]
+import argparse
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from event_log import EventLogger
+
+OBSERVATION = "Robot is at position (1.00, 2.00).\nRobot is holding: Nothing.\nNearby objects: " + ", ".join(
+    f"object_{i} (toggled=off) [{i * 0.1:.1f}m]" for i in range(40))
+INFO = {'action_code': "toggle_object('lamp_0')", 'parsed_function': "toggle_object", 'parsed_args': ["lamp_0"],
+        'action_success': True, 'action_message': "Toggled lamp_0.", 'action_sim_ticks': 0, 'num_executed': 1}
+
+def per_step_us(fn, steps, gap_s=0.0):
+    """(median us on the calling thread, process CPU us) per step, with an optional sleep between steps."""
+    times, cpu_start = [], time.process_time()
+    for step in range(steps):
+        start = time.perf_counter()
+        fn(step)
+        times.append(time.perf_counter() - start)
+        if gap_s: time.sleep(gap_s)
+    return 1e6 * statistics.median(times), 1e6 * (time.process_time() - cpu_start) / steps
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20000, help="Steps in the back-to-back loop.")
+    parser.add_argument("--steps", type=int, default=2000, help="Steps in the loop with a gap.")
+    parser.add_argument("--gap-ms", type=float, default=1.0, help="Sleep between steps (stands in for simulation and LLM time).")
+    args = parser.parse_args()
+    log_dir = tempfile.mkdtemp(prefix="event_log_")
+    gap_s = args.gap_ms / 1e3
+
+    loggers = []
+    def make_logger(**kwargs):
+        logger = EventLogger(log_dir=log_dir, queue_size=10 * args.calls, **kwargs)
+        logger.begin_episode("bench")
+        loggers.append(logger)
+        return logger
+    def step_logging(logger):
+        return lambda step: (
+            logger.info("step", "--- Step {step} / {max_steps} ---", step=step + 1, max_steps=20),
+            logger.debug("observation", "Current Observation:\n{observation}", observation=OBSERVATION),
+            logger.debug("step_info", "Step Info: {info}", info=INFO))
+    modes = {
+        "print x3 (sync)": lambda: lambda step: (
+            print(f"\n--- Step {step + 1} / 20 ---"), print(f"Current Observation:\n{OBSERVATION}"), print(f"Step Info: {INFO}")),
+        "log.debug x2, level INFO (filtered)": lambda: (lambda quiet: lambda step: (
+            quiet.debug("observation", "Current Observation:\n{observation}", observation=OBSERVATION),
+            quiet.debug("step_info", "Step Info: {info}", info=INFO)))(make_logger(console_level="INFO", file_level="INFO")),
+        "log x3 queued, console + JSONL": lambda: step_logging(make_logger(console_level="DEBUG", file_level="DEBUG")),
+        "log x3 queued, JSONL only": lambda: step_logging(make_logger(console_level=None, file_level="DEBUG")),
+    }
+
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        _, idle_cpu = per_step_us(lambda step: None, args.steps, gap_s)
+        for label, make in modes.items():
+            back_to_back, _ = per_step_us(make(), args.calls)
+            for logger in loggers: logger.flush()
+            caller, cpu = per_step_us(make(), args.steps, gap_s)
+            for logger in loggers: logger.flush()
+            results[label] = (back_to_back, caller, cpu - idle_cpu)
+        for logger in loggers: logger.close()
+
+        burst = EventLogger(console_level=None, file_level="INFO", log_dir=log_dir, queue_size=1000, drop_policy="drop")
+        for step in range(args.calls): burst.info("step", step=step)
+        burst.warn("burst_end") # WARN waits for room instead of being dropped
+        burst.close()
+
+    print(f"Per step, stdout -> /dev/null; gap {args.gap_ms:g} ms")
+    print(f"{'':<38} {'back to back us':>16} {'with gap us':>12} {'CPU us':>8}")
+    for label, (back_to_back, caller, cpu) in results.items(): print(f"{label:<38} {back_to_back:>16.2f} {caller:>12.2f} {cpu:>8.2f}")
+    sync, queued = results["print x3 (sync)"], results["log x3 queued, console + JSONL"]
+    for column, name in ((0, "back to back"), (1, "with a gap")):
+        verdict = "cheaper" if queued[column] < sync[column] else "NOT cheaper"
+        print(f"Caller side {name}: enabled log calls are {verdict} than the prints ({queued[column]:.2f} vs {sync[column]:.2f} us)")
+    print(f"Total CPU: the writer thread still does the formatting and writing, {queued[2]:.2f} vs {sync[2]:.2f} us per step")
+    print(f"Burst of {args.calls} INFO records into a 1000-record queue: {burst.stats['dropped']} dropped, "
+          f"{burst.stats['written']} written (incl. the WARN)")
+
+if __name__ == "__main__":
+    main()
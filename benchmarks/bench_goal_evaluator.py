@@ -0,0 +1,99 @@
+# benchmarks/bench_goal_evaluator.py
+# Per-step goal check cost of the compiled, incremental GoalEvaluator vs a full re-evaluation
+# of the same tree, on the fake backend. Also a regression check: random toggles of the goal
+# objects across consecutive steps (including two conditions of one AND flipping on successive
+# steps), with every incremental result compared against a direct evaluation of the conditions.
+# Run: python benchmarks/bench_goal_evaluator.py [--objects 3000 --steps 300]
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import fake_omnigibson
+import config
+from event_log import log
+
+SWITCHES = ["electric_switch_wseglt_0", "light_switch_qpdbxa_0", "lamp_mnbvcx_0"]
+A, B, C = ({"type": "ToggledOn", "object_name": name} for name in SWITCHES)
+GOALS = {
+    "a_and_b": [A, B],
+    "any_a_not_b": [{"any": [A, {"not": B}]}],
+    "a_and_any_b_c": [{"all": [A, {"any": [B, {"not": C}]}]}, {"or": [C, B]}],
+}
+
+def expected(conditions, objects):
+    """Direct evaluation of goal conditions against the live object states."""
+    results = []
+    for condition in conditions if isinstance(conditions, list) else [conditions]:
+        key = next((k for k in ("all", "and", "any", "or", "not") if k in condition), None)
+        if key in ("all", "and"): results.append(expected(condition[key], objects))
+        elif key in ("any", "or"): results.append(any(expected([c], objects) for c in condition[key]))
+        elif key == "not": results.append(not expected(condition[key], objects))
+        else: results.append(bool(objects[condition["object_name"]].states[fake_omnigibson.object_states.ToggledOn].value))
+    return all(results)
+
+def run(task_dir, task_name, conditions, steps, rng):
+    from omnigibson_interface import OmniGibsonInterface
+    with open(os.path.join(task_dir, f"{task_name}.yaml"), "w") as f:
+        yaml.safe_dump({"task_name": task_name, "scene_id": config.DEFAULT_SCENE_ID, "description": task_name, "goal_conditions": conditions}, f)
+    with contextlib.redirect_stdout(io.StringIO()):
+        interface = OmniGibsonInterface()
+        interface.load_task(task_name)
+        interface.check_success() # Compiles the goal
+        objects = {name: interface.env.scene.object_registry("name", name) for name in SWITCHES}
+        mismatches, incremental_s, full_s = [], 0.0, 0.0
+        for step in range(steps):
+            # Flip one or two goal objects per step; consecutive steps often flip different conditions
+            for name in rng.sample(SWITCHES, rng.choice((1, 1, 2))):
+                state = objects[name].states[fake_omnigibson.object_states.ToggledOn]
+                state.set_value(not state.value)
+            interface.step_simulation()
+            start = time.perf_counter()
+            result = interface.goal_evaluator.evaluate(interface.snapshot)
+            incremental_s += time.perf_counter() - start
+            if result != expected(conditions, objects): mismatches.append(step)
+            start = time.perf_counter()
+            interface.goal_evaluator.root.evaluate(interface.snapshot, None) # Full pass (ignores changed_ids)
+            full_s += time.perf_counter() - start
+        interface.close()
+        log.flush()
+    fake_omnigibson.clear()
+    return 1e6 * incremental_s / steps, 1e6 * full_s / steps, mismatches
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=3000)
+    parser.add_argument("--steps", type=int, default=300)
+    args = parser.parse_args()
+
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=args.objects, task_objects={name: {"ToggledOn": False} for name in SWITCHES},
+        env_init_latency_s=0.0, step_latency_s=0.0, reset_latency_s=0.0,
+    ))
+    task_dir = tempfile.mkdtemp(prefix="goal_tasks_")
+    config.TASK_CONFIG_DIR = task_dir
+    config.ENV_CONFIG_PATH = os.path.join(task_dir, "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": config.DEFAULT_SCENE_ID}, "robots": [{"type": "Fetch"}]}, f)
+    config.SCENE_STATE_RESTORE = False
+
+    print(f"{'goal':<16} {'incremental us':>15} {'full us':>9} {'mismatches':>11}")
+    failed = False
+    for task_name, conditions in GOALS.items():
+        incremental_us, full_us, mismatches = run(task_dir, task_name, conditions, args.steps, random.Random(0))
+        print(f"{task_name:<16} {incremental_us:>15.1f} {full_us:>9.1f} {len(mismatches):>11}")
+        if mismatches:
+            print(f"  incremental result differs from direct evaluation at steps {mismatches[:10]}")
+            failed = True
+    if failed: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
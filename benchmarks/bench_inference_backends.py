@@ -0,0 +1,85 @@
+# benchmarks/bench_inference_backends.py
+# Tokens/s of each LLM_API backend (llm_backends.py) on this machine: prefill (one forward
+# over the prompt), single-prompt decode and batched generation, with a randomly initialized
+# Llama of planner-like shape but small enough for CPU. Also reports how often the int8
+# backend's greedy output matches fp32 (random weights make this a pessimistic estimate).
+# Run: python benchmarks/bench_inference_backends.py [--backends hf cpu_int8 --hidden 1024 --layers 8]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import torch
+import config
+from llm_api import LLM_API
+from tiny_model import build_tiny_model, SAMPLE_OBJECT_NAMES
+
+def make_prompts(prompt_template, count):
+    prompts = []
+    for step in range(count):
+        objects = [f"{name} (toggled={'on' if (i + step) % 2 else 'off'}) [{(i * 0.37 + step) % 4:.1f}m]"
+                   for i, name in enumerate(SAMPLE_OBJECT_NAMES)]
+        observation = f"Robot is at position ({step:.2f}, 0.00).\nRobot is holding: Nothing.\nNearby objects: " + ", ".join(objects)
+        prompts.append(prompt_template.format(task_description="Your goal is to turn on the electric switch.", observation=observation))
+    return prompts
+
+def measure(llm, prompts, max_new_tokens, batch_size):
+    result = {}
+    inputs = [llm._tokenize_prompt(p) for p in prompts]
+    with llm.backend.inference_mode():
+        llm.model(**inputs[0]) # Warm up
+        start = time.perf_counter()
+        for x in inputs: llm.model(**x)
+    result["prefill_tok_s"] = sum(x.input_ids.shape[1] for x in inputs) / (time.perf_counter() - start)
+
+    outputs, generated = [], 0
+    start = time.perf_counter()
+    for p in prompts:
+        outputs.append(llm.generate(p, max_new_tokens=max_new_tokens))
+        generated += llm.last_num_generated_tokens
+    elapsed = time.perf_counter() - start
+    prompt_tokens = sum(x.input_ids.shape[1] for x in inputs)
+    decode_s = max(elapsed - prompt_tokens / result["prefill_tok_s"], 1e-9) # Generation time minus the measured prefill
+    result["decode_tok_s"] = generated / decode_s
+    result["ms_per_call"] = 1e3 * elapsed / len(prompts)
+
+    batch = prompts[:batch_size]
+    start = time.perf_counter()
+    llm.generate_batch(batch, max_new_tokens=max_new_tokens)
+    result["batch_tok_s"] = len(batch) * max_new_tokens / (time.perf_counter() - start) # Upper bound on tokens produced
+    return result, outputs
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["hf", "cpu_int8"])
+    parser.add_argument("--hidden", type=int, default=1024)
+    parser.add_argument("--layers", type=int, default=8)
+    parser.add_argument("--prompts", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=4)
+    args = parser.parse_args()
+
+    config.LLM_RESPONSE_CACHE = False # Measure generation, not cache lookups
+    config.LLM_PREFIX_CACHE = False
+    model_dir = build_tiny_model(f"bench_backend_{args.hidden}x{args.layers}", hidden_size=args.hidden, num_layers=args.layers)
+    with open(os.path.join(config.PROMPT_DIR, config.ACTION_PROMPT_TEMPLATE_NAME), 'r') as f:
+        prompts = make_prompts(f.read(), args.prompts)
+
+    print(f"Model: Llama {args.hidden} hidden x {args.layers} layers; CPUs available: {len(os.sched_getaffinity(0))}; "
+          f"CUDA: {torch.cuda.is_available()}")
+    print(f"{'backend':>10} {'prefill tok/s':>14} {'decode tok/s':>13} {'ms/call':>8} {f'batch{args.batch} tok/s':>13}")
+    reference = None
+    for name in args.backends:
+        with contextlib.redirect_stdout(io.StringIO()):
+            llm = LLM_API(model_path=model_dir, tokenizer_path=model_dir, quantization_bits=None, draft_model_path=None, backend=name)
+            result, outputs = measure(llm, prompts, args.max_new_tokens, args.batch)
+        print(f"{name:>10} {result['prefill_tok_s']:>14.0f} {result['decode_tok_s']:>13.1f} {result['ms_per_call']:>8.0f} {result['batch_tok_s']:>13.1f}")
+        if reference is None: reference = outputs
+        else: print(f"{'':>10} greedy output identical to {args.backends[0]} for {sum(a == b for a, b in zip(reference, outputs))}/{len(outputs)} prompts")
+        del llm
+
+if __name__ == "__main__":
+    main()
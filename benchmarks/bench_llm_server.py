@@ -0,0 +1,69 @@
+# benchmarks/bench_llm_server.py
+# Measures LLMServer request throughput with and without dynamic batching, using many
+# concurrent LLMClients. By default the backend is a stub whose batched forward costs
+# a fixed latency plus a small per-row cost; pass --tiny-model to use a tiny CPU LLM_API.
+# Run: python benchmarks/bench_llm_server.py [--tiny-model]
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_server import LLMServer, LLMClient
+
+class StubBackend:
+    """Stands in for LLM_API: batching amortizes the fixed per-forward cost."""
+    def __init__(self, forward_latency_s=0.05, per_row_latency_s=0.002):
+        self.forward_latency_s = forward_latency_s
+        self.per_row_latency_s = per_row_latency_s
+
+    def generate(self, prompt, max_new_tokens=50, prefix=None, grammar=None):
+        return self.generate_batch([prompt], max_new_tokens)[0]
+
+    def generate_batch(self, prompts, max_new_tokens=50, grammars=None):
+        time.sleep(self.forward_latency_s + self.per_row_latency_s * len(prompts))
+        return [f"toggle_object('obj_{len(p) % 7}')" for p in prompts]
+
+def run(backend, max_batch_size, num_clients, requests_per_client):
+    server = LLMServer(backend, address=("localhost", 0), authkey=b"bench", max_batch_size=max_batch_size, batch_window_s=0.01).start()
+    clients = [LLMClient(server.address, authkey=b"bench") for _ in range(num_clients)]
+
+    def worker(client, idx):
+        for i in range(requests_per_client):
+            client.generate(f"prompt {idx} {i} " + "x" * (idx * 3), max_new_tokens=8)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(c, i)) for i, c in enumerate(clients)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - start
+    for c in clients: c.close()
+    server.stop()
+    total = num_clients * requests_per_client
+    return total / elapsed, server.num_requests / max(server.num_batches, 1)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tiny-model", action="store_true", help="Use a tiny CPU LLM_API instead of the stub backend.")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.tiny_model:
+        import config
+        from llm_api import LLM_API
+        config.LLM_RESPONSE_CACHE = False # Measure generation, not cache lookups
+        from tiny_model import build_tiny_model
+        model_dir = build_tiny_model("tiny_llama_server")
+        backend = LLM_API(model_path=model_dir, tokenizer_path=model_dir, quantization_bits=None)
+    else:
+        backend = StubBackend()
+
+    results = {size: run(backend, size, args.clients, args.requests) for size in (1, args.clients)}
+    print(f"\n{'max_batch_size':>15} {'requests/s':>11} {'mean batch':>11}")
+    for size, (throughput, mean_batch) in results.items():
+        print(f"{size:>15} {throughput:>11.1f} {mean_batch:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/bench_name_index.py
+# ObjectNameIndex build and resolve cost over fake scenes of increasing size, plus a check of
+# what each kind of name resolves to: exact names and display aliases, normalized spellings,
+# instance stems, categories, trigram/edit-distance typos, and near-misses that must stay
+# unresolved (another category, another instance number, an object not in the scene) rather
+# than act on the wrong object.
+# Run: python benchmarks/bench_name_index.py [--objects 1000 10000 50000]
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from name_index import ObjectNameIndex
+from observation_builder import object_aliases
+
+SCENE = [
+    "electric_switch_wseglt_0", "lamp_abcdef_0", "lamp_abcdef_1", "pot_qwerty_0", "fridge_dszchb_0",
+    "cabinet_xyzabc_0", "cabinet_xyzabc_1", "bowl_aaaaaa_0", "cup_bbbbbb_0", "countertop_tpuwys_0",
+]
+CASES = [ # query -> (expected name, kind); (None, None) = must not resolve
+    ("electric_switch_wseglt_0", ("electric_switch_wseglt_0", "exact")),
+    ("lamp_1", ("lamp_abcdef_1", "exact")), # Display alias
+    ("'Electric Switch wseglt 0'", ("electric_switch_wseglt_0", "normalized")),
+    ("fridge_dszchb", ("fridge_dszchb_0", "stem")),
+    ("cabinet", ("cabinet_xyzabc_1", "category")), # choose() picks the nearest instance
+    ("electric_swtch_wseglt_0", ("electric_switch_wseglt_0", "fuzzy")),
+    ("countertop_tpuwsy_0", ("countertop_tpuwys_0", "fuzzy")),
+    ("lamp_abcdf_1", ("lamp_abcdef_1", "fuzzy")), # Closest of two instances by edit distance
+    ("cabnet_xyzabc_0", ("cabinet_xyzabc_0", "fuzzy")),
+    ("electric swich", ("electric_switch_wseglt_0", "fuzzy")),
+    ("pan_qwerty_0", (None, None)), # One edit from pot_qwerty_0's model, but another category
+    ("cap_bbbbbb_0", (None, None)),
+    ("lamp_abcdef_7", (None, None)), # Instance that does not exist
+    ("microwave", (None, None)),
+    ("bowl_bbbbbb_0", (None, None)),
+]
+
+def category_of(name):
+    return name.rsplit('_', 2)[0] if name.count('_') >= 2 else name
+
+def check_cases():
+    index = ObjectNameIndex(SCENE, [category_of(n) for n in SCENE], object_aliases(SCENE))
+    nearest = lambda ids: max(ids) # Stand-in for the interface's distance-based choice
+    problems = []
+    for query, expected in CASES:
+        obj_id, kind = index.resolve(query, choose=nearest)
+        got = (SCENE[obj_id] if obj_id is not None else None, kind)
+        if got != expected: problems.append(f"{query!r} resolved to {got}, expected {expected}")
+    if index.lookup("lamp_abcdf_1") is not None: problems.append("lookup() (exact only) accepted a typo")
+    return problems
+
+def fake_names(num_objects, rng):
+    categories = ["apple", "bowl", "cabinet", "chair", "countertop", "fridge", "lamp", "microwave", "mug", "plate", "shelf", "sink"]
+    return [f"{categories[i % len(categories)]}_{''.join(rng.choice(string.ascii_lowercase) for _ in range(6))}_{i % 3}"
+            for i in range(num_objects)]
+
+def typo(name, rng):
+    """One substitution in the model id (the part between category and instance)."""
+    category, model, instance = name.rsplit('_', 2)
+    i = rng.randrange(len(model))
+    return f"{category}_{model[:i]}{rng.choice(string.ascii_lowercase)}{model[i + 1:]}_{instance}"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'objects':>8} {'build ms':>9} {'exact us':>9} {'typo us':>8} {'typo -> right object':>21}")
+    for num_objects in args.objects:
+        rng = random.Random(0)
+        names = fake_names(num_objects, rng)
+        start = time.perf_counter()
+        index = ObjectNameIndex(names, [category_of(n) for n in names], object_aliases(names))
+        build_ms = 1e3 * (time.perf_counter() - start)
+        targets = [rng.randrange(num_objects) for _ in range(args.queries)]
+        start = time.perf_counter()
+        for target in targets: index.resolve(names[target])
+        exact_us = 1e6 * (time.perf_counter() - start) / args.queries
+        queries = [typo(names[target], rng) for target in targets]
+        start = time.perf_counter()
+        resolved = [index.resolve(query)[0] for query in queries]
+        typo_us = 1e6 * (time.perf_counter() - start) / args.queries
+        right = sum(obj_id == target for obj_id, target in zip(resolved, targets))
+        print(f"{num_objects:>8} {build_ms:>9.1f} {exact_us:>9.1f} {typo_us:>8.1f} {right:>12}/{args.queries} "
+              f"({sum(obj_id is None for obj_id in resolved)} unresolved)")
+
+    problems = check_cases()
+    for problem in problems: print(f"FAILED: {problem}")
+    if problems: sys.exit(1)
+    print(f"{len(CASES)} resolution cases passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_observation_budget.py
+# Observation size and build time with and without the token budget (fake scene, tiny tokenizer),
+# and prompt tokenization with cached prefix ids and front truncation (tiny model).
+# Run: python benchmarks/bench_observation_budget.py [--objects 3000]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import fake_omnigibson
+import config
+from tiny_model import build_tiny_model
+
+GOAL_OBJECT = "electric_switch_wseglt_0"
+
+def observation_stats(tokenizer, budget, short_names, steps):
+    from omnigibson_interface import OmniGibsonInterface
+    from observation_builder import TokenCounter
+    config.OBSERVATION_TOKEN_BUDGET = budget
+    config.OBSERVATION_SHORT_NAMES = short_names
+    with contextlib.redirect_stdout(io.StringIO()):
+        interface = OmniGibsonInterface()
+        interface.token_counter = TokenCounter(tokenizer)
+        interface.load_task(config.DEFAULT_TASK)
+        times = []
+        for _ in range(steps):
+            interface.step_simulation()
+            start = time.perf_counter()
+            obs = interface.get_observation()
+            times.append(time.perf_counter() - start)
+    fake_omnigibson.clear()
+    times.sort()
+    tokens = len(tokenizer(obs, add_special_tokens=False).input_ids)
+    goal_listed = interface.display_name(GOAL_OBJECT) in interface.observed_object_names
+    return tokens, len(interface.observed_object_names), goal_listed, 1e3 * times[len(times) // 2]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=3000)
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=args.objects, task_objects={GOAL_OBJECT: {"ToggledOn": False}}, step_latency_s=0.0, reset_latency_s=0.0,
+    ))
+    config.TASK_CONFIG_DIR = os.path.join(REPO_DIR, config.TASK_CONFIG_DIR)
+    config.PROMPT_DIR = os.path.join(REPO_DIR, config.PROMPT_DIR)
+    config.ENV_CONFIG_PATH = os.path.join(tempfile.mkdtemp(prefix="fake_env_"), "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": config.DEFAULT_SCENE_ID}, "robots": [{"type": "Fetch"}]}, f)
+    config.LLM_PREFIX_CACHE = config.LLM_RESPONSE_CACHE = False
+    model_dir = build_tiny_model()
+
+    from llm_api import LLM_API, build_prompt_prefix
+    with contextlib.redirect_stdout(io.StringIO()):
+        llm = LLM_API(model_path=model_dir, tokenizer_path=model_dir, quantization_bits=None)
+
+    print(f"Fake scene: {args.objects + 1} objects; tokens counted with the tiny benchmark tokenizer")
+    print(f"{'budget':>8} {'short':>6} {'obs tokens':>11} {'objects':>8} {'goal listed':>12} {'build p50 ms':>13}")
+    for budget, short_names in ((None, False), (None, True), (400, True), (200, True)):
+        tokens, num_objects, goal_listed, p50_ms = observation_stats(llm.tokenizer, budget, short_names, args.steps)
+        print(f"{str(budget):>8} {str(short_names):>6} {tokens:>11} {num_objects:>8} {str(goal_listed):>12} {p50_ms:>13.2f}")
+
+    # Prompt tokenization: cached prefix ids vs whole prompt, and front truncation of an over-long prompt
+    with open(os.path.join(config.PROMPT_DIR, config.ACTION_PROMPT_TEMPLATE_NAME), 'r') as f:
+        template = f.read()
+    prefix = build_prompt_prefix(template, "Your goal is to turn on the electric switch.")
+    prompt = template.format(task_description="Your goal is to turn on the electric switch.",
+                             observation="Robot is at position (0.00, 0.00).\nNearby objects: electric_switch_0 (toggled=off) [1.5m]")
+    for label, use_prefix in (("whole prompt", False), ("cached prefix ids", True)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            llm._tokenize_prompt(prompt, prefix if use_prefix else None) # Warm up / fill the cache
+            start = time.perf_counter()
+            for _ in range(200): ids = llm._tokenize_prompt(prompt, prefix if use_prefix else None).input_ids
+        print(f"Tokenize ({label}): {1e6 * (time.perf_counter() - start) / 200:.0f} us, {ids.shape[1]} tokens")
+    full_ids = llm.tokenizer(prompt, return_tensors="pt").input_ids
+    assert ids.tolist() == full_ids.tolist(), "Prefix-split tokenization differs from whole-prompt tokenization"
+
+    config.LLM_MAX_PROMPT_TOKENS = full_ids.shape[1] // 2
+    with contextlib.redirect_stdout(io.StringIO()):
+        cut = llm._tokenize_prompt(prompt, prefix).input_ids
+    tail = llm.tokenizer.decode(cut[0, -8:], skip_special_tokens=True)
+    print(f"Over-long prompt cut to {cut.shape[1]} tokens (limit {config.LLM_MAX_PROMPT_TOKENS}); ends with {tail!r}")
+
+if __name__ == "__main__":
+    main()
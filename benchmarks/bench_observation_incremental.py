@@ -0,0 +1,72 @@
+# benchmarks/bench_observation_incremental.py
+# Per-step get_observation cost and size, full vs delta observations (config.OBSERVATION_MODE),
+# over fake scenes of increasing size. Each step toggles the goal switch (one state change),
+# so the line cache should re-format about one object per step regardless of scene size.
+# Token counts use the tiny benchmark tokenizer.
+# Run: python benchmarks/bench_observation_incremental.py [--objects 300 3000 10000 --steps 40]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+import fake_omnigibson
+import config
+from tiny_model import build_tokenizer, DEFAULT_OUT_DIR
+
+GOAL_OBJECT = "electric_switch_wseglt_0"
+
+def run(tokenizer, num_objects, mode, steps):
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=num_objects, task_objects={GOAL_OBJECT: {"ToggledOn": False}}, step_latency_s=0.0, reset_latency_s=0.0,
+    ))
+    from omnigibson_interface import OmniGibsonInterface
+    from observation_builder import TokenCounter
+    config.OBSERVATION_MODE = mode
+    with contextlib.redirect_stdout(io.StringIO()):
+        interface = OmniGibsonInterface()
+        interface.token_counter = TokenCounter(tokenizer)
+        interface.load_task(config.DEFAULT_TASK)
+        times, tokens = [], []
+        reformatted = interface.line_cache.stats["reformatted"]
+        for _ in range(steps):
+            interface.execute_action("toggle_object", [GOAL_OBJECT])
+            interface.step_simulation()
+            start = time.perf_counter()
+            observation = interface.get_observation()
+            times.append(time.perf_counter() - start)
+            tokens.append(len(tokenizer(observation, add_special_tokens=False).input_ids))
+        reformatted = (interface.line_cache.stats["reformatted"] - reformatted) / steps
+        interface.close()
+    fake_omnigibson.clear()
+    times.sort()
+    return 1e3 * times[len(times) // 2], sum(tokens) / steps, reformatted
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, nargs="+", default=[300, 3000, 10000])
+    parser.add_argument("--steps", type=int, default=40)
+    args = parser.parse_args()
+
+    config.TASK_CONFIG_DIR = os.path.join(REPO_DIR, config.TASK_CONFIG_DIR)
+    config.ENV_CONFIG_PATH = os.path.join(tempfile.mkdtemp(prefix="fake_env_"), "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": config.DEFAULT_SCENE_ID}, "robots": [{"type": "Fetch"}]}, f)
+    config.SCENE_STATE_RESTORE = False
+    tokenizer = build_tokenizer(os.path.join(DEFAULT_OUT_DIR, "tiny_llama"))
+
+    print(f"Token budget {config.OBSERVATION_TOKEN_BUDGET}, full observation every {config.OBSERVATION_FULL_EVERY} in delta mode")
+    print(f"{'objects':>8} {'mode':>6} {'build p50 ms':>13} {'mean tokens':>12} {'re-formatted/step':>18}")
+    for num_objects in args.objects:
+        for mode in ("full", "delta"):
+            p50_ms, mean_tokens, reformatted = run(tokenizer, num_objects, mode, args.steps)
+            print(f"{num_objects:>8} {mode:>6} {p50_ms:>13.2f} {mean_tokens:>12.0f} {reformatted:>18.1f}")
+
+if __name__ == "__main__":
+    main()
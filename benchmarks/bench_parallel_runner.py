@@ -0,0 +1,224 @@
+# benchmarks/bench_parallel_runner.py
+# Runs ParallelRunner end to end on worker processes built over the fake simulator
+# (fake_omnigibson.py) with a stub LLM, and checks its bookkeeping: every job is recorded
+# exactly once, and one episode whose LLM never answers is killed at the timeout and
+# recorded as such. That episode's process answers the kill with a late result (like a
+# process that finishes just as it is terminated); the runner must ignore it rather than
+# book it against the replacement worker. Workers that die hard while initializing (before
+# they report ready or init_failed, e.g. killed while loading the model) must be restarted
+# within max_restarts and the jobs failed once none are left, instead of hanging the runner.
+# Also runs a suite (suite_runner.discover_tasks/build_jobs) over tasks in several scenes and
+# counts, inside the workers, every scene load (og.Environment) and background scene
+# preparation: each scene must be loaded at most once per worker process and at most
+# scenes + workers - 1 times in total, and scene switches should find the next scene's config
+# already prepared.
+# Run: python benchmarks/bench_parallel_runner.py [--workers 2 --episodes 3 --llm-ms 1000 --timeout 3 --scenes 3]
+import argparse
+import contextlib
+import functools
+import io
+import math
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import yaml
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+import config
+from bench_agent_loop import StubLLM
+
+SWITCH = "electric_switch_wseglt_0"
+HANG_MARKER = "NEVER ANSWERS"
+
+def _setup(settings):
+    """Worker processes are fresh interpreters: install the fake backend and point the config at the bench files."""
+    import fake_omnigibson
+    if "omnigibson" in sys.modules: return
+    if not settings["verbose"]: sys.stdout = open(os.devnull, "w")
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=settings["objects"], task_objects={SWITCH: {"ToggledOn": False}},
+        env_init_latency_s=settings["env_init_s"], step_latency_s=0.001, reset_latency_s=0.0,
+    ))
+    config.TASK_CONFIG_DIR = settings["task_dir"]
+    config.ENV_CONFIG_PATH = settings["env_config_path"]
+    config.PROMPT_DIR = os.path.join(REPO_DIR, config.PROMPT_DIR)
+    config.TOKENIZER_PATH = None
+    config.SKILL_LIBRARY = False
+    if settings.get("load_log"): _count_scene_loads(settings["load_log"])
+
+def _count_scene_loads(path):
+    """Appends 'env <pid> <scene>' per og.Environment and 'prefetch <pid> <scene>' per background config load."""
+    import omnigibson as og
+    import env_config
+    def record(kind, scene_id):
+        with open(path, "a") as f: f.write(f"{kind} {os.getpid()} {scene_id}\n")
+
+    class CountingEnvironment(og.Environment):
+        def __init__(self, configs=None):
+            record("env", env_config.scene_id_of(configs or {}))
+            super().__init__(configs)
+
+    def load_env_config(scene_id=None, config_path=None):
+        if threading.current_thread().name.startswith("scene-prefetch"): record("prefetch", scene_id)
+        return original_load(scene_id, config_path)
+
+    original_load = env_config.load_env_config
+    og.Environment = CountingEnvironment
+    env_config.load_env_config = load_env_config # Before omnigibson_interface imports it
+
+class HangingStubLLM(StubLLM):
+    """StubLLM that never answers prompts of tasks marked HANG_MARKER."""
+    def generate(self, prompt, **kwargs):
+        if HANG_MARKER in prompt:
+            # Answer the runner's SIGTERM with a late result, then die a second later
+            signal.signal(signal.SIGTERM, _late_result_on_terminate)
+            time.sleep(3600)
+        return super().generate(prompt, **kwargs)
+
+def _late_result_on_terminate(signum, frame):
+    signal.alarm(1)
+    raise RuntimeError("terminated mid-episode") # _worker_main reports it as this job's result
+
+def fake_llm_factory(settings):
+    _setup(settings)
+    return HangingStubLLM([f"toggle_object('{SWITCH}')"], prefill_s=settings["llm_s"], tokens_per_s=1e6)
+
+def dying_llm_factory(settings):
+    os._exit(3) # Like a segfault or OOM kill while loading weights: no message to the runner
+
+def fake_env_factory(settings, scene_id=None, env_cfg=None):
+    _setup(settings)
+    from parallel_runner import default_env_factory
+    return default_env_factory(scene_id, env_cfg)
+
+def write_task(task_dir, task_name, description, scene_id=None):
+    task = {"task_name": task_name, "description": description, "goal_conditions": [{"type": "ToggledOn", "object_name": SWITCH}]}
+    if scene_id: task["scene_id"] = scene_id
+    with open(os.path.join(task_dir, f"{task_name}.yaml"), "w") as f:
+        yaml.safe_dump(task, f)
+
+def make_settings(args, env_init_s, load_log=None):
+    task_dir = tempfile.mkdtemp(prefix="parallel_tasks_")
+    env_config_path = os.path.join(tempfile.mkdtemp(prefix="fake_env_"), "fake_env.yaml") # Not in task_dir: the suite check discovers every YAML there
+    with open(env_config_path, "w") as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": config.DEFAULT_SCENE_ID}, "robots": [{"type": "Fetch"}]}, f)
+    return {"objects": args.objects, "verbose": args.verbose, "llm_s": args.llm_ms / 1e3, "env_init_s": env_init_s, "task_dir": task_dir, "env_config_path": env_config_path,
+            "load_log": load_log}
+
+def check_timeouts(args):
+    from parallel_runner import ParallelRunner
+    settings = make_settings(args, env_init_s=0.0)
+    for name in ("switch_a", "switch_b"): write_task(settings["task_dir"], name, "Your goal is to turn on the electric switch.")
+    write_task(settings["task_dir"], "hang", f"This task {HANG_MARKER}.")
+    # The hang goes first, and there are enough other episodes to keep the workers busy until
+    # after its timeout, so its late result arrives while the runner is still collecting results
+    seeds = max(args.episodes, math.ceil(args.workers * (args.timeout + 2.0) / (2 * args.llm_ms / 1e3)))
+    jobs = [("hang", 0)] + [(task, seed) for task in ("switch_a", "switch_b") for seed in range(seeds)]
+    runner = ParallelRunner(num_workers=args.workers, env_factory=functools.partial(fake_env_factory, settings),
+                            llm_factory=functools.partial(fake_llm_factory, settings), episode_timeout_s=args.timeout, max_restarts=2)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        results = runner.run(jobs)
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter((r["task"], r["status"]) for r in results)
+    recorded = Counter((r["task"], r["seed"]) for r in results)
+    print(f"{len(jobs)} jobs on {args.workers} workers in {elapsed:.1f} s: {dict(statuses)}")
+    print(f"Restarts: {runner.num_restarts}, stale messages ignored: {runner.num_stale_messages}")
+    problems = []
+    if recorded != Counter((job[0], job[1]) for job in jobs): problems.append(f"jobs recorded {dict(recorded)}")
+    if statuses[("hang", "timeout")] != 1: problems.append("the hanging episode was not recorded as a timeout")
+    if statuses[("switch_a", "success")] + statuses[("switch_b", "success")] != len(jobs) - 1: problems.append("episodes failed")
+    if runner.num_stale_messages < 1: problems.append("the late result of the killed process never reached the runner")
+    return problems
+
+def check_init_crash(args, max_restarts=1):
+    from parallel_runner import ParallelRunner
+    settings = make_settings(args, env_init_s=0.0)
+    jobs = [("switch_a", seed) for seed in range(args.episodes)]
+    runner = ParallelRunner(num_workers=1, env_factory=functools.partial(fake_env_factory, settings),
+                            llm_factory=functools.partial(dying_llm_factory, settings), episode_timeout_s=args.timeout, max_restarts=max_restarts)
+    results = []
+    start = time.perf_counter()
+    thread = threading.Thread(target=lambda: results.extend(runner.run(jobs)), daemon=True) # The old runner never returns here
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        thread.start()
+        thread.join(timeout=10 * args.timeout + 30)
+    elapsed = time.perf_counter() - start
+    if thread.is_alive(): return [f"run() did not return within {elapsed:.0f} s when every worker dies during init"]
+    statuses = Counter(r["status"] for r in results)
+    print(f"Workers dying during init: {len(jobs)} jobs in {elapsed:.1f} s: {dict(statuses)}, restarts: {runner.num_restarts}")
+    problems = []
+    if statuses != Counter({"not_run": len(jobs)}): problems.append(f"jobs of dead workers recorded as {dict(statuses)}")
+    if runner.num_restarts != max_restarts: problems.append(f"{runner.num_restarts} restarts of workers dying during init, expected {max_restarts}")
+    return problems
+
+def check_scene_grouping(args):
+    from parallel_runner import ParallelRunner
+    from suite_runner import discover_tasks, group_by_scene, build_jobs
+    load_log = os.path.join(tempfile.mkdtemp(prefix="scene_loads_"), "loads.txt")
+    settings = make_settings(args, env_init_s=args.scene_load_ms / 1e3, load_log=load_log)
+    scenes = [f"Scene_{i}_int" for i in range(args.scenes)]
+    # Tasks interleaved across scenes (as they sort on disk), plus one without a scene_id (env config scene)
+    for i in range(2 * args.scenes): write_task(settings["task_dir"], f"task_{i:02d}", "Your goal is to turn on the electric switch.", scenes[i % args.scenes])
+    write_task(settings["task_dir"], "task_default_scene", "Your goal is to turn on the electric switch.")
+    config.ENV_CONFIG_PATH = settings["env_config_path"] # discover_tasks reads the default scene in this process
+    with contextlib.redirect_stdout(io.StringIO()):
+        tasks = discover_tasks(settings["task_dir"])
+    jobs = build_jobs(tasks, args.episodes)
+    num_scenes = len(group_by_scene(tasks))
+    runner = ParallelRunner(num_workers=args.workers, env_factory=functools.partial(fake_env_factory, settings),
+                            llm_factory=functools.partial(fake_llm_factory, settings), episode_timeout_s=60.0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        results = runner.run(jobs)
+    elapsed = time.perf_counter() - start
+
+    with open(load_log) as f: entries = [line.split() for line in f]
+    loads = Counter((pid, scene) for kind, pid, scene in entries if kind == "env")
+    prefetches = sum(kind == "prefetch" for kind, _, _ in entries)
+    workers = len({pid for pid, _ in loads})
+    switches = sum(loads.values()) - workers
+    print(f"Suite: {len(jobs)} jobs over {num_scenes} scenes on {args.workers} workers in {elapsed:.1f} s "
+          f"({args.scene_load_ms:.0f} ms per scene load): {Counter(r['status'] for r in results)}")
+    print(f"Scene loads: {sum(loads.values())} (one per job would be {len(jobs)}), scene switches: {switches}, "
+          f"background scene preparations: {prefetches}")
+    problems = []
+    repeated = {key: count for key, count in loads.items() if count > 1}
+    if repeated: problems.append(f"scenes loaded more than once by one worker: {repeated}")
+    if {scene for _, scene in loads} != {scene for _, scene in tasks}: problems.append("not every scene was loaded")
+    # A worker only leaves a scene once its jobs are all handed out, and then prefers a scene no
+    # other worker holds, so at most workers - 1 scenes end up loaded by a second worker
+    if sum(loads.values()) > num_scenes + workers - 1:
+        problems.append(f"{sum(loads.values())} scene loads for {num_scenes} scenes on {workers} workers (grouping expects at most {num_scenes + workers - 1})")
+    if sum(r.get("scene_load", False) for r in results) != sum(loads.values()): problems.append("results' scene_load flags disagree with the loads counted")
+    if switches and not prefetches: problems.append("workers switched scenes without preparing any scene in the background")
+    if any(not r["success"] for r in results): problems.append("episodes failed")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--episodes", type=int, default=3, help="Episodes (seeds) per task (at least enough to outlast the timeout check).")
+    parser.add_argument("--objects", type=int, default=300, help="Filler objects in the fake scene.")
+    parser.add_argument("--llm-ms", type=float, default=1000.0, help="Stub LLM latency per call.")
+    parser.add_argument("--timeout", type=float, default=3.0, help="Episode timeout (s).")
+    parser.add_argument("--scenes", type=int, default=3, help="Scenes in the suite check.")
+    parser.add_argument("--scene-load-ms", type=float, default=300.0, help="Fake scene (og.Environment) load latency in the suite check.")
+    parser.add_argument("--verbose", action="store_true", help="Show the runner's and workers' own output.")
+    args = parser.parse_args()
+
+    problems = check_timeouts(args) + check_init_crash(args) + check_scene_grouping(args)
+    for problem in problems: print(f"FAILED: {problem}")
+    if problems: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
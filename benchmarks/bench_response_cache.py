@@ -0,0 +1,74 @@
+# benchmarks/bench_response_cache.py
+# ResponseCache.put latency on the SQLite tier as the file fills up, plus checks of its size
+# accounting: the file never holds more than max_disk_bytes after a put, the running byte
+# total matches SUM(size) (also after replacing keys and after reopening the file), and the
+# least recently used rows are the ones evicted.
+# Run: python benchmarks/bench_response_cache.py [--entries 1000 100000 1000000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_cache import ResponseCache
+
+RESPONSE = "navigate_to_object('electric_switch_wseglt_0')\ntoggle_object('electric_switch_wseglt_0')" # ~90 bytes
+
+def new_path():
+    return os.path.join(tempfile.mkdtemp(prefix="response_cache_"), "responses.sqlite")
+
+def put_us(num_entries, puts=200):
+    """Mean put latency with num_entries already on disk (limit high enough to not evict)."""
+    path = new_path()
+    ResponseCache(path).close() # Creates the table
+    fill = ResponseCache(path)
+    fill._db.executemany("INSERT INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                         ((f"key{i}", RESPONSE, len(RESPONSE) + len(f"key{i}"), float(i)) for i in range(num_entries)))
+    fill._db.commit()
+    fill.close()
+    cache = ResponseCache(path, max_memory_entries=16, max_disk_bytes=2**40)
+    start = time.perf_counter()
+    for i in range(puts): cache.put(f"new{i}", RESPONSE)
+    elapsed = time.perf_counter() - start
+    cache.close()
+    return 1e6 * elapsed / puts
+
+def check_accounting():
+    problems = []
+    path = new_path()
+    entry = len(RESPONSE) + len("key0000")
+    cache = ResponseCache(path, max_memory_entries=1, max_disk_bytes=100 * entry) # get() goes to disk and refreshes last_access
+    for i in range(300):
+        cache.put(f"key{i:04d}", RESPONSE)
+        if i % 10 == 0: cache.get("key0000") # Keep one old row recently used
+        on_disk = cache._sum_sizes()
+        if on_disk > cache.max_disk_bytes: problems.append(f"{on_disk} bytes on disk after put {i} (limit {cache.max_disk_bytes})"); break
+        if cache._disk_bytes != on_disk: problems.append(f"running total {cache._disk_bytes} != SUM(size) {on_disk} after put {i}"); break
+    for i in range(280, 300): cache.put(f"key{i:04d}", RESPONSE + " (replaced)") # Replacing keys changes their size
+    if cache._disk_bytes != cache._sum_sizes(): problems.append("running total wrong after replacing keys")
+    cache.close()
+
+    reopened = ResponseCache(path, max_memory_entries=1, max_disk_bytes=100 * entry)
+    if reopened._disk_bytes != reopened._sum_sizes(): problems.append("running total wrong after reopening")
+    if reopened.get("key0000") is None: problems.append("the recently used key0000 was evicted")
+    if reopened.get("key0100") is not None: problems.append("the least recently used key0100 was kept")
+    print(f"Accounting: {reopened._disk_bytes} bytes in {reopened._db.execute('SELECT COUNT(*) FROM responses').fetchone()[0]} rows "
+          f"(limit {reopened.max_disk_bytes}), {cache.disk_evictions} evictions")
+    reopened.close()
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'put us':>8}")
+    for num_entries in args.entries: print(f"{num_entries:>8} {put_us(num_entries):>8.1f}")
+    problems = check_accounting()
+    for problem in problems: print(f"FAILED: {problem}")
+    if problems: sys.exit(1)
+    print("Size accounting checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_skill_library.py
+# SkillLibrary.lookup latency over a growing number of stored skills in one scene, plus checks
+# of what lookup returns: the exact goal first, then similar goals by score; never a skill whose
+# goal sets one of the same states to a different target (lamp on vs lamp off), never one from
+# another scene; and skills dropped by record_replay after max_failures consecutive failures
+# (also after reopening the SQLite file).
+# Run: python benchmarks/bench_skill_library.py [--skills 100 1000 10000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from skill_library import SkillLibrary
+
+SCENE = "Merom_1_int"
+DESCRIPTION = "Your goal is to set the lamp in the living room."
+
+def lamp_goal(target=None, obj="lamp_0"):
+    condition = {"type": "ToggledOn", "object_name": obj}
+    if target is not None: condition["target_value"] = target
+    return [condition]
+
+def check_lookup(path):
+    problems = []
+    def expect(label, got, want):
+        if got != want: problems.append(f"{label}: got {got}, expected {want}")
+
+    skills = SkillLibrary(path, similarity_threshold=0.85, max_failures=3)
+    on = skills.add(lamp_goal(), SCENE, DESCRIPTION, ["toggle_object('lamp_0')"])
+    off = skills.add(lamp_goal(False), SCENE, DESCRIPTION, ["toggle_object('lamp_0')", "toggle_object('lamp_0')"])
+    # Same goal as `on` written differently (explicit target_value), slightly different wording
+    on_alt = skills.add(lamp_goal(True), SCENE, DESCRIPTION + " Please.", ["navigate_to_object('lamp_0')", "toggle_object('lamp_0')"])
+    skills.add(lamp_goal(), "Rs_int", DESCRIPTION, ["toggle_object('lamp_0')"]) # Other scene
+    skills.add(lamp_goal(obj="lamp_1"), SCENE, DESCRIPTION, ["toggle_object('lamp_1')"]) # Other object
+
+    names = {on.key: "on", off.key: "off", on_alt.key: "on_alt"}
+    def found(goal, description=DESCRIPTION, max_candidates=5):
+        results = skills.lookup(goal, SCENE, description, max_candidates)
+        scores = [score for _, score in results]
+        if scores != sorted(scores, reverse=True): problems.append(f"scores not in descending order: {scores}")
+        return [names.get(skill.key, f"{skill.scene_id}:{skill.actions[0]}") for skill, _ in results]
+
+    expect("lamp on", found(lamp_goal()), ["on", "on_alt"])
+    expect("lamp off (same description)", found(lamp_goal(False)), ["off"])
+    expect("lamp on, other wording", found(lamp_goal(), "Switch the living room lamp on."), ["on"])
+    expect("not lamp off (same description)", found([{"not": lamp_goal(False)[0]}]), [])
+    expect("max_candidates=1", found(lamp_goal(), max_candidates=1), ["on"])
+
+    # record_replay: failures reset on success, max_failures in a row drops the skill
+    for success in (False, False, True, False, False): skills.record_replay(on_alt, success)
+    expect("lamp on after on_alt failed, failed, succeeded, failed, failed", found(lamp_goal()), ["on", "on_alt"])
+    skills.record_replay(on_alt, False)
+    expect("lamp on after a third on_alt failure in a row", found(lamp_goal()), ["on"])
+    skills.close()
+    reopened = SkillLibrary(path, similarity_threshold=0.85, max_failures=3)
+    expect("skills after reopening", len(reopened), 4)
+    expect("on_alt after reopening", [skill.key for skill, _ in reopened.lookup(lamp_goal(), SCENE, DESCRIPTION, 5)], [on.key])
+    reopened.close()
+    return problems
+
+def lookup_us(num_skills, lookups=200):
+    skills = SkillLibrary(None)
+    for i in range(num_skills):
+        skills.add(lamp_goal(i % 2 == 0, obj=f"lamp_{i}"), SCENE, f"Your goal is to set lamp {i} in room {i % 50}.", [f"toggle_object('lamp_{i}')"])
+    start = time.perf_counter()
+    for i in range(lookups):
+        skills.lookup(lamp_goal(obj=f"lamp_{(7 * i) % num_skills}"), SCENE, f"Your goal is to set lamp {i} in room {i % 50}.")
+    return 1e6 * (time.perf_counter() - start) / lookups
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skills", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'skills':>8} {'lookup us':>10}")
+    for num_skills in args.skills: print(f"{num_skills:>8} {lookup_us(num_skills):>10.1f}")
+    problems = check_lookup(os.path.join(tempfile.mkdtemp(prefix="skills_"), "skills.sqlite"))
+    for problem in problems: print(f"FAILED: {problem}")
+    if problems: sys.exit(1)
+    print("lookup / record_replay checks passed")
+
+if __name__ == "__main__":
+    main()
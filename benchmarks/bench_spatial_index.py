@@ -0,0 +1,77 @@
+# benchmarks/bench_spatial_index.py
+# Compares the per-object distance loop previously used by get_observation against
+# SceneSpatialIndex on synthetic scenes. Run: python benchmarks/bench_spatial_index.py
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spatial_index import SceneSpatialIndex
+
+SCENE_SIZES = [1_000, 10_000, 50_000]
+MOVABLE_FRACTION = 0.1
+SCENE_EXTENT = 60.0 # meters (square floor plan)
+MAX_DIST = 4.0
+NUM_QUERIES = 20
+
+class SyntheticObject:
+    def __init__(self, name, position, fixed_base):
+        self.name = name
+        self.fixed_base = fixed_base
+        self._position = position
+        self._orientation = np.array([0.0, 0.0, 0.0, 1.0])
+
+    def get_position_orientation(self):
+        return self._position, self._orientation
+
+def make_scene(num_objects, rng):
+    positions = np.column_stack([
+        rng.uniform(0, SCENE_EXTENT, num_objects),
+        rng.uniform(0, SCENE_EXTENT, num_objects),
+        rng.uniform(0, 3.0, num_objects),
+    ])
+    movable = rng.random(num_objects) < MOVABLE_FRACTION
+    return [SyntheticObject(f"obj_{i}", positions[i], not movable[i]) for i in range(num_objects)]
+
+def naive_query(objects, robot_pos):
+    """The loop get_observation ran before the spatial index."""
+    nearby = []
+    for obj in objects:
+        obj_pos, _ = obj.get_position_orientation()
+        dist = np.linalg.norm(robot_pos - obj_pos)
+        if dist < MAX_DIST:
+            nearby.append(obj.name)
+    return nearby
+
+def index_query(index, robot_pos):
+    index.refresh()
+    ids, _ = index.query_radius(robot_pos, MAX_DIST)
+    return [index.names[i] for i in ids]
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'objects':>8} {'build [ms]':>11} {'naive [ms]':>11} {'index [ms]':>11} {'speedup':>8}")
+    for num_objects in SCENE_SIZES:
+        objects = make_scene(num_objects, rng)
+        robots = rng.uniform(0, SCENE_EXTENT, (NUM_QUERIES, 3))
+        robots[:, 2] = 0.0
+
+        start = time.perf_counter()
+        index = SceneSpatialIndex(objects, cell_size=MAX_DIST)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        naive_results = [naive_query(objects, pos) for pos in robots]
+        naive_ms = (time.perf_counter() - start) * 1e3 / NUM_QUERIES
+
+        start = time.perf_counter()
+        index_results = [index_query(index, pos) for pos in robots]
+        index_ms = (time.perf_counter() - start) * 1e3 / NUM_QUERIES
+
+        for expected, got in zip(naive_results, index_results):
+            assert sorted(expected) == sorted(got), "Spatial index returned a different object set"
+        print(f"{num_objects:>8} {build_ms:>11.2f} {naive_ms:>11.2f} {index_ms:>11.2f} {naive_ms / index_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_startup.py
+# Cold-start time to first action, sequential vs parallel startup (config.PARALLEL_STARTUP),
+# each measured in a fresh interpreter. The simulator is the fake backend with an env
+# construction latency; the "LLM load" imports torch/transformers and loads the tiny model,
+# then sleeps for the rest of a configurable load time (standing in for weight I/O).
+# Also reports the import cost of the entry-point module.
+# Run: python benchmarks/bench_startup.py [--sim-s 3 --llm-s 4]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def child(args):
+    process_start = time.perf_counter()
+    sys.path.insert(0, REPO_DIR)
+    sys.path.insert(0, BENCH_DIR)
+    import contextlib
+    import io
+    import yaml
+    import fake_omnigibson
+    import config
+    with open(os.path.join(REPO_DIR, config.TASK_CONFIG_DIR, f"{config.DEFAULT_TASK}.yaml"), 'r') as f:
+        task = yaml.safe_load(f)
+    from bench_agent_loop import StubLLM, task_objects
+    goal_objects = task_objects(task)
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=300, task_objects=goal_objects, env_init_latency_s=args.sim_s, step_latency_s=0.001, reset_latency_s=0.0,
+    ))
+    config.TASK_CONFIG_DIR = os.path.join(REPO_DIR, config.TASK_CONFIG_DIR)
+    config.PROMPT_DIR = os.path.join(REPO_DIR, config.PROMPT_DIR)
+    config.ENV_CONFIG_PATH = os.path.join(tempfile.mkdtemp(prefix="fake_env_"), "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": task['scene_id']}, "robots": [{"type": "Fetch"}]}, f)
+    config.PARALLEL_STARTUP = args.mode == "parallel"
+    config.SKILL_LIBRARY = False
+    config.LLM_SERVER_ADDRESS = "unused" # verify_paths skips the model path checks
+
+    import run_voyager_omnigibson
+    imported = time.perf_counter()
+    first_action = []
+    stub = StubLLM([f"toggle_object('{name}')" for name in goal_objects], prefill_s=0.0, tokens_per_s=1e6)
+    original_generate = stub.generate
+    def generate(*a, **kw):
+        if not first_action: first_action.append(time.perf_counter())
+        return original_generate(*a, **kw)
+    stub.generate = generate
+
+    def load_llm():
+        start = time.perf_counter()
+        from tiny_model import build_tiny_model
+        from llm_api import LLM_API
+        model_dir = build_tiny_model()
+        LLM_API(model_path=model_dir, tokenizer_path=model_dir, quantization_bits=None, draft_model_path=None)
+        time.sleep(max(0.0, args.llm_s - (time.perf_counter() - start)))
+        return stub
+    run_voyager_omnigibson.load_llm = load_llm
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_voyager_omnigibson.run_agent()
+    print(f"{imported - process_start:.3f} {first_action[0] - process_start:.3f}")
+
+def measure(mode, args):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--sim-s", str(args.sim_s), "--llm-s", str(args.llm_s)],
+        capture_output=True, text=True, check=True, cwd=REPO_DIR,
+    ).stdout.split()
+    return float(output[-2]), float(output[-1])
+
+def import_time(module):
+    code = f"import sys, time; sys.path.insert(0, {REPO_DIR!r}); t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    return float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO_DIR).stdout.split()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sim-s", type=float, default=3.0, help="Fake simulator construction time.")
+    parser.add_argument("--llm-s", type=float, default=4.0, help="LLM load time (tiny model load padded to this).")
+    parser.add_argument("--child", choices=["sequential", "parallel"])
+    args = parser.parse_args()
+    if args.child:
+        args.mode = args.child
+        return child(args)
+
+    print(f"Import run_voyager_omnigibson: {1e3 * import_time('run_voyager_omnigibson'):.0f} ms "
+          f"(import llm_api, i.e. torch + transformers: {1e3 * import_time('llm_api'):.0f} ms)")
+    print(f"Simulator {args.sim_s:.1f} s, LLM {args.llm_s:.1f} s")
+    for mode in ("sequential", "parallel"):
+        imported, first_action = measure(mode, args)
+        print(f"{mode:>10}: time to first action {first_action:.2f} s (module imports done at {imported:.2f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_tracing.py
+# Cost of a tracing span (disabled vs enabled), and the end-to-end overhead of tracing on
+# tiny-model generate() calls, with the per-phase summary and trace exports.
+# Run: python benchmarks/bench_tracing.py
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from tracing import tracer, summarize, print_summary
+from llm_api import LLM_API, build_prompt_prefix
+from tiny_model import build_tiny_model, SAMPLE_OBJECT_NAMES
+
+NUM_SPANS = 200000
+NUM_STEPS = 12
+
+def span_cost_ns(enabled):
+    tracer.enabled = enabled
+    start = time.perf_counter_ns()
+    for _ in range(NUM_SPANS):
+        with tracer.span("phase"):
+            pass
+    cost = (time.perf_counter_ns() - start) / NUM_SPANS
+    tracer.clear()
+    return cost
+
+def generate_loop(llm, prompt_template, prefix, enabled):
+    tracer.enabled = enabled
+    start = time.perf_counter()
+    for step in range(NUM_STEPS):
+        names = SAMPLE_OBJECT_NAMES[step % 4:step % 4 + 8]
+        observation = "Robot is holding: Nothing.\nNearby objects: " + ", ".join(names)
+        prompt = prompt_template.format(task_description="Turn on the switch.", observation=observation)
+        llm.generate(prompt, max_new_tokens=16, prefix=prefix)
+    return time.perf_counter() - start
+
+def main():
+    disabled_ns = span_cost_ns(False)
+    enabled_ns = span_cost_ns(True)
+    print(f"Span cost: {disabled_ns:.0f} ns disabled, {enabled_ns:.0f} ns enabled")
+
+    config.LLM_RESPONSE_CACHE = False # Measure generation, not cache lookups
+    model_dir = build_tiny_model("tiny_llama_tracing")
+    llm = LLM_API(model_path=model_dir, tokenizer_path=model_dir, quantization_bits=None)
+    with open(os.path.join(config.PROMPT_DIR, config.ACTION_PROMPT_TEMPLATE_NAME), 'r') as f:
+        prompt_template = f.read()
+    prefix = build_prompt_prefix(prompt_template, "Turn on the switch.")
+    generate_loop(llm, prompt_template, prefix, False) # Warm-up (prefix KV, allocator)
+
+    off = min(generate_loop(llm, prompt_template, prefix, False) for _ in range(3))
+    tracer.clear()
+    on = min(generate_loop(llm, prompt_template, prefix, True) for _ in range(3))
+    spans = tracer.spans()
+    per_step_ms = 1e3 * off / NUM_STEPS
+    print(f"\ngenerate(): {per_step_ms:.1f} ms/step off, {1e3 * on / NUM_STEPS:.1f} ms/step on "
+          f"(span bookkeeping: {len(spans) / 3 / NUM_STEPS:.0f} spans/step x {enabled_ns:.0f} ns = "
+          f"{100 * enabled_ns * len(spans) / 3 / NUM_STEPS / (per_step_ms * 1e6):.4f}% of step time)")
+    print_summary(summarize(spans))
+
+    out_dir = tempfile.mkdtemp(prefix="trace_")
+    tracer.export_chrome_trace(os.path.join(out_dir, "trace.json"), spans)
+    tracer.export_jsonl(os.path.join(out_dir, "trace.jsonl"), spans)
+    print(f"\nExported {len(spans)} spans to {out_dir}")
+
+if __name__ == "__main__":
+    main()
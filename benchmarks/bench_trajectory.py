@@ -0,0 +1,96 @@
+# benchmarks/bench_trajectory.py
+# Records agent-loop episodes over the fake simulator with TRAJECTORY_RECORDING on, then
+# reports the file size per step, the recording overhead per step, column read speed through
+# the memory-mapped reader, and replays every episode through OmniGibsonEnv.step (no LLM),
+# checking that action results and state deltas match the recording.
+# Run: python benchmarks/bench_trajectory.py [--episodes 20 --objects 300]
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+import fake_omnigibson
+import config
+from bench_agent_loop import StubLLM, task_objects
+from trajectory import TrajectoryRecorder, TrajectoryReader
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--task", default=config.DEFAULT_TASK)
+    parser.add_argument("--episodes", type=int, default=20)
+    parser.add_argument("--objects", type=int, default=300, help="Filler objects in the fake scene.")
+    args = parser.parse_args()
+
+    with open(os.path.join(REPO_DIR, config.TASK_CONFIG_DIR, f"{args.task}.yaml"), 'r') as f:
+        task = yaml.safe_load(f) or {}
+    goal_objects = task_objects(task)
+    fake_omnigibson.install(fake_omnigibson.BackendSpec(
+        num_objects=args.objects, task_objects=goal_objects, step_latency_s=0.0, reset_latency_s=0.0,
+    ))
+    config.TASK_CONFIG_DIR = os.path.join(REPO_DIR, config.TASK_CONFIG_DIR)
+    config.PROMPT_DIR = os.path.join(REPO_DIR, config.PROMPT_DIR)
+    work_dir = tempfile.mkdtemp(prefix="trajectory_")
+    config.ENV_CONFIG_PATH = os.path.join(work_dir, "fake_env.yaml")
+    with open(config.ENV_CONFIG_PATH, 'w') as f:
+        yaml.safe_dump({"scene": {"type": "InteractiveTraversableScene", "scene_model": task.get('scene_id', config.DEFAULT_SCENE_ID)}, "robots": [{"type": "Fetch"}]}, f)
+    config.TOKENIZER_PATH = None
+    config.SKILL_LIBRARY = False
+    config.TRAJECTORY_RECORDING = True
+    config.TRAJECTORY_DIR = work_dir
+
+    from run_voyager_omnigibson import run_agent
+    # A failed action first (unknown object), then the plan, so the file has both outcomes
+    actions = ["toggle_object('no_such_object')"]
+    actions += [action for name in goal_objects for action in (f"navigate_to_object('{name}')", f"toggle_object('{name}')")]
+    llm = StubLLM(actions, prefill_s=0.0, tokens_per_s=1e9)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_agent(llm=llm, task_names=[args.task] * args.episodes)
+    path = next(os.path.join(work_dir, name) for name in os.listdir(work_dir) if name.endswith(".vtraj"))
+    steps = sum(r["steps"] for r in results)
+    size = os.path.getsize(path)
+    print(f"Recorded {len(results)} episodes, {steps} steps: {size} bytes ({size / max(steps, 1):.0f} bytes/step)")
+
+    # Recording cost per step, replaying the recorded rows into a fresh recorder
+    reader = TrajectoryReader(path)
+    rows = reader.rows(0, len(reader))
+    recorder = TrajectoryRecorder(os.path.join(work_dir, "overhead.vtraj"), chunk_rows=config.TRAJECTORY_CHUNK_ROWS)
+    info = {'action_success': True, 'action_message': "ok", 'parsed_function': "toggle_object", 'parsed_args': ["switch"]}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for row in rows * 10:
+            recorder.record_step(row["action_code"], info, row["reward"], row["done"], None, row["step_wall_s"])
+        recorder.close()
+    print(f"Recording overhead: {1e6 * (time.perf_counter() - start) / (10 * len(rows)):.1f} us/step (incl. compression)")
+
+    reader.close()
+    start = time.perf_counter()
+    reader = TrajectoryReader(path)
+    reader.column("success"), reader.column("step_wall_s")
+    numeric_s = time.perf_counter() - start
+    start = time.perf_counter()
+    reader.column("action_code")
+    print(f"Read: open + 2 numeric columns {1e3 * numeric_s:.2f} ms, action_code column {1e3 * (time.perf_counter() - start):.2f} ms")
+
+    from trajectory_replay import replay_file
+    from run_voyager_omnigibson import build_env
+    config.TRAJECTORY_RECORDING = False
+    with contextlib.redirect_stdout(io.StringIO()):
+        env = build_env()
+        replayed = replay_file(env, reader)
+        env.close()
+    reader.close()
+    mismatches = sum(len(r["mismatches"]) for r in replayed)
+    print(f"Replayed {len(replayed)} episodes ({sum(r['steps'] for r in replayed)} steps) without the LLM: {mismatches} mismatches")
+    assert mismatches == 0, [r["mismatches"][:3] for r in replayed if r["mismatches"]]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# benchmarks/fake_omnigibson.py
+# CPU-only stand-in for the parts of OmniGibson (and octogibson.utils.action_utils) that
+# OmniGibsonInterface uses: og.Environment (scene.objects, scene.object_registry, robots,
+# step, reset, close), object_states, og.sim.dump_state/load_state, og.clear and gm.
+# Call install(...) before importing omnigibson_interface; per-call latencies and the
+# number of objects are configurable so the agent loop can be profiled without Isaac Sim.
+import pickle
+import random
+import string
+import sys
+import time
+import types
+
+import numpy as np
+
+STATE_NAMES = ["ToggledOn", "Open", "OnTop", "Inside", "Cooked", "Frozen", "Burnt", "Sliced", "Heated", "Saturated"]
+FILLER_CATEGORIES = [
+    "apple", "bowl", "cabinet", "chair", "countertop", "fridge", "lamp", "microwave", "mug", "plate",
+    "shelf", "sink", "sofa", "stove", "table", "television", "towel", "window", "book", "bottle",
+]
+# Which fake states filler objects of a category get (value = initial value)
+CATEGORY_STATES = {
+    "cabinet": {"Open": False}, "fridge": {"Open": False, "Frozen": False}, "microwave": {"Open": False, "ToggledOn": False},
+    "lamp": {"ToggledOn": False}, "stove": {"ToggledOn": False}, "television": {"ToggledOn": False},
+    "apple": {"Cooked": False, "Sliced": False}, "towel": {"Saturated": False},
+}
+
+class BackendSpec:
+    """Size and per-call latencies of the fake simulator (seconds)."""
+    def __init__(self, num_objects=300, task_objects=None, movable_fraction=0.3, scene_extent=20.0,
+                 env_init_latency_s=0.5, step_latency_s=0.01, reset_latency_s=0.5, state_get_latency_s=0.0,
+                 dump_state_latency_s=0.01, load_state_latency_s=0.01, render_latency_s=0.0, seed=0):
+        self.num_objects = num_objects
+        self.task_objects = task_objects or {} # name -> {state_name: initial value}, placed near the robot
+        self.movable_fraction = movable_fraction
+        self.scene_extent = scene_extent
+        self.env_init_latency_s = env_init_latency_s
+        self.step_latency_s = step_latency_s
+        self.reset_latency_s = reset_latency_s
+        self.state_get_latency_s = state_get_latency_s
+        self.dump_state_latency_s = dump_state_latency_s
+        self.load_state_latency_s = load_state_latency_s
+        self.render_latency_s = render_latency_s # Per rendered vision modality (everything but proprio)
+        self.seed = seed
+
+SPEC = BackendSpec()
+CALLS = {"step": 0, "reset": 0, "state_get": 0, "env_init": 0, "dump_state": 0, "load_state": 0, "render": 0}
+
+def _sleep(seconds):
+    if seconds > 0: time.sleep(seconds)
+
+# object_states: one class per state name; instances of FakeState are keyed by these classes
+object_states = types.ModuleType("omnigibson.object_states")
+for _name in STATE_NAMES:
+    setattr(object_states, _name, type(_name, (), {}))
+
+class FakeState:
+    def __init__(self, value):
+        self.value = value
+
+    def get_value(self):
+        CALLS["state_get"] += 1
+        _sleep(SPEC.state_get_latency_s)
+        return self.value
+
+    def set_value(self, value):
+        self.value = value
+        return True
+
+class FakeObject:
+    def __init__(self, name, category, position, states=None, fixed_base=True):
+        self.name = name
+        self.category = category
+        self.fixed_base = fixed_base
+        self._position = np.array(position, dtype=float)
+        self._orientation = np.array([0.0, 0.0, 0.0, 1.0])
+        self.states = {getattr(object_states, k): FakeState(v) for k, v in (states or {}).items()}
+
+    def get_position_orientation(self):
+        return self._position.copy(), self._orientation.copy()
+
+    def set_position(self, position):
+        self._position = np.array(position, dtype=float)
+
+    def set_position_orientation(self, position, orientation):
+        self._position = np.array(position, dtype=float)
+        self._orientation = np.array(orientation, dtype=float)
+
+class FakeRobot(FakeObject):
+    """Differential-drive base (action[0:2] = linear, angular command in [-1, 1]) plus a gripper."""
+    MAX_LINEAR_SPEED = 1.0 # m/s
+    MAX_ANGULAR_SPEED = 1.5 # rad/s
+
+    def __init__(self, name="robot0", action_dim=11, obs_modalities=("rgb", "proprio")):
+        super().__init__(name, "robot", [0.0, 0.0, 0.0], fixed_base=False)
+        self.action_dim = action_dim
+        self.obs_modalities = list(obs_modalities)
+        self._pending_action = np.zeros(action_dim)
+        self.controller_action_idx = {"base": np.array([0, 1]), "arm_0": np.arange(2, action_dim - 1), "gripper_0": np.array([action_dim - 1])}
+        self._yaw = 0.0
+
+    def apply_base_action(self, action, dt):
+        self._yaw += float(np.clip(action[1], -1, 1)) * self.MAX_ANGULAR_SPEED * dt
+        speed = float(np.clip(action[0], -1, 1)) * self.MAX_LINEAR_SPEED * dt
+        self._position[:2] += speed * np.array([np.cos(self._yaw), np.sin(self._yaw)])
+        self._orientation = np.array([0.0, 0.0, np.sin(self._yaw / 2.0), np.cos(self._yaw / 2.0)])
+
+    def set_position_orientation(self, position, orientation):
+        super().set_position_orientation(position, orientation)
+        x, y, z, w = self._orientation
+        self._yaw = float(np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z)))
+
+    def apply_action(self, action):
+        self._pending_action = np.asarray(action, dtype=float)
+
+    def get_obs(self):
+        """({sensor: {modality: array}}, info); vision modalities cost a render each."""
+        obs = {}
+        vision = [m for m in self.obs_modalities if m != "proprio"]
+        if vision: obs[f"{self.name}:eyes:Camera:0"] = {m: np.zeros((4, 4)) for m in vision}
+        if "proprio" in self.obs_modalities: obs["proprio"] = np.concatenate([self._position, self._orientation])
+        return obs, {}
+
+    def get_eef_position(self):
+        return self._position + np.array([0.5 * np.cos(self._yaw), 0.5 * np.sin(self._yaw), 1.0])
+
+class FakeScene:
+    def __init__(self, objects):
+        self.objects = objects
+        self._by_name = {obj.name: obj for obj in objects}
+
+    def object_registry(self, key, value):
+        if key != "name": raise ValueError(f"Fake registry only supports lookups by name, not {key!r}")
+        return self._by_name.get(value)
+
+def _build_objects(spec, rng):
+    objects = []
+    for i, (name, states) in enumerate(spec.task_objects.items()):
+        category = name.rsplit('_', 2)[0] if name.count('_') >= 2 else name
+        objects.append(FakeObject(name, category, [1.0 + 0.3 * i, 1.0, 0.5], states))
+    for i in range(spec.num_objects):
+        category = FILLER_CATEGORIES[i % len(FILLER_CATEGORIES)]
+        position = [rng.uniform(-spec.scene_extent, spec.scene_extent), rng.uniform(-spec.scene_extent, spec.scene_extent), rng.uniform(0.0, 2.0)]
+        objects.append(FakeObject(
+            f"{category}_{''.join(rng.choice(string.ascii_lowercase) for _ in range(6))}_{i % 2}", category, position, CATEGORY_STATES.get(category),
+            fixed_base=rng.random() >= spec.movable_fraction,
+        ))
+    return objects
+
+class FakeEnvironment:
+    """og.Environment stand-in. step() jitters movable objects; reset() restores initial poses/states."""
+    def __init__(self, configs=None):
+        CALLS["env_init"] += 1
+        _sleep(SPEC.env_init_latency_s)
+        self.configs = configs
+        self._dt = float((configs or {}).get('action_timestep', 1.0 / 60.0))
+        self._rng = random.Random(SPEC.seed)
+        robot_cfgs = (configs or {}).get('robots') or [{}]
+        self.robot = FakeRobot(obs_modalities=robot_cfgs[0].get('obs_modalities', ("rgb", "proprio")))
+        self.robots = [self.robot]
+        self.scene = FakeScene([self.robot] + _build_objects(SPEC, self._rng))
+        self._movable = [obj for obj in self.scene.objects if not obj.fixed_base and obj is not self.robot]
+        self._initial = _dump(self.scene)
+        sim.env = self
+
+    def step(self, action):
+        """Applies action, steps physics, renders and reads every sensor (like og.Environment.step)."""
+        self.robot.apply_action(action)
+        self._physics_step()
+        sim.render()
+        obs, _ = self.robot.get_obs()
+        return {self.robot.name: obs}, 0.0, False, False, {}
+
+    def _physics_step(self):
+        CALLS["step"] += 1
+        _sleep(SPEC.step_latency_s)
+        self.robot.apply_base_action(self.robot._pending_action, self._dt)
+        for obj in self._movable[:8]: # A few objects settle a little every physics step
+            obj._position += np.array([self._rng.uniform(-1e-3, 1e-3), self._rng.uniform(-1e-3, 1e-3), 0.0])
+
+    def reset(self):
+        CALLS["reset"] += 1
+        _sleep(SPEC.reset_latency_s)
+        _load(self.scene, self._initial)
+        return {}, {}
+
+    def close(self):
+        if sim.env is self: sim.env = None
+
+def _dump(scene):
+    return [(obj._position.copy(), {cls.__name__: s.value for cls, s in obj.states.items()}) for obj in scene.objects]
+
+def _load(scene, state):
+    for obj, (position, values) in zip(scene.objects, state):
+        obj._position = position.copy()
+        for state_name, value in values.items(): obj.states[getattr(object_states, state_name)].value = value
+
+class _FakeSim:
+    env = None
+
+    def step(self, render=True):
+        self.env._physics_step()
+        if render: self.render()
+
+    def render(self):
+        CALLS["render"] += 1
+        _sleep(SPEC.render_latency_s * len([m for m in self.env.robot.obs_modalities if m != "proprio"]))
+
+    def dump_state(self, serialized=False):
+        CALLS["dump_state"] += 1
+        _sleep(SPEC.dump_state_latency_s)
+        state = _dump(self.env.scene)
+        return pickle.dumps(state) if serialized else state
+
+    def load_state(self, state, serialized=False):
+        CALLS["load_state"] += 1
+        _sleep(SPEC.load_state_latency_s)
+        _load(self.env.scene, pickle.loads(state) if serialized else state)
+
+sim = _FakeSim()
+
+def clear():
+    if sim.env is not None: sim.env.close()
+
+def change_states(obj, state_kind, value):
+    """octogibson.utils.action_utils.change_states stand-in (only 'toggleable' and 'openable')."""
+    state_name = {"toggleable": "ToggledOn", "openable": "Open"}[state_kind]
+    obj.states[getattr(object_states, state_name)].set_value(bool(value))
+
+def install(spec=None):
+    """Registers the fake omnigibson/octogibson modules in sys.modules; returns the active spec."""
+    global SPEC
+    if spec is not None: SPEC = spec
+    og = types.ModuleType("omnigibson")
+    og.Environment = FakeEnvironment
+    og.object_states = object_states
+    og.sim = sim
+    og.clear = clear
+    macros = types.ModuleType("omnigibson.macros")
+    macros.gm = types.SimpleNamespace(DATASET_PATH="", HEADLESS=True)
+    og.macros = macros
+    octo = types.ModuleType("octogibson")
+    octo_utils = types.ModuleType("octogibson.utils")
+    action_utils = types.ModuleType("octogibson.utils.action_utils")
+    action_utils.change_states = change_states
+    octo.utils = octo_utils
+    octo_utils.action_utils = action_utils
+    sys.modules.update({
+        "omnigibson": og, "omnigibson.object_states": object_states, "omnigibson.macros": macros,
+        "octogibson": octo, "octogibson.utils": octo_utils, "octogibson.utils.action_utils": action_utils,
+    })
+    return SPEC
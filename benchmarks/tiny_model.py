@@ -0,0 +1,107 @@
+# benchmarks/tiny_model.py
+# Builds a tiny, randomly initialized Llama checkpoint and a byte-level BPE tokenizer
+# trained on the prompt templates, entirely offline. The weights are meaningless, but
+# greedy decoding is deterministic, which is all the CPU benchmarks need to compare
+# an optimized generation path against the plain one.
+import os
+import glob
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT_DIR = os.path.join(REPO_ROOT, "benchmarks", ".tiny_models")
+
+SAMPLE_OBJECT_NAMES = [
+    "electric_switch_wseglt_0", "bottom_cabinet_bamfsz_0", "fridge_dszchb_0", "sink_zexzrc_0",
+    "countertop_tpuwys_0", "apple_agveuv_0", "bowl_ajzltc_0", "floor_lamp_vdxlda_0",
+    "breakfast_table_skczfi_0", "chair_vkgbbl_1", "door_ohagsq_0", "microwave_hjjxmi_0",
+]
+
+def default_corpus():
+    """Prompt templates plus synthetic observations and action calls."""
+    corpus = []
+    for path in glob.glob(os.path.join(REPO_ROOT, "prompts", "*.txt")):
+        with open(path, 'r') as f:
+            corpus.append(f.read())
+    for i, name in enumerate(SAMPLE_OBJECT_NAMES):
+        corpus.append(f"Nearby objects: {name} (toggled=off) [{i * 0.3:.1f}m], {name} (open=true) [{i * 0.2:.1f}m]")
+        corpus.append(f"navigate_to_object('{name}')\ntoggle_object('{name}')\npick_up_object('{name}')")
+        corpus.append(f"place_object_on('{name}', '{SAMPLE_OBJECT_NAMES[-1 - i]}')")
+        corpus.append(f"Robot is at position ({i:.2f}, {-i:.2f}).\nRobot is holding: Nothing.")
+    return corpus * 4
+
+def build_tokenizer(out_dir, vocab_size=1024, corpus=None):
+    from tokenizers import Tokenizer, models, trainers, pre_tokenizers, decoders
+    from transformers import PreTrainedTokenizerFast
+
+    if os.path.exists(os.path.join(out_dir, "tokenizer.json")):
+        return PreTrainedTokenizerFast.from_pretrained(out_dir)
+    tokenizer = Tokenizer(models.BPE(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        special_tokens=["<s>", "</s>", "<unk>"],
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(corpus or default_corpus(), trainer)
+    fast_tokenizer = PreTrainedTokenizerFast(tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", unk_token="<unk>")
+    fast_tokenizer.save_pretrained(out_dir)
+    return fast_tokenizer
+
+def build_tiny_model(name="tiny_llama", hidden_size=256, num_layers=4, seed=0, tokenizer_dir=None, out_root=DEFAULT_OUT_DIR):
+    """Returns the directory of a tiny Llama checkpoint (with tokenizer), creating it if needed.
+
+    Models built with the same tokenizer_dir share a vocabulary (needed for draft models).
+    """
+    import torch
+    from transformers import LlamaConfig, LlamaForCausalLM
+
+    out_dir = os.path.join(out_root, name)
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = build_tokenizer(tokenizer_dir or out_dir)
+    if tokenizer_dir: tokenizer.save_pretrained(out_dir)
+    if os.path.exists(os.path.join(out_dir, "config.json")):
+        return out_dir
+
+    torch.manual_seed(seed)
+    model_config = LlamaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=hidden_size,
+        intermediate_size=hidden_size * 2,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=4096,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+    )
+    LlamaForCausalLM(model_config).save_pretrained(out_dir)
+    return out_dir
+
+def build_draft_pair(name="tiny_llama_spec", hidden_size=768, num_layers=16, draft_layers=2, residual_scale=0.05):
+    """Returns (main_dir, draft_dir): a tiny main model and a draft made of its first draft_layers layers.
+
+    Random weights give a draft that almost never agrees with the main model, so the main
+    model's later layers are scaled down (residual_scale) until the truncated copy predicts
+    mostly the same tokens, like a well-matched real model pair.
+    """
+    import torch
+    from transformers import LlamaForCausalLM
+
+    main_dir = os.path.join(DEFAULT_OUT_DIR, f"{name}_main")
+    draft_dir = os.path.join(DEFAULT_OUT_DIR, f"{name}_draft")
+    if os.path.exists(os.path.join(main_dir, "config.json")) and os.path.exists(os.path.join(draft_dir, "config.json")):
+        return main_dir, draft_dir
+    base_dir = build_tiny_model(f"{name}_base", hidden_size=hidden_size, num_layers=num_layers)
+    tokenizer = build_tokenizer(base_dir)
+    model = LlamaForCausalLM.from_pretrained(base_dir)
+    with torch.no_grad():
+        for layer in model.model.layers[draft_layers:]:
+            layer.self_attn.o_proj.weight.mul_(residual_scale)
+            layer.mlp.down_proj.weight.mul_(residual_scale)
+    model.save_pretrained(main_dir)
+    tokenizer.save_pretrained(main_dir)
+    model.model.layers = model.model.layers[:draft_layers]
+    model.config.num_hidden_layers = draft_layers
+    model.save_pretrained(draft_dir)
+    tokenizer.save_pretrained(draft_dir)
+    return main_dir, draft_dir
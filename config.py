@@ -6,6 +6,9 @@ import os
 # (Ensure task, reset_joint_pos, kv are commented out for now)
 ENV_CONFIG_PATH = "octogibson/config/Octogibson.yaml"
 DEFAULT_SCENE_ID = "Merom_1_int" # Defined in the YAML
+SENSOR_MODALITIES = None # None = keep the YAML's robot obs_modalities; e.g. ["rgb"] overrides them for every robot (observations are text, unused sensors still cost rendering)
+LAZY_RENDERING = True # Step physics without rendering; sensors are rendered only when get_frame() is called
+SCENE_STATE_RESTORE = True # Restore an in-memory post-stabilization scene state instead of env.reset() per episode
 
 # --- Task ---
 TASK_CONFIG_DIR = "tasks"
@@ -16,30 +19,118 @@ DEFAULT_TASK = "turn_on_light" # Corresponds to turn_on_light.yaml
 TOKENIZER_PATH = "/scratch/rnsimhad/deepseek_tokenizer"
 MODEL_PATH = "/hf_cache/models--deepseek-ai--DeepSeek-R1-Distill-Llama-70B/snapshots/b1c0b44b4369b597ad119a196caf79a9c40e141e" # <--- UPDATE HASH
 QUANTIZATION_BITS = 4 # Or 8 or None
+LLM_BACKEND = "hf" # "hf" (transformers + bitsandbytes), "cpu_int8" (dynamic int8 on CPU) or "auto" (hf with a GPU, else cpu_int8); see llm_backends.py
+LLM_CPU_THREADS = None # cpu_int8 intra-op threads; None = all CPUs available to the process
+LLM_CPU_INTEROP_THREADS = 1 # cpu_int8 inter-op threads (generate() runs ops one at a time)
+LLM_PREFIX_CACHE = True # Reuse the prefilled KV cache of the static prompt prefix across steps
+LLM_PREFIX_CACHE_MAX_ENTRIES = 2 # Prefixes kept (one per task); least recently used is evicted
+LLM_PREFIX_CACHE_MAX_MB = 4096 # Upper bound on cached KV memory
+LLM_CONSTRAINED_DECODING = True # Mask logits to valid action calls over observed objects; stop at ')'
+LLM_RESPONSE_CACHE = True # Reuse responses to identical prompts (generation is greedy/deterministic)
+LLM_RESPONSE_CACHE_PATH = "cache/llm_responses.sqlite" # On-disk tier; None = in-memory only
+LLM_RESPONSE_CACHE_MEMORY_ENTRIES = 1024
+LLM_RESPONSE_CACHE_MAX_MB = 256
+LLM_DRAFT_MODEL_PATH = None # Small model sharing the tokenizer for speculative decoding (e.g. a 1B of the same family); None = off
+LLM_DRAFT_NUM_TOKENS = 5 # Initial draft tokens proposed per main-model pass (adapted during generation)
+LLM_MAX_PROMPT_TOKENS = 4000 # Longer prompts are cut from the front (with a warning) so "Your Action:" survives
+
+# --- LLM Server (optional; see llm_server.py) ---
+LLM_SERVER_ADDRESS = None # e.g. "/tmp/voyager_llm.sock" (Unix socket) or ("localhost", 6000); None = load model in-process
+LLM_SERVER_AUTHKEY_ENV = "VOYAGER_LLM_AUTHKEY" # Environment variable holding the server/client authkey
+LLM_SERVER_AUTHKEY_FILE = "cache/llm_server_authkey" # Else: read from this file, generated (mode 0600) by the server; None = env var only
+LLM_SERVER_MAX_BATCH_SIZE = 8
+LLM_SERVER_BATCH_WINDOW_MS = 20 # How long the server waits for more requests to batch with the first
 
 # --- Prompts ---
 PROMPT_DIR = "prompts"
 ACTION_PROMPT_TEMPLATE_NAME = "basic_action_prompt.txt"
+PROGRAM_PROMPT_TEMPLATE_NAME = "program_action_prompt.txt" # Used when ACTION_PROGRAM_MODE is on
+
+# --- Skill Library (see skill_library.py) ---
+SKILL_LIBRARY = True # Replay verified action sequences for known goals before asking the LLM
+SKILL_LIBRARY_PATH = "cache/skills.sqlite"
+SKILL_SIMILARITY_THRESHOLD = 0.85 # Min goal-token Jaccard similarity for a non-exact match (same scene only)
+SKILL_MAX_CANDIDATES = 2 # Skills tried per episode before falling back to the LLM
+SKILL_MAX_FAILURES = 3 # Consecutive failed replays after which a skill is dropped
+
+# --- Action Primitives (see action_primitives.py) ---
+PRIMITIVE_NAV_MAX_TICKS = 1800 # Tick budget for driving to an object (30 s at 60 Hz)
+PRIMITIVE_NAV_STOP_DISTANCE = 1.0 # Planar distance (m) at which navigation stops
+PRIMITIVE_NAV_DRIVE_GAIN = 2.0 # Base linear command per metre of remaining distance (clipped to [0, 1])
+PRIMITIVE_NAV_TURN_GAIN = 2.0 # Base angular command per radian of heading error (clipped to [-1, 1])
+PRIMITIVE_REACH_DISTANCE = 1.2 # Pick/place navigate first if the target is farther than this
+PRIMITIVE_GRASP_TICKS = 20 # Gripper-closing ticks for a pick
+PRIMITIVE_SETTLE_TICKS = 30 # Max ticks for a placed object (or teleported robot) to settle
+PRIMITIVE_PLACE_HEIGHT = 0.05 # Drop height (m) above the surface's top
+
+# --- Observation ---
+OBSERVATION_MAX_DISTANCE = 4.0 # Objects closer than this (meters) are listed in the observation
+SPATIAL_INDEX_CELL_SIZE = 4.0 # Grid cell size (meters) for bucketing static objects
+SNAPSHOT_STATES = ["ToggledOn", "Open", "Cooked", "Frozen"] # object_states read once per step into the WorldSnapshot; shown if in observation_builder.STATE_FORMATS
+OBSERVATION_TOKEN_BUDGET = 400 # Max tokens of the observation (LLM tokenizer); objects are ranked by goal relevance and distance. None = unlimited
+OBSERVATION_SHORT_NAMES = True # Show 'lamp_0' for 'lamp_xzwqvb_0' when unambiguous in the scene; actions accept both
+OBSERVATION_MODE = "full" # "full": every nearby object each step; "delta": goal objects plus changes since the last step
+OBSERVATION_FULL_EVERY = 5 # In delta mode, every Nth observation is a full one (the first of a task always is)
+OBJECT_NAME_FUZZY = True # Actions accept near-miss names (no suffix, category, typos) resolved to the nearest matching instance (see name_index.py)
+OBJECT_NAME_MAX_EDIT_RATIO = 0.25 # Max edit distance of a fuzzy name match, as a fraction of the name's length
 
 # --- Agent ---
+PARALLEL_STARTUP = True # Load the LLM in a background thread while the simulator starts (see run_voyager_omnigibson.init_components)
 MAX_STEPS_PER_TASK = 20 # Reduced steps for initial testing
 LLM_MAX_NEW_TOKENS = 50
+ACTION_PROGRAM_MODE = False # Ask for a short program (several calls) per LLM call instead of a single action
+ACTION_PROGRAM_MAX_CALLS = 6 # Max calls per program
+PROGRAM_MAX_NEW_TOKENS = 200 # Generation budget per program
+
+# --- Parallel Runner (see parallel_runner.py) ---
+PARALLEL_NUM_WORKERS = 2 # Worker processes, each with its own simulator instance
+PARALLEL_EPISODE_TIMEOUT_S = 1800 # Episodes running longer are killed and recorded as timeouts
+PARALLEL_MAX_RESTARTS = 4 # Total crashed/timed-out worker restarts allowed per run
+PARALLEL_START_METHOD = "spawn" # Fresh interpreters; forking a live simulator is unsafe
+
+# --- Task Suite (see suite_runner.py) ---
+SUITE_PREFETCH_SCENE_FILES = True # Warm the OS page cache with the next scene's files in the background
+SUITE_PREFETCH_MAX_MB = 2048 # Upper bound on bytes read per prefetched scene
+
+# --- Async Runner (see async_runner.py) ---
+ASYNC_IDLE_SIM_STEPS = 10 # Max zero-action physics steps run while the LLM decodes each decision
+ASYNC_LLM_CONCURRENCY = 1 # Concurrent generate() calls; >1 only makes sense with the LLM server
+
+# --- Trajectory Recording (see trajectory.py, trajectory_replay.py) ---
+TRAJECTORY_RECORDING = False # Append every env step (action, result, robot pose, state delta, timings) to a columnar file
+TRAJECTORY_DIR = "trajectories" # One .vtraj file per process run
+TRAJECTORY_CHUNK_ROWS = 256 # Steps buffered per compressed chunk
+TRAJECTORY_COMPRESSION_LEVEL = 6 # zlib level per column
+
+# --- Event Log (see event_log.py) ---
+LOG_CONSOLE_LEVEL = "INFO" # "DEBUG" (also full observations, prompts, step info), "INFO", "WARN", "ERROR" or None
+LOG_FILE_LEVEL = "INFO" # Level written to the per-episode JSONL files; None = no files
+LOG_DIR = "logs" # One directory per run with <task>_<n>.jsonl per episode; None = console only
+LOG_QUEUE_SIZE = 10000 # Records buffered for the writer thread
+LOG_FLUSH_INTERVAL_S = 0.05 # Writer thread drains the queue this often (console/file output lags by up to this)
+LOG_DROP_POLICY = "drop" # Queue full: "drop" discards DEBUG/INFO records (WARN/ERROR wait); "block" always waits
+
+# --- Tracing (see tracing.py) ---
+TRACE_ENABLED = False # Record per-phase step spans (tokenize, prefill, decode, parse, execute_action, ...)
+TRACE_BUFFER_SIZE = 65536 # Ring buffer capacity in spans; oldest are overwritten
+TRACE_DIR = "traces" # Chrome trace (.json) and JSONL exports
 
 # --- YAML Workarounds ---
 # These settings are problematic in the default OctoGibson YAML for this OmniGibson version
 # and should be commented out in the loaded ENV_CONFIG_PATH file.
 YAML_COMMENT_OUT = ["task:", "reset_joint_pos:", "kv:"]
 
-# Verification
-if not os.path.exists(ENV_CONFIG_PATH):
-    raise FileNotFoundError(f"Environment config file not found at: {ENV_CONFIG_PATH}")
-if not os.path.exists(TOKENIZER_PATH):
-     raise FileNotFoundError(f"Tokenizer not found at: {TOKENIZER_PATH}")
-if not os.path.exists(os.path.dirname(MODEL_PATH)): # Check model directory
-     raise FileNotFoundError(f"Model directory not found at: {os.path.dirname(MODEL_PATH)}")
-if not os.path.exists(PROMPT_DIR):
-     os.makedirs(PROMPT_DIR)
-if not os.path.exists(TASK_CONFIG_DIR):
-     os.makedirs(TASK_CONFIG_DIR)
-
-print("DEBUG [config.py]: Config loaded. Ensure problematic keys are commented in YAML.")
+# Verification (called by entry points that need the real simulator/model, not at import,
+# so modules can be imported and benchmarked without them)
+def verify_paths(check_env=True, check_llm=True):
+    if check_env and not os.path.exists(ENV_CONFIG_PATH):
+        raise FileNotFoundError(f"Environment config file not found at: {ENV_CONFIG_PATH}")
+    if check_llm and not os.path.exists(TOKENIZER_PATH):
+         raise FileNotFoundError(f"Tokenizer not found at: {TOKENIZER_PATH}")
+    if check_llm and not os.path.exists(os.path.dirname(MODEL_PATH)): # Check model directory
+         raise FileNotFoundError(f"Model directory not found at: {os.path.dirname(MODEL_PATH)}")
+    if not os.path.exists(PROMPT_DIR):
+         os.makedirs(PROMPT_DIR)
+    if not os.path.exists(TASK_CONFIG_DIR):
+         os.makedirs(TASK_CONFIG_DIR)
+    print("DEBUG [config.py]: Config loaded. Ensure problematic keys are commented in YAML.")
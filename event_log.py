@@ -0,0 +1,190 @@
+# event_log.py
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+import config
+
+DEBUG, INFO, WARN, ERROR = 10, 20, 30, 40
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARN": WARN, "ERROR": ERROR}
+_LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+_OFF = 100 # Above every level
+
+def _level(name):
+    return _OFF if name is None else LEVELS[name.upper()]
+
+class EventLogger:
+    """Structured event log written by a background thread: console lines and JSONL files.
+
+    `log.info("event_name", "Message with {field}", field=value)` costs a level comparison
+    when INFO is off; otherwise a tuple is queued and nothing is formatted or serialized on
+    the calling thread. Values are formatted later, so pass copies of containers that the
+    caller mutates afterwards. Records go to the console (config.LOG_CONSOLE_LEVEL) and, if
+    config.LOG_DIR is set, to one JSONL file per episode (begin_episode, per thread or asyncio
+    task) under a per-run directory, or run.jsonl outside episodes (config.LOG_FILE_LEVEL).
+
+    The queue is a deque bounded at config.LOG_QUEUE_SIZE. The writer drains it every
+    config.LOG_FLUSH_INTERVAL_S, so an enabled call is an append; callers only wake the writer
+    early once the queue is half full. When the queue is full, DEBUG/INFO records are dropped
+    and counted under the "drop" policy, while WARN/ERROR (and everything under "block") wait
+    for room.
+    """
+    def __init__(self, console_level=config.LOG_CONSOLE_LEVEL, file_level=config.LOG_FILE_LEVEL, log_dir=config.LOG_DIR,
+                 queue_size=config.LOG_QUEUE_SIZE, drop_policy=config.LOG_DROP_POLICY, flush_interval_s=config.LOG_FLUSH_INTERVAL_S):
+        self.console_level = _level(console_level)
+        self.file_level = _level(file_level) if log_dir else _OFF
+        self.level = min(self.console_level, self.file_level) # Records below this are not even queued
+        self.log_dir = log_dir
+        self.drop_policy = drop_policy
+        self.run_dir = None # Created on the first file write
+        self.queue_size = queue_size
+        self.flush_interval_s = flush_interval_s
+        self._wake_at = max(1, queue_size // 2)
+        self._records = deque() # append/popleft are atomic; no lock on the calling thread
+        self._wakeup = threading.Event()
+        self._writer_waiting = False
+        self._episode = contextvars.ContextVar(f"event_log_episode_{id(self)}", default=None) # Per thread and per asyncio task
+        self._episode_counter = itertools.count()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._files = {} # episode (None = run-level) -> open file, owned by the writer thread
+        self.stats = {"dropped": 0, "written": 0}
+
+    def enabled_for(self, level):
+        """Guard for building expensive fields: `if log.enabled_for(DEBUG): log.debug(...)`."""
+        return level >= self.level
+
+    def debug(self, event, msg=None, **fields):
+        if DEBUG >= self.level: self._emit(DEBUG, event, msg, fields)
+
+    def info(self, event, msg=None, **fields):
+        if INFO >= self.level: self._emit(INFO, event, msg, fields)
+
+    def warn(self, event, msg=None, **fields):
+        if WARN >= self.level: self._emit(WARN, event, msg, fields)
+
+    def error(self, event, msg=None, **fields):
+        if ERROR >= self.level: self._emit(ERROR, event, msg, fields)
+
+    def begin_episode(self, name):
+        """Routes this thread's (or asyncio task's) records to a new <name>_<n>.jsonl until end_episode(). Returns the episode id."""
+        episode = f"{name}_{next(self._episode_counter):04d}"
+        self._episode.set(episode)
+        return episode
+
+    def end_episode(self):
+        episode = self._episode.get()
+        self._episode.set(None)
+        if episode is not None and self._thread is not None: self._put(("close", episode))
+
+    def _emit(self, level, event, msg, fields):
+        if self._thread is None: self._start()
+        records = self._records
+        if len(records) >= self._wake_at: # Writer is behind: wake it, and wait for or drop on a full queue
+            if self._writer_waiting: self._wakeup.set()
+            if len(records) >= self.queue_size:
+                if self.drop_policy == "drop" and level < WARN:
+                    self.stats["dropped"] += 1
+                    return
+                while len(records) >= self.queue_size and self._thread is not None: time.sleep(0.001)
+        records.append((time.time(), level, event, msg, fields, self._episode.get()))
+
+    def _put(self, item):
+        """Queues a control item and wakes the writer for it."""
+        self._records.append(item)
+        self._wakeup.set()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+
+    # --- Writer thread ---
+    def _next(self):
+        while True:
+            try:
+                return self._records.popleft()
+            except IndexError:
+                self._flush_files() # Queue drained: push buffered output out
+                self._writer_waiting = True
+                if not self._records: self._wakeup.wait(self.flush_interval_s)
+                self._writer_waiting = False
+                self._wakeup.clear()
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item[0] == "flush":
+                self._flush_files()
+                item[1].set()
+            elif item[0] == "close":
+                f = self._files.pop(item[1], None)
+                if f is not None: f.close()
+            elif item[0] == "stop":
+                self._flush_files()
+                for f in self._files.values(): f.close()
+                self._files.clear()
+                item[1].set()
+                return
+            else:
+                try:
+                    self._write(item)
+                except Exception as e: # Never let a bad record kill the writer
+                    print(f"WARN: event log could not write '{item[2]}': {e}", file=sys.stderr)
+
+    def _write(self, record):
+        t, level, event, msg, fields, episode = record
+        text = None
+        if level >= self.console_level:
+            text = self._format(event, msg, fields)
+            prefix = "" if level < WARN else f"{_LEVEL_NAMES[level]}: "
+            sys.stdout.write(f"{prefix}{text}\n")
+        if level >= self.file_level:
+            entry = {"time": round(t, 6), "level": _LEVEL_NAMES[level], "event": event}
+            if msg is not None: entry["message"] = text if text is not None else self._format(event, msg, fields)
+            entry.update(fields)
+            self._file(episode).write(json.dumps(entry, default=repr) + "\n")
+        self.stats["written"] += 1
+
+    @staticmethod
+    def _format(event, msg, fields):
+        if msg is None: return f"{event} " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return msg.format(**fields) if fields else msg
+
+    def _file(self, episode):
+        f = self._files.get(episode)
+        if f is None:
+            if self.run_dir is None:
+                self.run_dir = os.path.join(self.log_dir, f"{time.strftime('run_%Y%m%d_%H%M%S')}_{os.getpid()}")
+                os.makedirs(self.run_dir, exist_ok=True)
+            f = self._files[episode] = open(os.path.join(self.run_dir, f"{episode or 'run'}.jsonl"), "a", encoding="utf-8")
+        return f
+
+    def _flush_files(self):
+        sys.stdout.flush()
+        for f in self._files.values(): f.flush()
+
+    # --- Control ---
+    def flush(self, timeout=None):
+        """Blocks until everything queued so far is written."""
+        if self._thread is None: return
+        done = threading.Event()
+        self._put(("flush", done))
+        done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        if self._thread is None: return
+        done = threading.Event()
+        self._put(("stop", done))
+        done.wait(timeout)
+        self._thread = None
+
+log = EventLogger()
+atexit.register(log.close)
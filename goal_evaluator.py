@@ -0,0 +1,211 @@
+# goal_evaluator.py
+import operator
+from omnigibson import object_states
+
+# Numeric comparison operators allowed in a condition's optional 'op' field
+COMPARISON_OPS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le,
+    ">": operator.gt, ">=": operator.ge,
+}
+ALL_KEYS = ("all", "and") # Composite condition keys (lists / single nested condition)
+ANY_KEYS = ("any", "or")
+NOT_KEYS = ("not",)
+
+class _Node:
+    """Base of the compiled condition tree. Caches its last result per snapshot."""
+    cost = 1
+    depends = frozenset() # Object ids whose changes can flip this node's result
+    always_recheck = False # True if the result depends on state the snapshot does not track
+
+    def __init__(self):
+        self._cached = None
+
+    def evaluate(self, snapshot, changed_ids):
+        if (self._cached is not None and changed_ids is not None and not self.always_recheck
+                and self.depends.isdisjoint(changed_ids)):
+            return self._cached
+        self._cached = self._compute(snapshot, changed_ids)
+        return self._cached
+
+    def invalidate(self):
+        """Forgets cached results of this subtree (it was skipped, so they may be out of date)."""
+        self._cached = None
+
+    def _compute(self, snapshot, changed_ids):
+        raise NotImplementedError
+
+class _Constant(_Node):
+    cost = 0
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def _compute(self, snapshot, changed_ids):
+        return self.value
+
+class _StateCondition(_Node):
+    """Leaf: compares one object's state against a target value."""
+    def __init__(self, obj, obj_id, state_cls, op, target_value, tracked):
+        super().__init__()
+        self.obj = obj
+        self.obj_id = obj_id
+        self.state_cls = state_cls
+        self.op = op # None for boolean equality (the default ToggledOn/Open-style check)
+        self.target_value = target_value
+        self.always_recheck = obj_id is None or not tracked
+        self.cost = 1 if not self.always_recheck else 2 # Snapshot read vs simulator round-trip
+        self.depends = frozenset([obj_id]) if obj_id is not None else frozenset()
+
+    def _read(self, snapshot):
+        if not self.always_recheck:
+            value = snapshot.state_value(self.obj_id, self.state_cls)
+            if value is not None: return value
+        return self.obj.states[self.state_cls].get_value()
+
+    def _compute(self, snapshot, changed_ids):
+        try:
+            current_state_val = self._read(snapshot)
+            if self.op is None:
+                # Handle boolean comparison carefully (e.g., 1 == True, 0 == False)
+                return bool(current_state_val) == bool(self.target_value)
+            return COMPARISON_OPS[self.op](float(current_state_val), float(self.target_value))
+        except Exception as e:
+            print(f"ERROR checking state {self.state_cls.__name__} for {self.obj.name}: {e}")
+            return False
+
+class _AllOf(_Node):
+    def __init__(self, children):
+        super().__init__()
+        self.children = sorted(children, key=lambda c: c.cost) # Cheapest first for short-circuiting
+        self.cost = sum(c.cost for c in self.children)
+        self.depends = frozenset().union(*(c.depends for c in self.children))
+        self.always_recheck = any(c.always_recheck for c in self.children)
+
+    def invalidate(self):
+        super().invalidate()
+        for c in self.children: c.invalidate()
+
+    def _compute(self, snapshot, changed_ids):
+        return self._short_circuit(snapshot, changed_ids, stop_on=False)
+
+    def _short_circuit(self, snapshot, changed_ids, stop_on):
+        for i, c in enumerate(self.children):
+            if c.evaluate(snapshot, changed_ids) == stop_on:
+                # Children after i were not evaluated against this snapshot; their caches must not be reused
+                for skipped in self.children[i + 1:]: skipped.invalidate()
+                return stop_on
+        return not stop_on
+
+class _AnyOf(_AllOf):
+    def _compute(self, snapshot, changed_ids):
+        return self._short_circuit(snapshot, changed_ids, stop_on=True)
+
+class _Not(_Node):
+    def __init__(self, child):
+        super().__init__()
+        self.child = child
+        self.cost = child.cost
+        self.depends = child.depends
+        self.always_recheck = child.always_recheck
+
+    def invalidate(self):
+        super().invalidate()
+        self.child.invalidate()
+
+    def _compute(self, snapshot, changed_ids):
+        return not self.child.evaluate(snapshot, changed_ids)
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+def _composite_key(condition, keys):
+    return next((k for k in keys if k in condition), None) if isinstance(condition, dict) else None
+
+def goal_state_names(conditions):
+    """Collects every state type name referenced by (possibly nested) goal conditions."""
+    names = []
+    for condition in _as_list(conditions or []):
+        if not isinstance(condition, dict): continue
+        key = _composite_key(condition, ALL_KEYS + ANY_KEYS + NOT_KEYS)
+        if key: names.extend(goal_state_names(condition[key]))
+        elif condition.get('type'): names.append(condition['type'])
+    return names
+
+def goal_object_names(conditions):
+    """Collects every object name referenced by (possibly nested) goal conditions."""
+    names = []
+    for condition in _as_list(conditions or []):
+        if not isinstance(condition, dict): continue
+        key = _composite_key(condition, ALL_KEYS + ANY_KEYS + NOT_KEYS)
+        if key: names.extend(goal_object_names(condition[key]))
+        elif condition.get('object_name'): names.append(condition['object_name'])
+    return names
+
+class GoalEvaluator:
+    """Goal conditions compiled once per task into a tree of resolved object/state accessors.
+
+    A task's goal_conditions list is an implicit AND. Besides leaf conditions
+    ({type, object_name, target_value, op}), entries may be {all|and: [...]},
+    {any|or: [...]} or {not: {...}}. evaluate() only recomputes conditions whose
+    objects changed since the snapshot it last saw.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._last_seq = None
+
+    @classmethod
+    def compile(cls, goal_conditions, snapshot, find_object):
+        return cls(_AllOf([cls._compile_node(c, snapshot, find_object) for c in _as_list(goal_conditions or [])]))
+
+    @classmethod
+    def _compile_node(cls, condition, snapshot, find_object):
+        key = _composite_key(condition, ALL_KEYS)
+        if key: return _AllOf([cls._compile_node(c, snapshot, find_object) for c in _as_list(condition[key])])
+        key = _composite_key(condition, ANY_KEYS)
+        if key: return _AnyOf([cls._compile_node(c, snapshot, find_object) for c in _as_list(condition[key])])
+        key = _composite_key(condition, NOT_KEYS)
+        if key: return _Not(cls._compile_node(condition[key], snapshot, find_object))
+        return cls._compile_leaf(condition, snapshot, find_object)
+
+    @staticmethod
+    def _compile_leaf(condition, snapshot, find_object):
+        if not isinstance(condition, dict):
+            print(f"WARN: Ignoring malformed goal condition: {condition}")
+            return _Constant(True)
+        obj_name = condition.get('object_name')
+        condition_type_str = condition.get('type') # e.g., "ToggledOn"
+        target_state_val = condition.get('target_value', True) # Default target is True
+        op = condition.get('op')
+
+        if not obj_name or not condition_type_str: return _Constant(True) # Skip invalid condition
+        if op is not None and op not in COMPARISON_OPS:
+            print(f"WARN: Unknown comparison '{op}' in goal condition for '{obj_name}'.")
+            return _Constant(False)
+
+        target_obj = find_object(obj_name)
+        if not target_obj:
+            print(f"WARN: Goal object '{obj_name}' not found in the scene.")
+            return _Constant(False) # Object not found
+
+        # Map string condition type to OmniGibson state class
+        condition_state_class = getattr(object_states, condition_type_str, None)
+        if condition_state_class is None or condition_state_class not in target_obj.states:
+            print(f"WARN: Condition type '{condition_type_str}' not found or not applicable to '{obj_name}'.")
+            return _Constant(False)
+
+        obj_id = snapshot.object_id(obj_name) if snapshot is not None else None
+        tracked = snapshot is not None and snapshot.is_tracked(condition_state_class)
+        return _StateCondition(target_obj, obj_id, condition_state_class, op, target_state_val, tracked)
+
+    def evaluate(self, snapshot):
+        """Returns True if all goal conditions hold in snapshot."""
+        if snapshot is not None and snapshot.seq == self._last_seq:
+            return self.root._cached # Already evaluated against this snapshot
+        changed_ids = None # Full evaluation unless snapshot directly follows the last one seen
+        if snapshot is not None and self._last_seq is not None and snapshot.base_seq == self._last_seq:
+            changed_ids = snapshot.changed_ids
+        result = self.root.evaluate(snapshot, changed_ids)
+        self._last_seq = snapshot.seq if snapshot is not None else None
+        return result
@@ -0,0 +1,79 @@
+# grammar_decoding.py
+import torch
+from transformers import LogitsProcessor, StoppingCriteria
+
+class _GrammarTracker:
+    """Maps generated token ids to grammar states, memoized per generated prefix."""
+    def __init__(self, grammars, token_trie, prompt_length):
+        self.grammars = grammars # One grammar (or None = unconstrained) per batch row
+        self.token_trie = token_trie
+        self.prompt_length = prompt_length
+        self._states = {} # (row, generated ids) -> grammar state (None = left the grammar)
+        self._allowed = [{} for _ in grammars] # per row: state -> {token id: next state}
+
+    def allowed(self, row, state):
+        """Token ids allowed in state and the resulting states (joint walk of both tries)."""
+        cache = self._allowed[row]
+        if state not in cache:
+            grammar, trie = self.grammars[row], self.token_trie
+            allowed = {}
+            stack = [(0, state)]
+            while stack:
+                vocab_node, grammar_state = stack.pop()
+                for ch, vocab_child in trie.children[vocab_node].items():
+                    nxt = grammar.advance(grammar_state, ch)
+                    if nxt is None: continue
+                    for token_id in trie.token_ids.get(vocab_child, ()): allowed[token_id] = nxt
+                    stack.append((vocab_child, nxt))
+            cache[state] = allowed
+        return cache[state]
+
+    def state(self, row, input_ids):
+        generated = tuple(input_ids[row, self.prompt_length:].tolist())
+        key = (row, generated)
+        if key not in self._states:
+            if not generated:
+                self._states[key] = self.grammars[row].start_state
+            else:
+                prev = self.state(row, input_ids[:, :-1])
+                self._states[key] = self.allowed(row, prev).get(generated[-1]) if prev is not None else None
+        return self._states[key]
+
+class ActionGrammarLogitsProcessor(LogitsProcessor):
+    """Masks every token that would take the output outside the action grammar."""
+    def __init__(self, tracker):
+        self.tracker = tracker
+        self._mask_cache = {}
+
+    def __call__(self, input_ids, scores):
+        eos_token_id = self.tracker.token_trie.eos_token_id
+        for row in range(scores.shape[0]):
+            grammar = self.tracker.grammars[row]
+            if grammar is None: continue
+            state = self.tracker.state(row, input_ids)
+            key = (row, state)
+            if key not in self._mask_cache:
+                allowed_ids = list(self.tracker.allowed(row, state)) if state is not None else []
+                if state is None or grammar.is_accepting(state) or not allowed_ids:
+                    allowed_ids.append(eos_token_id) # Finished (or dead end): only EOS
+                self._mask_cache[key] = torch.tensor(allowed_ids, dtype=torch.long)
+            allowed_ids = self._mask_cache[key].to(scores.device)
+            masked = torch.full_like(scores[row], float('-inf'))
+            masked[allowed_ids] = scores[row, allowed_ids]
+            scores[row] = masked
+        return scores
+
+class ActionGrammarStoppingCriteria(StoppingCriteria):
+    """Stops a row as soon as its output is a complete program (e.g. the closing parenthesis)."""
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def __call__(self, input_ids, scores, **kwargs):
+        done = [grammar is not None and grammar.is_complete(self.tracker.state(row, input_ids))
+                for row, grammar in enumerate(self.tracker.grammars)]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+def build_constraints(grammars, token_trie, prompt_length):
+    """Returns (logits_processor, stopping_criteria) enforcing one grammar per batch row."""
+    tracker = _GrammarTracker(grammars, token_trie, prompt_length)
+    return ActionGrammarLogitsProcessor(tracker), ActionGrammarStoppingCriteria(tracker)
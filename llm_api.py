@@ -1,30 +1,59 @@
 # llm_api.py
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
+from transformers import AutoTokenizer, BatchEncoding, LogitsProcessorList, StoppingCriteriaList
 import time
+from collections import OrderedDict
+import copy
 import config
 import os # Added for path check
+from prefix_cache import PrefixKVCache
+from response_cache import ResponseCache
+from action_grammar import TokenTrie
+from grammar_decoding import build_constraints
+from tracing import tracer
+from llm_backends import make_backend
+from event_log import log
+from prompting import build_prompt_prefix # Re-exported for existing callers
+
+class _FirstTokenTimer:
+    """Logits processor that only notes when the first token's logits are ready (end of prefill)."""
+    def __init__(self):
+        self.first_ns = None
+
+    def __call__(self, input_ids, scores):
+        if self.first_ns is None: self.first_ns = time.perf_counter_ns()
+        return scores
 
 class LLM_API:
-    def __init__(self, model_path=config.MODEL_PATH, tokenizer_path=config.TOKENIZER_PATH, quantization_bits=config.QUANTIZATION_BITS):
+    def __init__(self, model_path=config.MODEL_PATH, tokenizer_path=config.TOKENIZER_PATH, quantization_bits=config.QUANTIZATION_BITS,
+                 draft_model_path=config.LLM_DRAFT_MODEL_PATH, backend=None):
         print("Initializing LLM API...")
         if not os.path.exists(tokenizer_path): raise FileNotFoundError(f"Tokenizer not found: {tokenizer_path}")
         if not os.path.exists(model_path): raise FileNotFoundError(f"Model path not found: {model_path}") # Check specific model path
 
         self.model_path = model_path
         self.tokenizer_path = tokenizer_path
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Using device: {self.device}")
-        if self.device == "cpu": print("Warning: Running LLM on CPU will be very slow!")
-
-        self.bnb_config = None
-        if quantization_bits == 4:
-            print("Setting up 4-bit quantization...")
-            self.bnb_config = BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_compute_dtype=torch.float16)
-        elif quantization_bits == 8:
-            print("Setting up 8-bit quantization...")
-            self.bnb_config = BitsAndBytesConfig(load_in_8bit=True)
-        else: print("No quantization configured.")
+        self.quantization_bits = quantization_bits
+        self.draft_model_path = draft_model_path
+        self.draft_model = None # Speculative decoding draft (see _load_draft_model)
+        self._forward_passes = {"main": 0, "draft": 0}
+        self.speculative_stats = {"calls": 0, "tokens": 0, "main_passes": 0, "proposed": 0, "accepted": 0}
+        self.backend = make_backend(backend, quantization_bits) # Model loading and execution (see llm_backends.py)
+        self.device = self.backend.device
+        print(f"Using backend '{self.backend.name}' on device: {self.device}")
+
+        self.prefix_cache = PrefixKVCache(
+            max_entries=config.LLM_PREFIX_CACHE_MAX_ENTRIES,
+            max_bytes=config.LLM_PREFIX_CACHE_MAX_MB * 2**20 if config.LLM_PREFIX_CACHE_MAX_MB else None,
+        ) if config.LLM_PREFIX_CACHE else None
+        self.response_cache = ResponseCache(
+            config.LLM_RESPONSE_CACHE_PATH,
+            max_memory_entries=config.LLM_RESPONSE_CACHE_MEMORY_ENTRIES,
+            max_disk_bytes=config.LLM_RESPONSE_CACHE_MAX_MB * 2**20,
+        ) if config.LLM_RESPONSE_CACHE else None
+        self._token_trie = None # Vocabulary trie for constrained decoding, built on first use
+        self._prefix_ids = OrderedDict() # prefix text -> (token ids, True if prefix + rest tokenizes like the whole prompt)
+        self.last_num_generated_tokens = 0
 
         self._load_model()
         print("LLM API Initialized.")
@@ -37,15 +66,9 @@ class LLM_API:
         except Exception as e: print(f"ERROR loading tokenizer: {e}"); raise
 
         print(f"Loading model from: {self.model_path}...")
-        print(f"Quantization config: {self.bnb_config}")
         start_time = time.time()
         try:
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_path,
-                quantization_config=self.bnb_config,
-                device_map="auto",
-                trust_remote_code=True
-            )
+            self.model = self.backend.load_model(self.model_path)
             print(f"Model loaded in {time.time() - start_time:.2f} seconds.")
         except Exception as e: print(f"ERROR loading model: {e}"); raise
 
@@ -54,40 +77,253 @@ class LLM_API:
             self.tokenizer.pad_token = self.tokenizer.eos_token
             if hasattr(self.model, 'config'): # Ensure model config exists
                  self.model.config.pad_token_id = self.model.config.eos_token_id
+        self.tokenizer.padding_side = "left" # Decoder-only batches must be left-padded
+        self.tokenizer.truncation_side = "left" # Over-long prompts keep their end ("Your Action:")
+        if self.draft_model_path: self._load_draft_model()
+
+    def _load_draft_model(self):
+        """Loads the small draft model for speculative (assisted) decoding; it must share the tokenizer.
+
+        The draft proposes up to LLM_DRAFT_NUM_TOKENS tokens, the main model checks them all in
+        one forward pass and keeps the longest prefix matching its own greedy choice, so
+        outputs are unchanged. Forward passes of both models are counted for acceptance stats.
+        """
+        print(f"Loading draft model from: {self.draft_model_path}...")
+        start_time = time.time()
+        try:
+            draft_model = self.backend.load_draft_model(self.draft_model_path)
+        except Exception as e:
+            print(f"WARN: Could not load draft model, decoding without it: {e}")
+            return
+        if draft_model.get_input_embeddings().num_embeddings < len(self.tokenizer):
+            print("WARN: Draft model vocabulary is smaller than the tokenizer's; decoding without it.")
+            return
+        if hasattr(draft_model, 'config'): draft_model.config.pad_token_id = self.tokenizer.pad_token_id
+        draft_model.generation_config.num_assistant_tokens = config.LLM_DRAFT_NUM_TOKENS # Read from the draft's config
+        self.draft_model = draft_model
+        for name, model in (("main", self.model), ("draft", self.draft_model)):
+            model.register_forward_hook(lambda module, args, output, name=name: self._count_forward(name))
+        print(f"Draft model loaded in {time.time() - start_time:.2f} seconds.")
+
+    def _count_forward(self, name):
+        self._forward_passes[name] += 1
+
+    def _record_speculative(self, main_before, draft_before, num_tokens):
+        """Updates acceptance stats from the forward passes of one assisted generate() call.
+
+        Every main-model pass yields one token of its own plus the draft tokens it accepted;
+        every draft pass proposes one token.
+        """
+        main_passes = self._forward_passes["main"] - main_before
+        proposed = self._forward_passes["draft"] - draft_before
+        accepted = max(0, num_tokens - main_passes)
+        stats = self.speculative_stats
+        stats["calls"] += 1
+        stats["tokens"] += num_tokens
+        stats["main_passes"] += main_passes
+        stats["proposed"] += proposed
+        stats["accepted"] += accepted
+        log.info("speculative", "Speculative decoding: {accepted}/{proposed} draft tokens accepted, {tokens_per_pass:.2f} tokens per main-model pass.",
+                 accepted=accepted, proposed=proposed, tokens_per_pass=num_tokens / max(main_passes, 1))
+
+    def speculative_summary(self):
+        """Cumulative acceptance rate and tokens per main-model pass (the ideal speedup)."""
+        stats = self.speculative_stats
+        return {
+            "calls": stats["calls"],
+            "acceptance_rate": stats["accepted"] / stats["proposed"] if stats["proposed"] else 0.0,
+            "tokens_per_main_pass": stats["tokens"] / stats["main_passes"] if stats["main_passes"] else 0.0,
+        }
+
+    def _gen_kwargs(self, max_new_tokens):
+        return {
+            "max_new_tokens": max_new_tokens,
+             "pad_token_id": self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else self.tokenizer.eos_token_id, # Ensure pad_token_id is not None
+             "eos_token_id": self.tokenizer.eos_token_id,
+             # "temperature": 0.7, # Optional sampling params
+             # "do_sample": True,
+        }
+
+    def _response_key(self, prompt, gen_kwargs, grammar):
+        """Cache key for a (deterministic) generation; None if responses must not be cached."""
+        if self.response_cache is None or gen_kwargs.get("do_sample"): return None
+        grammar_signature = grammar.signature() if grammar is not None and config.LLM_CONSTRAINED_DECODING else None
+        return ResponseCache.make_key(self.model_path, self.backend.signature(), gen_kwargs, prompt, grammar_signature)
+
+    def _add_constraints(self, gen_kwargs, grammars, prompt_length):
+        """Adds grammar logits masking and early stopping (one grammar or None per batch row)."""
+        if not config.LLM_CONSTRAINED_DECODING or all(g is None for g in grammars): return
+        logits_processor, stopping_criteria = build_constraints(grammars, self._get_token_trie(), prompt_length)
+        gen_kwargs["logits_processor"] = LogitsProcessorList([logits_processor])
+        gen_kwargs["stopping_criteria"] = StoppingCriteriaList([stopping_criteria])
+
+    def _generate_traced(self, inputs, gen_kwargs):
+        """model.generate(), recording prefill (up to the first token's logits) and decode spans."""
+        if not tracer.enabled:
+            with self.backend.inference_mode():
+                return self.model.generate(**inputs, **gen_kwargs)
+        timer = _FirstTokenTimer()
+        gen_kwargs["logits_processor"] = LogitsProcessorList([timer] + list(gen_kwargs.get("logits_processor") or []))
+        start = tracer.now()
+        with self.backend.inference_mode():
+            output_ids = self.model.generate(**inputs, **gen_kwargs)
+        end = tracer.now()
+        batch = inputs.input_ids.shape[0]
+        first = timer.first_ns or end
+        tracer.record("prefill", start, first, args={"batch": batch, "tokens": inputs.input_ids.shape[1]})
+        tracer.record("decode", first, end, args={"batch": batch, "tokens": output_ids.shape[1] - inputs.input_ids.shape[1]})
+        return output_ids
 
-    def generate(self, prompt: str, max_new_tokens=config.LLM_MAX_NEW_TOKENS):
-        """Generates text based on the prompt."""
-        print(f"\n--- Sending Prompt to LLM (length={len(prompt)}) ---")
-        # print(prompt) # Uncomment for full prompt debugging
-        print("-------------------------------------------------")
+    def _tokenize_prompt(self, prompt: str, prefix: str = None):
+        """Tokenizes prompt as a (1, n) batch, reusing the cached token ids of its static prefix.
+
+        The first time a prefix is seen, prefix ids + ids of the rest are checked against
+        tokenizing the whole prompt; only if they match is the split used afterwards.
+        Prompts over LLM_MAX_PROMPT_TOKENS are cut from the front (keeping a BOS token) with a warning.
+        """
+        input_ids = None
+        if prefix and prompt.startswith(prefix) and len(prompt) > len(prefix):
+            rest_ids = self.tokenizer(prompt[len(prefix):], return_tensors="pt", add_special_tokens=False).input_ids
+            cached = self._prefix_ids.get(prefix)
+            if cached is None:
+                prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids
+                input_ids = self.tokenizer(prompt, return_tensors="pt").input_ids
+                cached = (prefix_ids, torch.equal(torch.cat([prefix_ids, rest_ids], dim=1), input_ids))
+                if not cached[1]: log.warn("prefix_tokenization", "Prompt prefix tokenizes differently in context; tokenizing whole prompts.")
+                self._prefix_ids[prefix] = cached
+                if len(self._prefix_ids) > 8: self._prefix_ids.popitem(last=False)
+            elif cached[1]:
+                self._prefix_ids.move_to_end(prefix)
+                input_ids = torch.cat([cached[0], rest_ids], dim=1)
+        if input_ids is None:
+            input_ids = self.tokenizer(prompt, return_tensors="pt").input_ids
+        limit = config.LLM_MAX_PROMPT_TOKENS
+        if limit and input_ids.shape[1] > limit:
+            log.warn("prompt_truncated", "Prompt has {tokens} tokens, over LLM_MAX_PROMPT_TOKENS={limit}; dropping its start.",
+                     tokens=input_ids.shape[1], limit=limit)
+            bos = self.tokenizer.bos_token_id
+            keep_bos = bos is not None and input_ids[0, 0].item() == bos
+            input_ids = torch.cat([input_ids[:, :1], input_ids[:, -(limit - 1):]], dim=1) if keep_bos else input_ids[:, -limit:]
+        return BatchEncoding({"input_ids": input_ids, "attention_mask": torch.ones_like(input_ids)})
+
+    def _get_prefix_kv(self, prefix: str):
+        """Returns (prefix_ids, past_key_values) for prefix, running its prefill once per task."""
+        cached = self.prefix_cache.get(prefix)
+        if cached is not None: return cached
+        start_time = time.time()
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids.to(self.device)
+        with self.backend.inference_mode():
+            past_key_values = self.model(input_ids=prefix_ids, use_cache=True).past_key_values
+        log.info("prefix_prefill", "Prefix prefilled ({tokens} tokens) in {seconds:.2f} seconds.", tokens=prefix_ids.shape[1], seconds=time.time() - start_time)
+        self.prefix_cache.put(prefix, prefix_ids, past_key_values)
+        return prefix_ids, past_key_values
+
+    def _prefix_past_key_values(self, input_ids, prompt: str, prefix: str):
+        """Returns a private copy of the cached prefix KV if it is valid for input_ids, else None."""
+        if self.prefix_cache is None or not prefix or not prompt.startswith(prefix):
+            return None
+        prefix_ids, past_key_values = self._get_prefix_kv(prefix)
+        num_prefix = prefix_ids.shape[1]
+        # The full prompt is tokenized anyway (cheap next to prefill); only reuse the KV if the
+        # prefix tokenizes identically inside it, which keeps output identical to the uncached path.
+        if num_prefix >= input_ids.shape[1] or not torch.equal(input_ids[0, :num_prefix], prefix_ids[0]):
+            log.warn("prefix_tokenization", "Prompt prefix tokenizes differently in context; running full prefill.")
+            return None
+        return copy.deepcopy(past_key_values) # generate() appends to the cache in place
+
+    def _get_token_trie(self):
+        if self._token_trie is None:
+            start_time = time.time()
+            self._token_trie = TokenTrie(self.tokenizer)
+            print(f"Token trie for constrained decoding built in {time.time() - start_time:.2f} seconds.")
+        return self._token_trie
+
+    def generate(self, prompt: str, max_new_tokens=config.LLM_MAX_NEW_TOKENS, prefix: str = None, grammar=None):
+        """Generates text based on the prompt.
+
+        If prefix is given (the static start of prompt, e.g. instructions, action list and task
+        description), its KV cache is computed once and only the remainder is prefilled.
+        If grammar (an ActionGrammar) is given, decoding is restricted to strings it accepts
+        and stops as soon as a complete action call has been emitted.
+        """
+        log.debug("llm_prompt", "Sending prompt to LLM (length={length}):\n{prompt}", length=len(prompt), prompt=prompt)
 
         try:
-            inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=4000).to(self.device) # Added max_length
+            gen_kwargs = self._gen_kwargs(max_new_tokens)
+            cache_key = self._response_key(prompt, gen_kwargs, grammar)
+            cached = self.response_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                self.last_num_generated_tokens = 0
+                log.info("llm_output", "LLM output (response cache hit): {text}", text=cached, cached=True)
+                return cached
+
+            with tracer.span("tokenize"):
+                inputs = self._tokenize_prompt(prompt, prefix).to(self.device)
             if inputs.input_ids.nelement() == 0: # Check if inputs are empty
-                 print("WARN: Input tokens are empty, cannot generate.")
+                 log.warn("empty_prompt", "Input tokens are empty, cannot generate.")
                  return ""
 
-            gen_kwargs = {
-                "max_new_tokens": max_new_tokens,
-                 "pad_token_id": self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else self.tokenizer.eos_token_id, # Ensure pad_token_id is not None
-                 "eos_token_id": self.tokenizer.eos_token_id,
-                 # "temperature": 0.7, # Optional sampling params
-                 # "do_sample": True,
-            }
+            if self.draft_model is not None:
+                # Assisted generation does not resume from a prefilled prefix KV cache; the draft pays off in decode instead
+                gen_kwargs["assistant_model"] = self.draft_model
+                passes_before = (self._forward_passes["main"], self._forward_passes["draft"])
+            else:
+                with tracer.span("prefix_kv"):
+                    past_key_values = self._prefix_past_key_values(inputs.input_ids, prompt, prefix)
+                if past_key_values is not None:
+                    gen_kwargs["past_key_values"] = past_key_values
+            self._add_constraints(gen_kwargs, [grammar], inputs.input_ids.shape[1])
 
-            print("Generating response...")
             start_time = time.time()
-            with torch.no_grad():
-                 output_ids = self.model.generate(**inputs, **gen_kwargs)
+            output_ids = self._generate_traced(inputs, gen_kwargs)
             generation_time = time.time() - start_time
-            print(f"Response generated in {generation_time:.2f} seconds.")
+            self.last_num_generated_tokens = output_ids.shape[1] - inputs.input_ids.shape[1]
+            if self.draft_model is not None: self._record_speculative(*passes_before, self.last_num_generated_tokens)
+            log.info("llm_generated", "Response generated in {seconds:.2f} seconds ({tokens} tokens).",
+                     seconds=generation_time, tokens=self.last_num_generated_tokens, prompt_tokens=inputs.input_ids.shape[1])
 
             # Decode only the newly generated tokens
             output_text = self.tokenizer.decode(output_ids[0][inputs.input_ids.shape[1]:], skip_special_tokens=True)
 
-            print(f"\n--- LLM Raw Output ---\n{output_text}\n----------------------")
+            log.info("llm_output", "LLM output: {text}", text=output_text, cached=False)
+            if cache_key: self.response_cache.put(cache_key, output_text.strip())
             return output_text.strip()
 
         except Exception as e:
-            print(f"ERROR during LLM generation: {e}")
+            log.error("llm_error", "LLM generation failed: {error}", error=str(e))
             return f"Error: {e}"
+
+    def generate_batch(self, prompts, max_new_tokens=config.LLM_MAX_NEW_TOKENS, grammars=None):
+        """Generates for several prompts in one left-padded batch. Returns one string per prompt.
+
+        Assisted generation is single-sequence only, so batches decode without the draft model.
+        """
+        log.debug("llm_batch", "Sending batch of {size} prompts to LLM", size=len(prompts))
+        grammars = list(grammars) if grammars else [None] * len(prompts)
+        gen_kwargs = self._gen_kwargs(max_new_tokens)
+        cache_keys = [self._response_key(p, gen_kwargs, g) for p, g in zip(prompts, grammars)]
+        outputs = [self.response_cache.get(k) if k else None for k in cache_keys]
+        missing = [i for i, output in enumerate(outputs) if output is None]
+        if not missing: return outputs
+        if len(missing) < len(prompts): log.info("llm_batch_cache", "Response cache hits: {hits}/{size}", hits=len(prompts) - len(missing), size=len(prompts))
+        try:
+            with tracer.span("tokenize", batch=len(missing)):
+                inputs = self.tokenizer([prompts[i] for i in missing], return_tensors="pt", padding=True,
+                                        truncation=True, max_length=config.LLM_MAX_PROMPT_TOKENS).to(self.device)
+            if (inputs.attention_mask.sum(dim=1) >= config.LLM_MAX_PROMPT_TOKENS).any():
+                log.warn("prompt_truncated", "Batch prompt(s) reached LLM_MAX_PROMPT_TOKENS={limit}; their start may have been dropped.",
+                         limit=config.LLM_MAX_PROMPT_TOKENS)
+            self._add_constraints(gen_kwargs, [grammars[i] for i in missing], inputs.input_ids.shape[1])
+
+            start_time = time.time()
+            output_ids = self._generate_traced(inputs, gen_kwargs)
+            log.info("llm_batch_generated", "Batch of {size} generated in {seconds:.2f} seconds.", size=len(missing), seconds=time.time() - start_time)
+
+            new_ids = output_ids[:, inputs.input_ids.shape[1]:]
+            for i, ids in zip(missing, new_ids):
+                outputs[i] = self.tokenizer.decode(ids, skip_special_tokens=True).strip()
+                if cache_keys[i]: self.response_cache.put(cache_keys[i], outputs[i])
+            return outputs
+        except Exception as e:
+            log.error("llm_error", "Batched LLM generation failed: {error}", error=str(e))
+            return [output if output is not None else f"Error: {e}" for output in outputs]
@@ -0,0 +1,105 @@
+# llm_backends.py
+# Model loading / execution backends behind LLM_API (selected with config.LLM_BACKEND).
+import os
+import time
+import warnings
+import torch
+from transformers import AutoModelForCausalLM, BitsAndBytesConfig
+import config
+
+class HFBackend:
+    """HuggingFace transformers model, bitsandbytes-quantized (4/8 bit) when requested, placed with device_map="auto"."""
+    name = "hf"
+
+    def __init__(self, quantization_bits=None):
+        self.quantization_bits = quantization_bits
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.bnb_config = None
+        if quantization_bits == 4:
+            print("Setting up 4-bit quantization...")
+            self.bnb_config = BitsAndBytesConfig(load_in_4bit=True, bnb_4bit_compute_dtype=torch.float16)
+        elif quantization_bits == 8:
+            print("Setting up 8-bit quantization...")
+            self.bnb_config = BitsAndBytesConfig(load_in_8bit=True)
+        else: print("No quantization configured.")
+        if self.device == "cpu": print("Warning: Running LLM on CPU will be very slow! (config.LLM_BACKEND = \"cpu_int8\" is faster)")
+
+    def signature(self):
+        """What, besides the model path, determines this backend's outputs (part of response cache keys)."""
+        return self.quantization_bits
+
+    def load_model(self, model_path):
+        print(f"Quantization config: {self.bnb_config}")
+        return AutoModelForCausalLM.from_pretrained(
+            model_path,
+            quantization_config=self.bnb_config,
+            device_map="auto",
+            trust_remote_code=True
+        )
+
+    def load_draft_model(self, model_path):
+        """Draft models are small: unquantized, fp16 on GPU."""
+        return AutoModelForCausalLM.from_pretrained(
+            model_path,
+            dtype=torch.float16 if self.device == "cuda" else torch.float32,
+            trust_remote_code=True
+        ).to(self.device)
+
+    def inference_mode(self):
+        return torch.no_grad()
+
+class CPUInt8Backend:
+    """CPU-only backend: fp32 weights with nn.Linear layers dynamically quantized to int8.
+
+    Linear weights are stored as int8 and activations are quantized per call, so matmuls run
+    through the int8 GEMM kernels (fbgemm/onednn) with a quarter of the weight memory traffic;
+    embeddings and norms stay fp32. Intra-op threads are set to config.LLM_CPU_THREADS (default:
+    the CPUs this process may run on) and inter-op threads to config.LLM_CPU_INTEROP_THREADS,
+    since generate() runs one op at a time. Prefill stays a single forward pass over the whole
+    prompt (and generate_batch over all prompts), which is where the int8 GEMMs pay off most.
+    Activation scales are per forward input, so outputs can differ slightly between a full
+    prefill, a prefix-KV-cached one and a batched one (the fp32 "hf" path is exact).
+    """
+    name = "cpu_int8"
+
+    def __init__(self, quantization_bits=None):
+        self.device = "cpu"
+        if quantization_bits: print(f"Note: QUANTIZATION_BITS={quantization_bits} (bitsandbytes) is ignored by the cpu_int8 backend.")
+        self.num_threads = config.LLM_CPU_THREADS or len(os.sched_getaffinity(0))
+        torch.set_num_threads(self.num_threads)
+        try:
+            torch.set_num_interop_threads(config.LLM_CPU_INTEROP_THREADS)
+        except RuntimeError: pass # Can only be set before the first inter-op parallel work in the process
+        print(f"CPU int8 backend: {torch.get_num_threads()} intra-op threads, {torch.get_num_interop_threads()} inter-op threads, "
+              f"quantized engine {torch.backends.quantized.engine}.")
+
+    def signature(self):
+        return "cpu_int8"
+
+    def _quantize(self, model):
+        start_time = time.time()
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore") # torch.ao.quantization deprecation notices
+            from torch.ao.quantization import quantize_dynamic
+            model = quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        print(f"Dynamic int8 quantization done in {time.time() - start_time:.2f} seconds.")
+        return model
+
+    def load_model(self, model_path):
+        model = AutoModelForCausalLM.from_pretrained(model_path, dtype=torch.float32, trust_remote_code=True)
+        return self._quantize(model.eval())
+
+    def load_draft_model(self, model_path):
+        return self.load_model(model_path)
+
+    def inference_mode(self):
+        return torch.inference_mode() # Also skips version-counter bookkeeping on every tensor
+
+BACKENDS = {backend.name: backend for backend in (HFBackend, CPUInt8Backend)}
+
+def make_backend(name=None, quantization_bits=None):
+    """Backend instance for name (default config.LLM_BACKEND; "auto" = hf with a GPU, else cpu_int8)."""
+    name = name or config.LLM_BACKEND
+    if name == "auto": name = "hf" if torch.cuda.is_available() else "cpu_int8"
+    if name not in BACKENDS: raise ValueError(f"Unknown LLM backend '{name}'; available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](quantization_bits)
@@ -0,0 +1,196 @@
+# llm_server.py
+# Local inference server: one process holds the model and serves many agent processes,
+# grouping concurrent requests into padded batches. Start with: python llm_server.py
+import os
+import queue
+import secrets
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+import config
+
+def _address_family(address):
+    return 'AF_UNIX' if isinstance(address, str) else 'AF_INET'
+
+def resolve_authkey(address, create=False):
+    """The connection authkey: the config.LLM_SERVER_AUTHKEY_ENV variable, else the config.LLM_SERVER_AUTHKEY_FILE contents.
+
+    With create=True (the server) a missing key file is generated with mode 0600. Unix sockets
+    may go without a key (the socket's file permissions guard them); TCP may not, since the
+    connection unpickles whatever a client sends. Returns None if no key is available.
+    """
+    key = os.environ.get(config.LLM_SERVER_AUTHKEY_ENV)
+    if key: return key.encode("utf-8")
+    path = config.LLM_SERVER_AUTHKEY_FILE
+    if not path: return None
+    if not os.path.exists(path):
+        if not create or _address_family(address) == 'AF_UNIX': return None
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f: f.write(secrets.token_hex(32))
+        print(f"Generated an LLM server authkey in {path} (clients read it from there).")
+    if os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"LLM server authkey file {path} is accessible by other users; chmod 600 it.")
+    with open(path, "r") as f: return f.read().strip().encode("utf-8")
+
+class _PendingRequest:
+    def __init__(self, request):
+        self.request = request
+        self.result = None
+        self.done = threading.Event()
+
+class LLMServer:
+    """Serves generate() requests from many clients, batching those that arrive together.
+
+    backend is anything with generate(prompt, max_new_tokens, prefix, grammar) and
+    generate_batch(prompts, max_new_tokens, grammars) -- an LLM_API, or a stub in benchmarks.
+    Requests are collected for up to batch_window_s after the first one (or until
+    max_batch_size) and requests with the same max_new_tokens are generated together.
+    authkey=None resolves one with resolve_authkey(); a TCP address without one is refused.
+    """
+    def __init__(self, backend, address=config.LLM_SERVER_ADDRESS, authkey=None,
+                 max_batch_size=config.LLM_SERVER_MAX_BATCH_SIZE, batch_window_s=config.LLM_SERVER_BATCH_WINDOW_MS / 1000.0):
+        self.backend = backend
+        self.address = address
+        self.authkey = authkey
+        self.max_batch_size = max_batch_size
+        self.batch_window_s = batch_window_s
+        self._pending = queue.Queue()
+        self._listener = None
+        self._stopped = threading.Event()
+        self.num_requests = 0
+        self.num_batches = 0
+
+    def start(self):
+        """Starts accepting connections and batching in background threads."""
+        if self.authkey is None: self.authkey = resolve_authkey(self.address, create=True)
+        if self.authkey is None and _address_family(self.address) == 'AF_INET':
+            raise ValueError(f"Refusing to serve on TCP {self.address} without an authkey: clients' requests are unpickled. "
+                             f"Set ${config.LLM_SERVER_AUTHKEY_ENV} or config.LLM_SERVER_AUTHKEY_FILE, or use a Unix socket address.")
+        self._listener = Listener(self.address, family=_address_family(self.address), authkey=self.authkey)
+        self.address = self._listener.address # Resolves port 0 to the bound port
+        threading.Thread(target=self._accept_loop, name="llm-server-accept", daemon=True).start()
+        threading.Thread(target=self._batch_loop, name="llm-server-batcher", daemon=True).start()
+        print(f"LLM server listening on {self.address} (max_batch_size={self.max_batch_size}, "
+              f"window={self.batch_window_s * 1000:.0f} ms)")
+        return self
+
+    def serve_forever(self):
+        self.start()
+        try:
+            while not self._stopped.wait(1.0): pass
+        except KeyboardInterrupt:
+            print("LLM server interrupted.")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stopped.set()
+        self._pending.put(None) # Wake the batcher
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def _accept_loop(self):
+        while not self._stopped.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._stopped.is_set(): return
+                print("WARN: LLM server failed to accept a connection.")
+                continue
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def _handle_connection(self, conn):
+        """One thread per client: forwards its requests to the batcher and replies in order."""
+        with conn:
+            while not self._stopped.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return # Client disconnected
+                pending = _PendingRequest(request)
+                self._pending.put(pending)
+                pending.done.wait()
+                try:
+                    conn.send(pending.result)
+                except (EOFError, OSError):
+                    return
+
+    def _collect_batch(self):
+        first = self._pending.get()
+        if first is None: return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            try:
+                pending = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if pending is None: break
+            batch.append(pending)
+        return batch
+
+    def _batch_loop(self):
+        while not self._stopped.is_set():
+            batch = self._collect_batch()
+            groups = {}
+            for pending in batch:
+                groups.setdefault(pending.request.get("max_new_tokens", config.LLM_MAX_NEW_TOKENS), []).append(pending)
+            for max_new_tokens, group in groups.items():
+                self._run_group(group, max_new_tokens)
+
+    def _run_group(self, group, max_new_tokens):
+        self.num_requests += len(group)
+        self.num_batches += 1
+        try:
+            if len(group) == 1:
+                # A lone request keeps the single-prompt path (and its prefix KV cache)
+                request = group[0].request
+                texts = [self.backend.generate(request["prompt"], max_new_tokens=max_new_tokens,
+                                               prefix=request.get("prefix"), grammar=request.get("grammar"))]
+            else:
+                texts = self.backend.generate_batch([p.request["prompt"] for p in group], max_new_tokens=max_new_tokens,
+                                                    grammars=[p.request.get("grammar") for p in group])
+        except Exception as e:
+            print(f"ERROR: LLM server batch failed: {e}")
+            texts = [f"Error: {e}"] * len(group)
+        for pending, text in zip(group, texts):
+            pending.result = {"text": text, "batch_size": len(group)}
+            pending.done.set()
+
+class LLMClient:
+    """Drop-in replacement for LLM_API that forwards generate() to an LLMServer."""
+    def __init__(self, address=config.LLM_SERVER_ADDRESS, authkey=None):
+        print(f"Connecting to LLM server at {address}...")
+        self.address = address
+        if authkey is None: authkey = resolve_authkey(address)
+        self._conn = Client(address, family=_address_family(address), authkey=authkey)
+        self._lock = threading.Lock()
+        self.last_batch_size = 0
+        print("LLM client connected.")
+
+    def generate(self, prompt: str, max_new_tokens=config.LLM_MAX_NEW_TOKENS, prefix: str = None, grammar=None):
+        """Same interface as LLM_API.generate."""
+        request = {"prompt": prompt, "max_new_tokens": max_new_tokens, "prefix": prefix, "grammar": grammar}
+        try:
+            with self._lock: # One outstanding request per connection
+                self._conn.send(request)
+                response = self._conn.recv()
+        except Exception as e:
+            print(f"ERROR communicating with LLM server: {e}")
+            return f"Error: {e}"
+        self.last_batch_size = response.get("batch_size", 1)
+        return response["text"]
+
+    def close(self):
+        self._conn.close()
+
+if __name__ == "__main__":
+    from llm_api import LLM_API
+    if config.LLM_SERVER_ADDRESS is None:
+        raise SystemExit("Set config.LLM_SERVER_ADDRESS to serve the LLM.")
+    LLMServer(LLM_API()).serve_forever()
@@ -0,0 +1,121 @@
+# name_index.py
+from collections import Counter
+
+def normalize_name(name):
+    """'Electric Switch-0' / '"lamp_0"' -> 'electric_switch_0'."""
+    name = name.strip().strip("'\"").strip().lower().replace(" ", "_").replace("-", "_")
+    while "__" in name: name = name.replace("__", "_")
+    return name
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, max_distance=None):
+    """Levenshtein distance; returns max_distance + 1 as soon as it is certain to exceed max_distance."""
+    if a == b: return 0
+    if len(a) < len(b): a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance: return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if max_distance is not None and min(current) > max_distance: return max_distance + 1
+        previous = current
+    return previous[-1]
+
+class ObjectNameIndex:
+    """Resolves object names written by the LLM to scene object ids, built once per scene.
+
+    Lookups, from strictest to loosest: exact full name or display alias, the same after
+    normalization (case, spaces, quotes), the name without its instance suffix
+    ('electric_switch_wseglt' -> 'electric_switch_wseglt_0'), a category
+    ('electric_switch' -> its instances), and finally the closest key by edit distance among
+    the keys sharing the most character trigrams with the query. A fuzzy match may not turn
+    the query's category into a different one ('pan_x_0' is not 'pot_x_0') or change its
+    instance number. When several instances match, choose(ids) picks one (e.g. the nearest);
+    by default the first.
+    """
+    def __init__(self, names, categories, aliases=None, max_edit_ratio=0.25, max_fuzzy_candidates=8):
+        self.names = list(names)
+        categories = list(categories)
+        self.max_edit_ratio = max_edit_ratio
+        self.max_fuzzy_candidates = max_fuzzy_candidates
+        self._exact = {name: i for i, name in enumerate(self.names)}
+        for name, alias in (aliases or {}).items():
+            if name in self._exact: self._exact.setdefault(alias, self._exact[name])
+        self._normalized = {}
+        for key, obj_id in self._exact.items(): self._normalized.setdefault(normalize_name(key), obj_id)
+        self._stems = {} # name without its numeric instance suffix -> ids
+        self._categories = {} # category -> ids
+        for obj_id, (name, category) in enumerate(zip(self.names, categories)):
+            stem, _, suffix = name.rpartition('_')
+            if stem and suffix.isdigit(): self._stems.setdefault(normalize_name(stem), []).append(obj_id)
+            self._categories.setdefault(normalize_name(category), []).append(obj_id)
+        # Fuzzy keys: normalized names, aliases and categories, each mapping to its ids
+        self._keys = {}
+        for key, obj_id in self._normalized.items(): self._keys.setdefault(key, []).append(obj_id)
+        for key, ids in self._categories.items():
+            merged = self._keys.setdefault(key, [])
+            present = set(merged)
+            merged.extend(i for i in ids if i not in present)
+        self._key_list = list(self._keys)
+        self._key_categories = [normalize_name(categories[self._keys[key][0]]) for key in self._key_list]
+        self._postings = {} # trigram -> key indices
+        for key_idx, key in enumerate(self._key_list):
+            for gram in _trigrams(key): self._postings.setdefault(gram, []).append(key_idx)
+        self.stats = Counter() # Resolutions by kind
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """Exact full name or alias only (what goal conditions use). Returns an id or None."""
+        obj_id = self._exact.get(name)
+        return obj_id if obj_id is not None else self._normalized.get(normalize_name(name))
+
+    def resolve(self, name, choose=None, fuzzy=True):
+        """Returns (obj_id, kind) with kind in exact/normalized/stem/category/fuzzy, or (None, None)."""
+        if not name: return None, None
+        obj_id = self._exact.get(name)
+        if obj_id is not None: return self._count(obj_id, "exact")
+        query = normalize_name(name)
+        obj_id = self._normalized.get(query)
+        if obj_id is not None: return self._count(obj_id, "normalized")
+        if not fuzzy: return None, None
+        choose = choose or (lambda ids: ids[0])
+        for kind, table in (("stem", self._stems), ("category", self._categories)):
+            ids = table.get(query)
+            if ids: return self._count(choose(ids), kind)
+        ids = self._fuzzy_ids(query)
+        if ids: return self._count(choose(ids), "fuzzy")
+        self.stats["unresolved"] += 1
+        return None, None
+
+    def _count(self, obj_id, kind):
+        self.stats[kind] += 1
+        return obj_id, kind
+
+    def _fuzzy_ids(self, query):
+        """Ids of the keys closest to query in edit distance, among the top trigram-overlap keys."""
+        shared = Counter()
+        for gram in _trigrams(query):
+            for key_idx in self._postings.get(gram, ()): shared[key_idx] += 1
+        max_distance = max(1, int(self.max_edit_ratio * len(query)))
+        best, best_ids = max_distance + 1, []
+        for key_idx, _ in shared.most_common(self.max_fuzzy_candidates):
+            key = self._key_list[key_idx]
+            if not self._plausible(query, key, self._key_categories[key_idx]): continue
+            distance = edit_distance(query, key, max_distance=min(best, max_distance))
+            if distance < best: best, best_ids = distance, list(self._keys[key])
+            elif distance == best and distance <= max_distance: best_ids += [i for i in self._keys[key] if i not in best_ids]
+        return best_ids if best <= max_distance else []
+
+    def _plausible(self, query, key, category):
+        """A fuzzy match keeps the category (within max_edit_ratio of its own length) and the instance number."""
+        query_suffix, key_suffix = query.rpartition('_')[2], key.rpartition('_')[2]
+        if query_suffix.isdigit() and key_suffix.isdigit() and query_suffix != key_suffix: return False
+        query_category = "_".join(query.split('_')[:category.count('_') + 1])
+        max_distance = int(self.max_edit_ratio * len(category))
+        return edit_distance(query_category, category, max_distance=max_distance) <= max_distance
@@ -0,0 +1,179 @@
+# observation_builder.py
+import os
+from collections import OrderedDict
+import numpy as np
+
+# Object states shown in observations: state class name -> (label, text when true, text when false).
+# Shown in registration order for every object that has the state and whose snapshot tracks it
+# (config.SNAPSHOT_STATES); add one with register_state_format instead of another if-branch.
+STATE_FORMATS = {}
+
+def register_state_format(state_name, label, true_text="true", false_text="false"):
+    STATE_FORMATS[state_name] = (label, true_text, false_text)
+
+register_state_format("ToggledOn", "toggled", "on", "off")
+register_state_format("Open", "open")
+register_state_format("Cooked", "cooked")
+register_state_format("Frozen", "frozen")
+register_state_format("Burnt", "burnt")
+
+def _split_name(name):
+    """'electric_switch_wseglt_0' -> ('electric_switch', 'wseglt', '0'), or None if not of that form."""
+    parts = name.rsplit('_', 2)
+    if len(parts) != 3 or not parts[0] or not parts[2].isdigit(): return None
+    if len(parts[1]) != 6 or not parts[1].isalpha() or not parts[1].islower(): return None
+    return parts[0], parts[1], parts[2]
+
+def object_category(obj, name):
+    """The object's category (OmniGibson objects carry one; otherwise derived from the name)."""
+    category = getattr(obj, 'category', None)
+    if isinstance(category, str) and category: return category
+    parts = _split_name(name)
+    return parts[0] if parts else name
+
+def object_aliases(names):
+    """{full name: short alias} dropping the random model id: the category plus an index over the
+    scene's instances of that category in name order ('bottom_cabinet_bamfsz_0' -> 'bottom_cabinet_0').
+
+    Aliases are deterministic per scene; one that would clash with a real object name is not used.
+    """
+    by_category = {}
+    for name in names:
+        parts = _split_name(name)
+        if parts: by_category.setdefault(parts[0], []).append(name)
+    existing = set(names)
+    aliases = {}
+    for category, full_names in by_category.items():
+        for i, name in enumerate(sorted(full_names)):
+            alias = f"{category}_{i}"
+            if alias not in existing: aliases[name] = alias
+    return aliases
+
+class TokenCounter:
+    """Token counts of text segments with the LLM's tokenizer, cached per segment.
+
+    Observation lines repeat from step to step, so each distinct segment is tokenized once.
+    Without a tokenizer, counts are estimated as ceil(len / chars_per_token).
+    """
+    def __init__(self, tokenizer=None, max_entries=8192, chars_per_token=3.5):
+        self.tokenizer = tokenizer
+        self.max_entries = max_entries
+        self.chars_per_token = chars_per_token
+        self._counts = OrderedDict()
+
+    @classmethod
+    def from_path(cls, tokenizer_path):
+        if not tokenizer_path or not os.path.exists(tokenizer_path): # Skip importing transformers for nothing
+            print(f"WARN: Tokenizer not found at {tokenizer_path}; estimating observation token counts.")
+            return cls(None)
+        try:
+            from transformers import AutoTokenizer
+            return cls(AutoTokenizer.from_pretrained(tokenizer_path, trust_remote_code=True))
+        except Exception as e:
+            print(f"WARN: Tokenizer unavailable for observation budgeting ({e}); estimating token counts.")
+            return cls(None)
+
+    def count(self, text):
+        cached = self._counts.get(text)
+        if cached is not None:
+            self._counts.move_to_end(text)
+            return cached
+        if self.tokenizer is not None:
+            n = len(self.tokenizer(text, add_special_tokens=False).input_ids)
+        else:
+            n = -(-len(text) // self.chars_per_token)
+        self._counts[text] = int(n)
+        if len(self._counts) > self.max_entries: self._counts.popitem(last=False)
+        return int(n)
+
+class ObjectLineCache:
+    """Observation text per object ('lamp_0 (toggled=on)'), kept across steps.
+
+    Built once per spatial index; afterwards only the objects a snapshot reports as changed
+    (snapshot.changed_ids, when it directly follows the previous one) have their state tuple
+    compared and, if it differs, their text re-formatted. Token counts of the text are cached
+    by the TokenCounter, so per-step cost scales with what changed plus the nearby objects listed.
+    """
+    def __init__(self):
+        self._index = None
+        self._state_classes = None
+        self._seq = None
+        self._formats = [] # (snapshot column, (label, true text, false text))
+        self._columns = []
+        self.labels = [] # Display name per index id
+        self.state_rows = {} # id -> tuple of formatted state values (None = unknown)
+        self.state_text = {} # id -> ' (toggled=on, open=false)' for objects with at least one known state
+        self.stats = {"rebuilds": 0, "refreshed": 0, "reformatted": 0}
+
+    def update(self, snapshot, display_name):
+        """Brings the cache up to date with snapshot; display_name(full name) gives the label."""
+        if snapshot.seq == self._seq: return
+        if snapshot.index is not self._index or snapshot.state_classes != self._state_classes:
+            self._index, self._state_classes = snapshot.index, list(snapshot.state_classes)
+            self.labels = [display_name(name) for name in snapshot.index.names]
+            columns = {state_cls.__name__: col for col, state_cls in enumerate(snapshot.state_classes)}
+            self._formats = [(columns[name], fmt) for name, fmt in STATE_FORMATS.items() if name in columns]
+            self._columns = [col for col, _ in self._formats]
+            self.state_rows, self.state_text = {}, {}
+            self.stats["rebuilds"] += 1
+            ids = self._stateful_ids(snapshot)
+        elif snapshot.base_seq == self._seq and snapshot.changed_ids is not None:
+            ids = snapshot.changed_ids # Moved objects are included; their text is unchanged
+        else:
+            ids = self._stateful_ids(snapshot)
+        self._refresh(snapshot, ids)
+        self._seq = snapshot.seq
+
+    def _stateful_ids(self, snapshot):
+        if not self._formats: return []
+        values = snapshot.state_values[:, self._columns]
+        return np.flatnonzero(~np.isnan(values).all(axis=1)).tolist()
+
+    def _refresh(self, snapshot, ids):
+        for obj_id in ids:
+            row = tuple(None if np.isnan(value) else float(value) for value in snapshot.state_values[obj_id, self._columns])
+            self.stats["refreshed"] += 1
+            if self.state_rows.get(obj_id) == row: continue
+            self.state_rows[obj_id] = row
+            parts = [f"{label}={true_text if value else false_text}"
+                     for (_, (label, true_text, false_text)), value in zip(self._formats, row) if value is not None]
+            if parts: self.state_text[obj_id] = f" ({', '.join(parts)})"
+            else: self.state_text.pop(obj_id, None)
+            self.stats["reformatted"] += 1
+
+    def text(self, obj_id):
+        """Name and states, without the distance."""
+        return self.labels[obj_id] + self.state_text.get(obj_id, "")
+
+def distance_text(dist):
+    return f" [{dist:.1f}m]"
+
+def rank_objects(ids, dists, goal_ids, goal_categories, categories, stateful_ids):
+    """Orders (id, dist) pairs: goal objects, then same-category objects, then objects with states, then the rest; nearest first within each group."""
+    def rank(pair):
+        obj_id, dist = pair
+        if obj_id in goal_ids: group = 0
+        elif categories[obj_id] in goal_categories: group = 1
+        elif obj_id in stateful_ids: group = 2
+        else: group = 3
+        return (group, dist)
+    return sorted(zip(ids, dists), key=rank)
+
+def fit_items(header, items, budget, counter, separator=", ", overflow_note="", costs=None):
+    """Keeps the longest prefix of items whose joined text fits the token budget after header.
+
+    Returns (kept items, number dropped). Each item is counted together with its separator,
+    which over- rather than under-estimates the joined length. If items must be dropped,
+    room is also left for overflow_note (e.g. " (+123 more objects)"). costs, if given,
+    are the items' token counts computed by the caller.
+    """
+    if budget is None: return list(items), 0
+    if costs is None: costs = [counter.count(item + separator) for item in items]
+    available = budget - counter.count(header)
+    if sum(costs) > available: available -= counter.count(overflow_note)
+    kept = 0
+    for cost in costs:
+        if cost > available: break
+        available -= cost
+        kept += 1
+    return list(items[:kept]), len(items) - kept
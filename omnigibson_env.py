@@ -1,7 +1,12 @@
 # omnigibson_env.py
-import re
+import time
 import config
 from omnigibson_interface import OmniGibsonInterface
+from action_grammar import ActionGrammar
+from action_program import parse_program, format_call, ProgramError, action_specs
+from tracing import tracer
+from event_log import log
+from trajectory import TrajectoryRecorder, default_trajectory_path
 
 class OmniGibsonEnv:
     def __init__(self, interface: OmniGibsonInterface):
@@ -16,38 +21,53 @@ class OmniGibsonEnv:
         ]
         self.available_actions_description = "\n- ".join(self.action_list)
         self.valid_action_names = {name.split('(')[0] for name in self.action_list}
+        self.action_specs = action_specs(self.action_list) # Whitelist for parse_program
+        self.max_calls = config.ACTION_PROGRAM_MAX_CALLS if config.ACTION_PROGRAM_MODE else 1
+        self.recorder = TrajectoryRecorder(
+            default_trajectory_path(), chunk_rows=config.TRAJECTORY_CHUNK_ROWS, compression_level=config.TRAJECTORY_COMPRESSION_LEVEL,
+        ) if config.TRAJECTORY_RECORDING else None # One row per step() (see trajectory.py)
         print("Voyager Environment Wrapper Initialized.")
 
     def get_available_actions(self):
         return self.available_actions_description
 
+    def get_action_grammar(self):
+        """Grammar of valid calls over the objects in the latest observation (None if none observed)."""
+        object_names = self.interface.observed_object_names
+        if not object_names: return None
+        return ActionGrammar(self.action_list, object_names, max_calls=self.max_calls)
+
     def reset(self, task_name=config.DEFAULT_TASK):
-        print(f"Resetting environment for task: {task_name}")
+        log.info("env_reset", "Resetting environment for task: {task}", task=task_name)
         initial_obs = self.interface.load_task(task_name)
+        if self.recorder is not None: self.recorder.begin_episode(task_name, self.interface.scene_id, self.interface.snapshot)
         return initial_obs
 
     def _parse_action_code(self, action_code: str):
-        """Parses LLM Python code string: function_name('arg1', 'arg2')"""
-        action_code = action_code.strip().replace("'", '"') # Standardize quotes
-        match = re.match(r"(\w+)\s*\(\s*(?:\"([^\"]*)\"(?:,\s*\"([^\"]*)\")?)?\s*\)", action_code)
-
-        if match:
-            function_name = match.group(1)
-            if function_name not in self.valid_action_names:
-                 print(f"WARN: Parsed function '{function_name}' is not in the valid action list.")
-                 return None, None
-            args = [arg for arg in match.groups()[1:] if arg is not None]
-            print(f"Parsed action: {function_name}, Args: {args}")
-            return function_name, args
-        else:
-            print(f"WARN: Could not parse action code: '{action_code}'")
+        """Parses a single LLM call string: function_name('arg1', 'arg2')"""
+        try:
+            (function_name, args), = parse_program(action_code, self.action_specs, max_calls=1)
+        except ProgramError as e:
+            log.warn("parse_failed", "Could not parse action code: '{code}' ({error})", code=action_code.strip(), error=str(e))
             return None, None
+        log.debug("parsed_action", "Parsed action: {function}, Args: {args}", function=function_name, args=args)
+        return function_name, args
 
     def step(self, action_code: str):
         """Takes action code, parses, executes, steps sim, gets obs, checks success."""
-        print(f"\n--- Env Step: Received Action Code ---\n{action_code}\n---------------------------------")
+        start_time = time.perf_counter()
+        result = self.run_program(action_code) if self.max_calls > 1 else self._run_single(action_code)
+        if self.recorder is not None:
+            observation, reward, done, info = result
+            self.recorder.record_step(action_code, info, reward, done, self.interface.snapshot, time.perf_counter() - start_time)
+        return result
+
+    def _run_single(self, action_code: str):
+        """step() for a single action call."""
+        log.info("env_step", "Env step: received action code: {code}", code=action_code)
 
-        function_name, args = self._parse_action_code(action_code)
+        with tracer.span("parse"):
+            function_name, args = self._parse_action_code(action_code)
         action_success = False
         action_message = "Failed to parse action."
         info = {'action_code': action_code, 'parsed_function': None, 'parsed_args': None} # Initialize info
@@ -55,28 +75,90 @@ class OmniGibsonEnv:
         if function_name:
             info['parsed_function'] = function_name
             info['parsed_args'] = args
-            action_success, action_message = self.interface.execute_action(function_name, args)
+            with tracer.span("execute_action", action=function_name):
+                action_success, action_message = self.interface.execute_action(function_name, args)
         # else: Parsing failed message already set
 
         # Step simulation regardless of action outcome to advance time/state
-        raw_obs_dict = self.interface.step_simulation()
+        with tracer.span("step_simulation"):
+            raw_obs_dict = self.interface.step_simulation()
         info['action_success'] = action_success
         info['action_message'] = action_message
+        info['action_sim_ticks'] = self.interface.last_action_ticks if function_name else 0
+        info['action_wall_time_s'] = self.interface.last_action_wall_time_s if function_name else 0.0
+        info['num_executed'] = 1 if function_name else 0
 
         if raw_obs_dict is None: # Handle simulation step error
-            print("ERROR: Simulation step failed. Cannot get observation or check success.")
+            log.error("sim_step_failed", "Simulation step failed. Cannot get observation or check success.")
             # Return current state? Or indicate error? Let's return empty state and mark done=True
             return "Error during simulation step", 0.0, True, info # reward 0, done=True to stop loop
 
         # Get new observation and check goal
-        observation = self.interface.get_observation(raw_obs_dict)
-        done = self.interface.check_success()
+        with tracer.span("get_observation"):
+            observation = self.interface.get_observation(raw_obs_dict)
+        with tracer.span("check_success"):
+            done = self.interface.check_success()
         reward = 1.0 if done else 0.0
 
         return observation, reward, done, info
 
+    def run_program(self, program_code: str):
+        """Runs a multi-call program call by call, stopping at the first failure or once the goal holds.
+
+        Returns (observation, reward, done, info) like step(); when a call fails (or the program
+        does not parse) the observation ends with feedback for replanning.
+        """
+        log.info("env_step", "Env step: received program:\n{code}", code=program_code)
+        info = {'action_code': program_code, 'calls': [], 'num_executed': 0, 'action_success': False,
+                'action_sim_ticks': 0, 'action_wall_time_s': 0.0}
+        with tracer.span("parse"):
+            try:
+                calls = parse_program(program_code, self.action_specs, max_calls=self.max_calls)
+                feedback = None
+            except ProgramError as e:
+                calls, feedback = [], f"Your previous program was rejected: {e}"
+                log.warn("program_rejected", "{feedback}", feedback=feedback)
+        done = False
+        for function_name, args in calls:
+            call_code = format_call(function_name, args)
+            with tracer.span("execute_action", action=function_name):
+                success, message = self.interface.execute_action(function_name, args)
+            info['calls'].append({'call': call_code, 'success': success, 'message': message})
+            info['num_executed'] += 1
+            info['action_sim_ticks'] += self.interface.last_action_ticks
+            info['action_wall_time_s'] += self.interface.last_action_wall_time_s
+            with tracer.span("step_simulation"):
+                raw_obs_dict = self.interface.step_simulation()
+            if raw_obs_dict is None:
+                log.error("sim_step_failed", "Simulation step failed. Cannot get observation or check success.")
+                return "Error during simulation step", 0.0, True, info
+            with tracer.span("check_success"):
+                done = self.interface.check_success()
+            if not success:
+                feedback = f"Your previous program stopped at call {info['num_executed']}/{len(calls)}: {call_code} failed: {message}"
+                break
+            if done: break
+        info['action_success'] = feedback is None
+        info['action_message'] = feedback or f"Executed {info['num_executed']}/{len(calls)} calls."
+
+        if not calls: # Nothing ran; the step still advances time like a failed single action
+            with tracer.span("step_simulation"):
+                raw_obs_dict = self.interface.step_simulation()
+            if raw_obs_dict is None: return "Error during simulation step", 0.0, True, info
+        with tracer.span("get_observation"):
+            observation = self.interface.get_observation()
+        if feedback: observation += "\n" + feedback
+        return observation, 1.0 if done else 0.0, done, info
+
     def close(self):
+        if self.recorder is not None: self.recorder.close()
         self.interface.close()
 
+    def get_goal_conditions(self):
+        return (self.interface.task_config or {}).get('goal_conditions')
+
+    def get_scene_id(self):
+        return self.interface.scene_id
+
     def get_task_goal_description(self):
         return self.interface.get_task_goal_description()
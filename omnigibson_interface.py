@@ -7,40 +7,59 @@ import os
 import time
 import numpy as np
 import sys
+from collections import Counter
 
 import config # Import our configuration
-# Import utilities (ensure action_utils.py has the typo fixed)
-from octogibson.utils import action_utils as au
+from spatial_index import SceneSpatialIndex
+from world_snapshot import WorldSnapshot
+from goal_evaluator import GoalEvaluator, goal_state_names, goal_object_names
+from observation_builder import TokenCounter, ObjectLineCache, object_aliases, object_category, rank_objects, fit_items, distance_text
+from name_index import ObjectNameIndex
+from scene_state import SceneStateStore, OmniGibsonStateBackend, apply_initial_state
+from env_config import load_env_config, scene_id_of
+from action_primitives import ActionPrimitives
+from event_log import log
 
 class OmniGibsonInterface:
-    def __init__(self):
+    def __init__(self, state_backend=None, scene_id=None, env_cfg=None):
         print("Initializing OmniGibson Interface...")
-        self._load_config()
+        if env_cfg is not None: self.cfg = env_cfg # Prepared ahead of time (e.g. prefetched by the suite runner)
+        else: self._load_config(scene_id)
+        self.scene_id = scene_id_of(self.cfg)
+        # Pristine scene state captured after stabilization; restored instead of env.reset()
+        self.scene_states = SceneStateStore(state_backend or OmniGibsonStateBackend()) if config.SCENE_STATE_RESTORE else None
         self.env = None
         self.robot = None
         self.task_config = None
+        self.spatial_index = None # Built per task in load_task
+        self.snapshot = None # WorldSnapshot captured once per step
+        self.goal_evaluator = None # Compiled from task_config['goal_conditions'] in load_task
+        self.observed_object_names = [] # Objects listed in the latest observation (as displayed)
+        self._aliases = {} # full name -> short display name, per scene (see observation_builder.object_aliases)
+        self.name_index = None # Name/alias/category -> spatial index id, built with the spatial index (see name_index.py)
+        self._observed_ids = frozenset() # Index ids listed in the latest observation
+        self.line_cache = ObjectLineCache() # Per-object observation text, refreshed only for changed objects
+        self._listed = None # id -> state row of objects the LLM has been shown since the last full observation (delta mode)
+        self._observations_since_full = 0
+        self._in_range = set() # Ids within OBSERVATION_MAX_DISTANCE at the previous observation
+        self._categories = [] # Category per spatial index id
+        self._goal_ids = frozenset() # Index ids / categories of the task's goal objects, ranked first in observations
+        self._goal_categories = frozenset()
+        self.token_counter = None # Created on first budgeted observation
         self.action_dim = 0 # Store action dim here
+        self.primitives = None # Multi-tick navigate/pick/place, created per task
+        self.last_action_ticks = 0 # Simulator ticks and wall time used by the last action
+        self.last_action_wall_time_s = 0.0
+        self.lazy_rendering = False # Set in _initialize_env: physics-only ticks, frames rendered on demand (get_frame)
+        self._frame_stale = False # Physics advanced since the last render
+        self.sensor_stats = {"physics_steps": 0, "rendered_steps": 0, "frames": 0, "computed": Counter()}
         self._initialize_env()
         print("OmniGibson Interface Initialized.")
 
-    def _load_config(self):
+    def _load_config(self, scene_id=None):
         """Loads and potentially modifies the environment config."""
-        print(f"Loading environment config from: {config.ENV_CONFIG_PATH}")
         try:
-            self.cfg = yaml.load(open(config.ENV_CONFIG_PATH, "r"), Loader=yaml.FullLoader)
-            print("Initial config loaded.")
-            # NOTE: We rely on the user having commented out problematic keys in the YAML
-            # based on config.YAML_COMMENT_OUT and previous debugging.
-            # Add timesteps if missing (required by og.Environment)
-            if 'action_timestep' not in self.cfg:
-                 self.cfg['action_timestep'] = float(1.0 / 60.0)
-            else:
-                 self.cfg['action_timestep'] = float(self.cfg['action_timestep'])
-            if 'physics_timestep' not in self.cfg:
-                 self.cfg['physics_timestep'] = float(1.0 / 60.0)
-            else:
-                 self.cfg['physics_timestep'] = float(self.cfg['physics_timestep'])
-            print("Timesteps added/verified in config.")
+            self.cfg = load_env_config(scene_id)
         except Exception as e:
             print(f"FATAL: Error loading or parsing config YAML: {e}")
             raise
@@ -49,7 +68,7 @@ class OmniGibsonInterface:
         """Creates the OmniGibson environment instance."""
         print("Creating OmniGibson Environment (this might take a moment)...")
         try:
-            print(f"\nDEBUG: Final config being passed to og.Environment:\n{self.cfg}\n")
+            log.debug("env_config", "Final config being passed to og.Environment:\n{cfg}", cfg=self.cfg) # Formatted only if DEBUG is on
             self.env = og.Environment(configs=self.cfg)
             print("OmniGibson Environment created.")
             # Get robot and action dim immediately if environment loaded
@@ -67,20 +86,53 @@ class OmniGibsonInterface:
                 print("WARN: No robot found in the environment after init.")
                 self.action_dim = 0
 
+            self.lazy_rendering = (config.LAZY_RENDERING and self.robot is not None and hasattr(self.robot, 'apply_action')
+                                   and hasattr(og.sim, 'step') and hasattr(og.sim, 'render'))
+            if config.LAZY_RENDERING and not self.lazy_rendering:
+                print("WARN: Lazy rendering unavailable (no og.sim.step/render or robot.apply_action); rendering every step.")
+
             # Basic stabilization step if possible
             if self.action_dim > 0:
                 print("Performing initial stabilization steps...")
                 for _ in range(5): # Reduced steps
-                    self.env.step(np.zeros(self.action_dim))
+                    self._advance(np.zeros(self.action_dim))
                 print("Stabilization complete.")
             else:
                  print("Skipping stabilization steps (action_dim not available).")
 
+            if self.scene_states is not None:
+                try:
+                    self.scene_states.capture(self.scene_id)
+                except Exception as e:
+                    print(f"WARN: Could not capture scene state, falling back to env.reset() per episode: {e}")
+
         except Exception as e:
             print(f"FATAL: Failed to initialize OmniGibson environment: {e}")
             if self.env: self.env.close()
             raise
 
+    def switch_scene(self, scene_id, env_cfg=None):
+        """Replaces the loaded scene, keeping the simulator app alive (og.clear + new Environment)."""
+        if self.env is not None and scene_id == self.scene_id: return
+        print(f"Switching scene: '{self.scene_id}' -> '{scene_id}'")
+        self.cfg = env_cfg if env_cfg is not None else load_env_config(scene_id)
+        if self.env is not None:
+            og.clear()
+            self.env = None
+        if self.scene_states is not None: self.scene_states.discard(self.scene_id)
+        self.scene_id = scene_id_of(self.cfg)
+        self.robot = None
+        self.task_config = None
+        self.spatial_index = None
+        self.name_index = None
+        self.snapshot = None
+        self.goal_evaluator = None
+        self.observed_object_names = []
+        self._observed_ids = frozenset()
+        self.action_dim = 0
+        self.primitives = None
+        self._initialize_env()
+
     def load_task(self, task_name=config.DEFAULT_TASK):
         """Loads task config and resets the environment."""
         print(f"Loading task: {task_name}")
@@ -90,30 +142,95 @@ class OmniGibsonInterface:
 
         with open(task_path, 'r') as f:
             self.task_config = yaml.safe_load(f)
-
-        # Optional: Check if scene_id in task matches env config
-        # For now, assume they match or env is already loaded with correct scene
-
-        print("Resetting environment for task...")
-        obs_dict, info = self.env.reset() # Use reset method
+        self.goal_evaluator = None
+
+        task_scene_id = self.task_config.get('scene_id')
+        if task_scene_id and task_scene_id != self.scene_id:
+            print(f"WARN: Task scene '{task_scene_id}' differs from the loaded scene '{self.scene_id}'.")
+
+        obs_dict = None
+        restored = self._restore_scene_state()
+        if not restored:
+            print("Resetting environment for task...")
+            obs_dict, info = self.env.reset() # Use reset method
+        applied = apply_initial_state(self.task_config.get('initial_state'), self._find_object_in_scene,
+                                      lambda state_name: getattr(object_states, state_name, None))
+        if applied: print(f"Applied {applied} initial_state entries.")
         # Re-acquire robot instance and action_dim after reset
         self.robot = self.env.robots[0]
         if hasattr(self.robot, 'action_dim'):
             self.action_dim = self.robot.action_dim
         else: self.action_dim = 0 # Fallback if controllers not fully loaded
         print(f"Environment reset complete. Robot: {self.robot.name}, Action Dim: {self.action_dim}")
+        self.primitives = ActionPrimitives(self.env, self.robot, self.action_dim, step_fn=self._advance) if self.action_dim > 0 else None
+        if not restored or self.spatial_index is None:
+            self._build_spatial_index() # A restored scene keeps its objects; the index stays valid
+        self.capture_snapshot()
+        self._compile_goal()
+        self._listed = None # First observation of a task lists everything
         return self.get_observation(obs_dict)
 
+    def _restore_scene_state(self):
+        """Restores the pristine state of the current scene. Returns False if a full reset is needed."""
+        if self.scene_states is None or not self.scene_states.has(self.scene_id):
+            return False
+        try:
+            self.scene_states.restore(self.scene_id)
+            return True
+        except Exception as e:
+            print(f"WARN: Scene state restore failed, doing a full reset: {e}")
+            self.scene_states.discard(self.scene_id)
+            return False
+
+    def _find_object_in_scene(self, name):
+        return self.env.scene.object_registry("name", name)
+
+    def _build_spatial_index(self):
+        """(Re)builds the scene-level spatial index from the current object poses."""
+        start_time = time.time()
+        self.spatial_index = SceneSpatialIndex(self.env.scene.objects, cell_size=config.SPATIAL_INDEX_CELL_SIZE, exclude=self.robot)
+        print(f"Spatial index built: {len(self.spatial_index)} objects "
+              f"({len(self.spatial_index.movable_ids)} movable) in {time.time() - start_time:.3f} seconds.")
+        self.snapshot = None # Object ids changed; previous snapshot is stale
+        index = self.spatial_index
+        self._categories = [object_category(obj, name) for obj, name in zip(index.objects, index.names)]
+        self._aliases = object_aliases(index.names) if config.OBSERVATION_SHORT_NAMES else {}
+        self.name_index = ObjectNameIndex(index.names, self._categories, self._aliases, max_edit_ratio=config.OBJECT_NAME_MAX_EDIT_RATIO)
+
+    def _snapshot_state_classes(self):
+        """Resolves the object_states classes tracked in every snapshot."""
+        state_classes = []
+        goal_conditions = self.task_config.get('goal_conditions') if self.task_config else None
+        for state_name in list(config.SNAPSHOT_STATES) + goal_state_names(goal_conditions):
+            state_cls = getattr(object_states, state_name, None)
+            if state_cls is None: print(f"WARN: Unknown snapshot state '{state_name}', skipping.")
+            elif state_cls not in state_classes: state_classes.append(state_cls)
+        return state_classes
+
+    def capture_snapshot(self):
+        """Reads object poses and tracked states once; all per-step consumers share the result."""
+        if self.spatial_index is None: self._build_spatial_index()
+        self.snapshot = WorldSnapshot.capture(self.spatial_index, self.robot, self._snapshot_state_classes(), previous=self.snapshot)
+        return self.snapshot
+
+    def _compile_goal(self):
+        """Resolves goal objects and state classes once per task instead of every step."""
+        if self.snapshot is None: self.capture_snapshot()
+        self.goal_evaluator = GoalEvaluator.compile(self.task_config['goal_conditions'], self.snapshot, self._find_object)
+        goal_ids = [self.snapshot.object_id(name) for name in goal_object_names(self.task_config['goal_conditions'])]
+        self._goal_ids = frozenset(obj_id for obj_id in goal_ids if obj_id is not None)
+        self._goal_categories = frozenset(self._categories[obj_id] for obj_id in self._goal_ids)
+
+    def display_name(self, name):
+        """Name shown to the LLM (short alias when enabled and unambiguous)."""
+        return self._aliases.get(name, name)
+
     def get_observation(self, obs_dict=None):
         """Gathers state information and formats it for the LLM."""
         if self.env is None or self.robot is None: return "Environment/Robot not ready."
 
-        # Get current robot pose
-        try:
-            robot_pos, robot_orn = self.robot.get_position_orientation()
-        except Exception as e:
-            print(f"WARN: Could not get robot pose: {e}")
-            robot_pos = np.array([0,0,0]) # Default if error
+        snapshot = self.snapshot if self.snapshot is not None else self.capture_snapshot()
+        robot_pos = snapshot.robot_pos
 
         # --- Enhanced Observation ---
         obs_lines = []
@@ -124,90 +241,124 @@ class OmniGibsonInterface:
         #    obs_lines.append(f"Robot is holding: {', '.join(self.robot.inventory)}")
         # else:
         #    obs_lines.append("Robot is holding: Nothing.")
-        obs_lines.append("Robot is holding: Nothing.") # Placeholder
+        held = self.primitives.held_object if self.primitives is not None else None
+        obs_lines.append(f"Robot is holding: {self.display_name(held.name) if held is not None else 'Nothing'}.")
 
         # Nearby Objects and States
-        nearby_objects_str = []
-        max_dist = 4.0 # Look a bit further
+        max_dist = config.OBSERVATION_MAX_DISTANCE
 
         try:
-            all_objects = self.env.scene.objects # Use the list we verified
-            if not all_objects:
+            if len(snapshot.objects) == 0:
                  print("WARN: env.scene.objects is empty.")
 
-            for obj in all_objects:
-                if obj == self.robot or not hasattr(obj, 'name') or not hasattr(obj, 'get_position_orientation'):
-                    continue # Skip robot itself or objects without expected attributes
-
-                try:
-                    obj_pos, _ = obj.get_position_orientation()
-                    dist = np.linalg.norm(robot_pos - obj_pos)
-
-                    if dist < max_dist:
-                        state_strs = []
-                        # Check relevant states
-                        if object_states.ToggledOn in obj.states:
-                            state_strs.append(f"toggled={'on' if obj.states[object_states.ToggledOn].get_value() else 'off'}")
-                        if object_states.Open in obj.states:
-                            state_strs.append(f"open={'true' if obj.states[object_states.Open].get_value() else 'false'}")
-                        # Add more states as needed (Cooked, Frozen, etc.)
-
-                        state_desc = f" ({', '.join(state_strs)})" if state_strs else ""
-                        nearby_objects_str.append(f"{obj.name}{state_desc} [{dist:.1f}m]")
-
-                except Exception as obj_e:
-                    # print(f"Debug: Error processing object {getattr(obj, 'name', 'N/A')}: {obj_e}") # Optional debug
-                    pass # Skip object if error occurs
-
-            if nearby_objects_str:
-                obs_lines.append("Nearby objects: " + ", ".join(sorted(nearby_objects_str)))
-            else:
-                obs_lines.append("No relevant objects detected nearby.")
+            # One vectorized radius search instead of a per-object distance loop
+            nearby_ids, nearby_dists = snapshot.nearby(max_dist)
+            self.line_cache.update(snapshot, self.display_name) # Re-formats only objects whose states changed
+            # Most relevant first (goal objects, same category, stateful, then by distance), cut to the token budget
+            ranked = rank_objects(nearby_ids, nearby_dists, self._goal_ids, self._goal_categories, self._categories,
+                                  self.line_cache.state_text)
+            delta = (config.OBSERVATION_MODE == "delta" and self._listed is not None
+                     and self._observations_since_full + 1 < config.OBSERVATION_FULL_EVERY)
+            obs_lines += self._delta_object_lines(obs_lines, ranked) if delta else self._full_object_lines(obs_lines, ranked)
+            self.observed_object_names = [self.line_cache.labels[obj_id] for obj_id in self._listed]
+            self._observed_ids = frozenset(self._listed)
 
         except Exception as e:
-            print(f"ERROR getting observation details: {e}")
+            log.error("observation_failed", "Getting observation details failed: {error}", error=str(e))
             obs_lines.append("Error retrieving object details.")
 
         return "\n".join(obs_lines)
 
+    def _format_objects(self, pairs):
+        return ", ".join(self.line_cache.text(obj_id) + distance_text(dist) for obj_id, dist in pairs)
+
+    def _fit_objects(self, header, ranked, overflow_note):
+        """Longest prefix of ranked (id, dist) pairs fitting OBSERVATION_TOKEN_BUDGET after header, and the number dropped."""
+        budget = config.OBSERVATION_TOKEN_BUDGET
+        if budget is None: return list(ranked), 0
+        if self.token_counter is None: self.token_counter = TokenCounter.from_path(config.TOKENIZER_PATH)
+        count, text = self.token_counter.count, self.line_cache.text
+        costs = [count(text(obj_id)) + count(distance_text(dist) + ", ") for obj_id, dist in ranked] # Both parts repeat across steps
+        return fit_items(header, ranked, budget, self.token_counter, overflow_note=overflow_note, costs=costs)
+
+    def _full_object_lines(self, obs_lines, ranked):
+        """Every nearby object that fits the budget; they become what the LLM is known to have seen."""
+        more = " (+{} more objects farther or less relevant)"
+        kept, dropped = self._fit_objects("\n".join(obs_lines) + "\nNearby objects: ", ranked, more.format(len(ranked)))
+        self._listed = {obj_id: self.line_cache.state_rows.get(obj_id) for obj_id, _ in kept}
+        self._observations_since_full = 0
+        self._in_range = {obj_id for obj_id, _ in ranked}
+        if not kept and not dropped: return ["No relevant objects detected nearby."]
+        return ["Nearby objects: " + self._format_objects(kept) + (more.format(dropped) if dropped else "")]
+
+    def _delta_object_lines(self, obs_lines, ranked):
+        """Changes since the previous observation (OBSERVATION_MODE = "delta").
+
+        Goal objects in range are always listed (prompts carry no history); otherwise only listed
+        objects whose states changed, objects that came into range, and listed objects now out
+        of range. Objects left out of the last full observation by the budget stay left out.
+        """
+        listed, state_rows = self._listed, self.line_cache.state_rows
+        in_range = {obj_id for obj_id, _ in ranked}
+        goal = [(i, d) for i, d in ranked if i in self._goal_ids]
+        changed = [(i, d) for i, d in ranked if i in listed and i not in self._goal_ids and state_rows.get(i) != listed[i]]
+        new = [(i, d) for i, d in ranked if i not in self._in_range and i not in listed and i not in self._goal_ids]
+        gone = [i for i in listed if i not in in_range]
+        lines = []
+        if goal: lines.append("Goal objects: " + self._format_objects(goal))
+        if changed: lines.append("Changed since last step: " + self._format_objects(changed))
+        if new:
+            more = " (+{} more)"
+            new, dropped = self._fit_objects("\n".join(obs_lines + lines) + "\nNow nearby: ", new, more.format(len(new)))
+            if new or dropped: lines.append("Now nearby: " + self._format_objects(new) + (more.format(dropped) if dropped else ""))
+        if gone: lines.append("No longer nearby: " + ", ".join(self.line_cache.labels[i] for i in gone))
+        if not (changed or new or gone): lines.append("No other changes nearby since the last step.")
+        for obj_id in gone: del listed[obj_id]
+        for obj_id, _ in goal + changed + new: listed[obj_id] = state_rows.get(obj_id)
+        self._observations_since_full += 1
+        self._in_range = in_range
+        return lines
+
     def get_task_goal_description(self):
         """Returns the natural language description of the goal."""
         return self.task_config.get("description", "No description provided.") if self.task_config else "No task loaded."
 
     def execute_action(self, function_name: str, args: list):
         """Executes a specific action based on parsed LLM output."""
-        print(f"Attempting to execute action: {function_name} with args: {args}")
+        log.debug("execute_action", "Attempting to execute action: {function} with args: {args}", function=function_name, args=list(args))
         if self.env is None or self.robot is None:
             return False, "Environment or robot not ready."
 
         success = False
         message = ""
+        self.last_action_ticks = 0
+        self.last_action_wall_time_s = 0.0
+        resolved_note = "" # Set when an inexact object name was resolved
         try:
             target_obj_name = args[0] if args else None
-            target_obj = self.env.scene.object_registry("name", target_obj_name) if target_obj_name else None
+            target_obj, resolved_note = self.resolve_object(target_obj_name) if target_obj_name else (None, "")
 
             if target_obj_name and target_obj is None:
                  message = f"Object '{target_obj_name}' not found in the scene."
-                 print(f"ERROR: {message}")
+                 log.warn("object_not_found", "{message}", message=message, name=target_obj_name)
                  return False, message
 
-            # --- Action Implementations (Placeholders & TODOs) ---
-            if function_name == "navigate_to_object":
+            # --- Action Implementations ---
+            # navigate/pick/place are multi-tick primitives that advance the simulator (see action_primitives.py)
+            if function_name in ("navigate_to_object", "pick_up_object", "place_object_on") and self.primitives is None:
+                message = f"Cannot run {function_name}: robot has no controllers (action_dim is 0)."
+
+            elif function_name == "navigate_to_object":
                 if target_obj:
-                    print(f"TODO: Implement navigation to {target_obj.name} using robot controllers.")
-                    # E.g., self.robot.controllers["base"]... or self.robot.controllers["navigation"]...
-                    # Simulate time/success for now
-                    time.sleep(1.0)
-                    success = True
-                    message = f"Navigation placeholder successful for {target_obj.name}."
+                    success, message = self._run_primitive(self.primitives.navigate_to, target_obj)
                 else: message = "Navigation requires a valid object name."
 
             elif function_name == "toggle_object":
                  if target_obj:
-                     print(f"Attempting to toggle {target_obj.name}...")
                      if object_states.ToggledOn in target_obj.states:
                          # Option 1: Use utility (Less realistic, but simpler to start)
-                         current_val = target_obj.states[object_states.ToggledOn].get_value()
+                         from octogibson.utils import action_utils as au # Deferred: only toggling needs it (ensure action_utils.py has the typo fixed)
+                         current_val = self._read_state(target_obj, object_states.ToggledOn)
                          target_val = not current_val
                          au.change_states(target_obj, "toggleable", int(target_val))
                          success = True
@@ -224,27 +375,18 @@ class OmniGibsonInterface:
 
             elif function_name == "pick_up_object":
                  if target_obj:
-                    print(f"TODO: Implement picking up {target_obj.name} using robot controllers (arm, gripper).")
-                    # Check distance, navigate close if needed, use IK, grasp action.
-                    time.sleep(0.5)
-                    success = True # Placeholder
-                    message = f"Pickup placeholder for {target_obj.name}."
+                    success, message = self._run_primitive(self.primitives.pick_up, target_obj)
                  else: message = "Pickup requires a valid object name."
 
             elif function_name == "place_object_on":
                  if len(args) < 2: message = "Place requires object_to_place and surface_object_name."
                  else:
-                     # object_to_place = args[0] # Need to check inventory
                      surface_obj_name = args[1]
-                     surface_obj = self.env.scene.object_registry("name", surface_obj_name)
+                     surface_obj, surface_note = self.resolve_object(surface_obj_name)
+                     resolved_note += surface_note
                      if not surface_obj: message = f"Surface object '{surface_obj_name}' not found."
-                     # elif object_to_place not in self.robot.inventory: message = f"Robot not holding '{object_to_place}'."
                      else:
-                         print(f"TODO: Implement placing object on {surface_obj.name} using robot controllers.")
-                         # Navigate, use IK, release action.
-                         time.sleep(0.5)
-                         success = True # Placeholder
-                         message = f"Place placeholder on {surface_obj.name}."
+                         success, message = self._run_primitive(self.primitives.place_on, target_obj.name, surface_obj)
 
             else:
                 message = f"Unknown action function: {function_name}"
@@ -253,27 +395,125 @@ class OmniGibsonInterface:
             message = f"Incorrect number of arguments for action {function_name}."
         except Exception as e:
             message = f"Error executing action {function_name}: {e}"
-            print(f"ERROR: {message}") # Print detailed error
+            log.error("action_error", "{message}", message=message, function=function_name)
             success = False # Ensure failure on exception
 
-        print(f"Action Result: Success={success}, Msg='{message}'")
+        message = resolved_note + message
+        log.info("action_result", "Action Result: Success={success}, Msg='{message}'", function=function_name, args=list(args),
+                 success=success, message=message, sim_ticks=self.last_action_ticks)
         return success, message
 
+    def _run_primitive(self, primitive, *args):
+        result = primitive(*args)
+        self.last_action_ticks = result.ticks
+        self.last_action_wall_time_s = result.wall_time_s
+        log.debug("primitive", "Primitive used {ticks} sim ticks in {wall_time_s:.3f} seconds.", ticks=result.ticks, wall_time_s=result.wall_time_s)
+        return result.success, result.message
+
+    def _find_object(self, name):
+        """Resolves an object by exact (full or displayed) name from the name index, falling back to the scene registry."""
+        obj_id = self.name_index.lookup(name) if self.name_index is not None else None
+        if obj_id is not None: return self.spatial_index.objects[obj_id]
+        return self.env.scene.object_registry("name", name)
+
+    def resolve_object(self, name):
+        """Resolves an object name written by the LLM, tolerating near misses (config.OBJECT_NAME_FUZZY).
+
+        Returns (object or None, note): the note tells the LLM which object an inexact name was
+        taken to mean. Among several matching instances the one listed in the last observation,
+        then the nearest to the robot, is chosen.
+        """
+        if self.name_index is None: return self._find_object(name), ""
+        obj_id, kind = self.name_index.resolve(name, choose=self._nearest_instance, fuzzy=config.OBJECT_NAME_FUZZY)
+        if obj_id is None: return self.env.scene.object_registry("name", name), ""
+        obj = self.spatial_index.objects[obj_id]
+        if kind in ("exact", "normalized"): return obj, ""
+        log.info("name_resolved", "Resolved object name '{query}' -> '{name}' ({kind} match).", query=name, name=obj.name, kind=kind)
+        return obj, f"(Interpreted '{name}' as '{self.display_name(obj.name)}'.) "
+
+    def _nearest_instance(self, ids):
+        """Of several candidate ids, the one shown in the last observation, then nearest to the robot."""
+        if len(ids) == 1: return ids[0]
+        snapshot = self.snapshot if self.snapshot is not None else self.capture_snapshot()
+        dists = np.linalg.norm(self.spatial_index.positions[ids] - snapshot.robot_pos, axis=1)
+        return min(zip(ids, dists.tolist()), key=lambda pair: (pair[0] not in self._observed_ids, pair[1]))[0]
+
+    def _read_state(self, obj, state_cls):
+        """Reads a state value from the current snapshot if tracked, else from the simulator."""
+        if self.snapshot is not None:
+            obj_id = self.snapshot.object_id(obj.name)
+            if obj_id is not None and self.snapshot.is_tracked(state_cls):
+                value = self.snapshot.state_value(obj_id, state_cls)
+                if value is not None: return value
+        return obj.states[state_cls].get_value()
+
+    def _advance(self, action):
+        """One simulator tick with action. Returns the sensor obs_dict ({} when rendering is deferred).
+
+        With lazy rendering only the robot action is applied and physics (plus object state
+        updates) stepped; nothing is rendered and no sensor is read until get_frame() asks.
+        Otherwise env.step renders and computes every configured modality.
+        """
+        if self.lazy_rendering:
+            self.robot.apply_action(action)
+            og.sim.step(render=False)
+            self._frame_stale = True
+            self.sensor_stats["physics_steps"] += 1
+            return {}
+        obs_dict, reward, terminated, truncated, info = self.env.step(action)
+        self.sensor_stats["rendered_steps"] += 1
+        self._count_modalities(obs_dict)
+        return obs_dict
+
+    def _count_modalities(self, obs):
+        """Counts the modalities present in a (nested) sensor observation dict."""
+        for key, value in (obs or {}).items():
+            if isinstance(value, dict): self._count_modalities(value)
+            else: self.sensor_stats["computed"][key] += 1
+
+    def get_frame(self, modalities=None):
+        """Robot sensor readings {sensor: {modality: array}} for modalities (default: all configured).
+
+        Renders first if physics advanced since the last frame. Only consumers that need
+        images (e.g. a VLM or a video recorder) should call this; text observations do not.
+        """
+        if self.robot is None: return {}
+        if self.lazy_rendering and self._frame_stale:
+            og.sim.render()
+            self._frame_stale = False
+        obs = self.robot.get_obs()
+        if isinstance(obs, tuple): obs = obs[0] # (obs, info) in newer OmniGibson versions
+        self.sensor_stats["frames"] += 1
+        self._count_modalities(obs)
+        frame = {}
+        for sensor_name, readings in obs.items():
+            if not isinstance(readings, dict): readings = {sensor_name: readings}
+            selected = {m: v for m, v in readings.items() if modalities is None or m in modalities}
+            if selected: frame[sensor_name] = selected
+        return frame
+
+    def sensor_report(self):
+        stats = self.sensor_stats
+        computed = ", ".join(f"{m} x{n}" for m, n in stats["computed"].most_common()) or "none"
+        return (f"{stats['physics_steps']} physics-only steps, {stats['rendered_steps']} rendered steps, "
+                f"{stats['frames']} frames requested; modalities computed: {computed}")
+
     def step_simulation(self):
         """Steps the simulation forward one step with zero action."""
         if self.env is None: return None
         if self.action_dim <= 0:
-            print("WARN: Cannot step simulation, action_dim is 0. No controllers likely loaded.")
+            log.warn("no_controllers", "Cannot step simulation, action_dim is 0. No controllers likely loaded.")
             # Returning dummy values, might need better handling
             return {}, 0, False, False, {"error": "action_dim is 0"}
 
         action = np.zeros(self.action_dim)
         try:
-            # Step the environment
-            obs_dict, reward, terminated, truncated, info = self.env.step(action)
+            # Step the environment (physics only with lazy rendering; the text observation needs no sensors)
+            obs_dict = self._advance(action)
+            self.capture_snapshot() # One bulk read shared by observation, goal check and next action
             return obs_dict # Return new observations
         except Exception as e:
-            print(f"ERROR during environment step: {e}")
+            log.error("sim_step_failed", "Environment step failed: {error}", error=str(e))
             return None # Indicate failure
 
     def check_success(self):
@@ -282,42 +522,16 @@ class OmniGibsonInterface:
             return False # Cannot succeed if no goal is defined
         if self.env is None: return False
 
-        all_conditions_met = True
-        for condition in self.task_config['goal_conditions']:
-            obj_name = condition.get('object_name')
-            condition_type_str = condition.get('type') # e.g., "ToggledOn"
-            target_state_val = condition.get('target_value', True) # Default target is True
-
-            if not obj_name or not condition_type_str: continue # Skip invalid condition
-
-            target_obj = self.env.scene.object_registry("name", obj_name)
-            if not target_obj:
-                all_conditions_met = False; break # Object not found
-
-            # Map string condition type to OmniGibson state class
-            condition_state_class = getattr(object_states, condition_type_str, None)
-            if condition_state_class is None or condition_state_class not in target_obj.states:
-                print(f"WARN: Condition type '{condition_type_str}' not found or not applicable to '{obj_name}'.")
-                all_conditions_met = False; break
-
-            # Check the actual state value
-            try:
-                current_state_val = target_obj.states[condition_state_class].get_value()
-                # Handle boolean comparison carefully (e.g., 1 == True, 0 == False)
-                target_bool = bool(target_state_val)
-                current_bool = bool(current_state_val)
-                if current_bool != target_bool:
-                    all_conditions_met = False; break
-            except Exception as e:
-                 print(f"ERROR checking state {condition_type_str} for {obj_name}: {e}")
-                 all_conditions_met = False; break
-
-        if all_conditions_met: print("SUCCESS: Task goal conditions met!")
+        if self.goal_evaluator is None: self._compile_goal()
+        all_conditions_met = self.goal_evaluator.evaluate(self.snapshot)
+
+        if all_conditions_met: log.info("goal_met", "SUCCESS: Task goal conditions met!")
         return all_conditions_met
 
     def close(self):
         """Closes the OmniGibson environment."""
         if self.env:
+            print(f"Sensors: {self.sensor_report()}")
             print("Closing OmniGibson Environment...")
             self.env.close()
             self.env = None
@@ -0,0 +1,291 @@
+# parallel_runner.py
+# Runs many (task, seed[, scene_id]) episodes on a pool of worker processes, each with its
+# own simulator instance. Usage: python parallel_runner.py --tasks turn_on_light --episodes 8 --workers 4
+import argparse
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+def default_env_factory(scene_id=None, env_cfg=None):
+    """Builds the real OmniGibson-backed env inside a worker process."""
+    from omnigibson_interface import OmniGibsonInterface
+    from omnigibson_env import OmniGibsonEnv
+    return OmniGibsonEnv(OmniGibsonInterface(scene_id=scene_id, env_cfg=env_cfg))
+
+def default_llm_factory():
+    """Connects to the shared LLM server if configured, else loads a model per worker."""
+    if config.LLM_SERVER_ADDRESS:
+        from llm_server import LLMClient
+        return LLMClient()
+    print("WARN: No LLM server configured; every worker loads its own model copy.")
+    from llm_api import LLM_API
+    return LLM_API()
+
+def _seed_everything(seed):
+    random.seed(seed)
+    try:
+        import numpy as np
+        np.random.seed(seed % 2**32)
+    except ImportError:
+        pass
+
+def _job_scene(job):
+    return job[2] if len(job) > 2 else None
+
+def _prepared_config(prepared, scene_id):
+    future = prepared.pop(scene_id, None)
+    if future is None: return None
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"WARN: Background preparation of scene '{scene_id}' failed: {e}")
+        return None
+
+def _worker_main(worker_id, generation, job_queue, result_queue, env_factory, llm_factory):
+    """Worker process: builds its LLM once, then runs jobs until it receives None.
+
+    The env is built for the first job's scene and switched only when a job names a
+    different scene. The next scene hinted by the parent is prepared in the background.
+    Every message carries (worker_id, generation) so the parent can ignore messages from a
+    process it already replaced.
+    """
+    from run_voyager_omnigibson import load_prompt_template, run_episode, open_skill_library
+    from env_config import prepare_scene
+    try:
+        llm = llm_factory()
+        prompt_template = load_prompt_template()
+        skills = open_skill_library() # Shared SQLite file: skills solved by one worker are replayed by the others
+    except Exception as e:
+        result_queue.put(("init_failed", worker_id, generation, repr(e)))
+        return
+    result_queue.put(("ready", worker_id, generation, None))
+    env = None
+    prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scene-prefetch")
+    prepared = {} # scene_id -> Future of its env config
+    try:
+        while True:
+            message = job_queue.get()
+            if message is None: break
+            job, next_scene = message
+            task_name, seed, scene_id = job[0], job[1], _job_scene(job)
+            scene_load = env is None or (scene_id is not None and scene_id != env.interface.scene_id)
+            if scene_load:
+                env_cfg = _prepared_config(prepared, scene_id) if scene_id else None
+                try:
+                    if env is None: env = env_factory(scene_id, env_cfg)
+                    else: env.interface.switch_scene(scene_id, env_cfg)
+                except Exception as e:
+                    env = None # Rebuilt from scratch by the next job
+                    result = {"task": task_name, "status": "setup_error", "success": False, "steps": 0, "error": repr(e)}
+                    result.update(seed=seed, worker=worker_id, scene=scene_id, scene_load=True)
+                    result_queue.put(("result", worker_id, generation, result))
+                    continue
+            if next_scene and next_scene != scene_id and next_scene not in prepared:
+                prepared[next_scene] = prefetcher.submit(prepare_scene, next_scene)
+            _seed_everything(seed)
+            try:
+                result = run_episode(env, llm, task_name, prompt_template, skills=skills)
+            except Exception as e:
+                result = {"task": task_name, "status": "error", "success": False, "steps": 0, "error": repr(e)}
+            result.update(seed=seed, worker=worker_id, scene=env.interface.scene_id, scene_load=scene_load)
+            result_queue.put(("result", worker_id, generation, result))
+    finally:
+        from tracing import tracer, export_trace
+        if tracer.enabled: export_trace(f"worker{worker_id}_{os.getpid()}")
+        prefetcher.shutdown(wait=False, cancel_futures=True)
+        if env is not None: env.close()
+
+class _Worker:
+    def __init__(self, ctx, worker_id, generation, result_queue, env_factory, llm_factory):
+        self.worker_id = worker_id
+        self.generation = generation # Unique per spawn; a restarted worker keeps its id but not its generation
+        self.job_queue = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main, name=f"episode-worker-{worker_id}",
+            args=(worker_id, generation, self.job_queue, result_queue, env_factory, llm_factory), daemon=True,
+        )
+        self.ready = False
+        self.job = None # (task, seed[, scene_id]) currently running
+        self.scene = None # Scene of the last job handed to this worker
+        self.job_started = None
+        self.process.start()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=10)
+
+class ParallelRunner:
+    """Pool of worker processes, each holding its own OmniGibsonInterface/OmniGibsonEnv.
+
+    Idle workers are handed the next (task, seed[, scene_id]) job, preferring jobs in the scene
+    they already have loaded, so each scene is built at most once per worker when jobs carry a
+    scene_id (see suite_runner.py). Episodes exceeding episode_timeout_s
+    are killed and recorded as timeouts; crashed or killed workers are restarted (up to
+    max_restarts in total). env_factory(scene_id, env_cfg) and llm_factory() must be picklable
+    (module-level) callables, so a fake backend can be swapped in.
+    """
+    def __init__(self, num_workers=config.PARALLEL_NUM_WORKERS, env_factory=default_env_factory,
+                 llm_factory=default_llm_factory, episode_timeout_s=config.PARALLEL_EPISODE_TIMEOUT_S,
+                 max_restarts=config.PARALLEL_MAX_RESTARTS, start_method=config.PARALLEL_START_METHOD):
+        self.num_workers = num_workers
+        self.env_factory = env_factory
+        self.llm_factory = llm_factory
+        self.episode_timeout_s = episode_timeout_s
+        self.max_restarts = max_restarts
+        self._ctx = mp.get_context(start_method)
+        self.num_restarts = 0
+        self.num_stale_messages = 0 # Messages from replaced (timed out / crashed) worker processes, ignored
+        self._generations = itertools.count()
+
+    def _spawn(self, worker_id, result_queue):
+        return _Worker(self._ctx, worker_id, next(self._generations), result_queue, self.env_factory, self.llm_factory)
+
+    def _replace(self, workers, worker, result_queue):
+        worker.kill()
+        if self.num_restarts >= self.max_restarts:
+            print(f"WARN: Worker {worker.worker_id} lost and restart budget exhausted.")
+            del workers[worker.worker_id]
+            return
+        self.num_restarts += 1
+        print(f"Restarting worker {worker.worker_id} ({self.num_restarts}/{self.max_restarts} restarts used)...")
+        workers[worker.worker_id] = self._spawn(worker.worker_id, result_queue)
+
+    @staticmethod
+    def _failed_result(job, worker_id, status, error):
+        task_name, seed = job[0], job[1]
+        return {"task": task_name, "seed": seed, "worker": worker_id, "status": status, "success": False, "steps": 0, "error": error}
+
+    @staticmethod
+    def _pick_scene(pending, workers, worker, skip=None):
+        """The scene with most pending jobs, preferring scenes no other worker has loaded."""
+        counts = {}
+        for job in pending:
+            scene = _job_scene(job)
+            if scene != skip: counts[scene] = counts.get(scene, 0) + 1
+        if not counts: return None
+        held = {w.scene for w in workers.values() if w is not worker}
+        free = [scene for scene in counts if scene not in held]
+        return max(free or counts, key=lambda scene: counts[scene])
+
+    def _take_job(self, worker, pending, workers):
+        """Pops the next job for worker (its current scene first) plus a hint of its next scene."""
+        index = next((i for i, job in enumerate(pending) if _job_scene(job) == worker.scene), None)
+        if index is None:
+            scene = self._pick_scene(pending, workers, worker)
+            index = next(i for i, job in enumerate(pending) if _job_scene(job) == scene)
+        job = pending.pop(index)
+        worker.scene = _job_scene(job)
+        return job, self._pick_scene(pending, workers, worker, skip=worker.scene)
+
+    def run(self, jobs, on_result=None):
+        """Runs all (task, seed[, scene_id]) jobs and returns their results (in completion order)."""
+        pending = list(jobs)
+        total = len(pending)
+        results = []
+        result_queue = self._ctx.Queue()
+        workers = {i: self._spawn(i, result_queue) for i in range(min(self.num_workers, total))}
+
+        def record(result):
+            results.append(result)
+            print(f"[{len(results)}/{total}] {result['task']} (seed={result.get('seed')}): "
+                  f"{result['status']} in {result['steps']} steps")
+            if on_result: on_result(result)
+
+        try:
+            while len(results) < total:
+                if not workers:
+                    for job in pending: record(self._failed_result(job, None, "not_run", "no workers left"))
+                    break
+                # Hand the next job to every idle worker
+                for worker in workers.values():
+                    if worker.ready and worker.job is None and pending:
+                        worker.job, next_scene = self._take_job(worker, pending, workers)
+                        worker.job_started = time.monotonic()
+                        worker.job_queue.put((worker.job, next_scene))
+
+                try:
+                    kind, worker_id, generation, payload = result_queue.get(timeout=0.5)
+                except queue.Empty:
+                    kind = None
+                worker = workers.get(worker_id) if kind else None
+                if worker is not None and worker.generation != generation:
+                    # Sent by a process that was since replaced under the same id (e.g. a result
+                    # that raced its timeout); it must not be recorded against the new process's job
+                    self.num_stale_messages += 1
+                    print(f"WARN: Ignoring '{kind}' from a replaced process of worker {worker_id}.")
+                    kind, worker = None, None
+                if kind == "ready" and worker:
+                    worker.ready = True
+                elif kind == "result" and worker:
+                    worker.job = None
+                    record(payload)
+                elif kind == "init_failed":
+                    print(f"ERROR: Worker {worker_id} failed to initialize: {payload}")
+                    if worker: self._replace(workers, worker, result_queue)
+
+                now = time.monotonic()
+                for worker in list(workers.values()):
+                    if worker.job is not None and now - worker.job_started > self.episode_timeout_s:
+                        print(f"WARN: Episode {worker.job} timed out on worker {worker.worker_id}.")
+                        record(self._failed_result(worker.job, worker.worker_id, "timeout", f"exceeded {self.episode_timeout_s}s"))
+                        self._replace(workers, worker, result_queue)
+                    elif not worker.process.is_alive(): # Also during init (e.g. killed while loading the model), before any message
+                        print(f"WARN: Worker {worker.worker_id} died{'' if worker.ready else ' during init'} (exit code {worker.process.exitcode}).")
+                        if worker.job is not None:
+                            record(self._failed_result(worker.job, worker.worker_id, "crashed", f"exit code {worker.process.exitcode}"))
+                        self._replace(workers, worker, result_queue)
+        finally:
+            for worker in workers.values():
+                worker.job_queue.put(None)
+            for worker in workers.values():
+                worker.process.join(timeout=30)
+                worker.kill()
+        return results
+
+def aggregate_results(results):
+    """Success rate and steps-to-success, overall and per task."""
+    def summarize(rows):
+        successes = [r for r in rows if r.get("success")]
+        steps = [r["steps"] for r in successes]
+        statuses = {}
+        for r in rows: statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+        return {
+            "episodes": len(rows),
+            "successes": len(successes),
+            "success_rate": len(successes) / len(rows) if rows else 0.0,
+            "mean_steps_to_success": statistics.mean(steps) if steps else None,
+            "median_steps_to_success": statistics.median(steps) if steps else None,
+            "statuses": statuses,
+        }
+    by_task = {}
+    for r in results: by_task.setdefault(r["task"], []).append(r)
+    return {"overall": summarize(results), "tasks": {task: summarize(rows) for task, rows in sorted(by_task.items())}}
+
+def print_report(report):
+    def line(name, summary):
+        mean_steps = summary["mean_steps_to_success"]
+        steps = f"{mean_steps:.1f}" if mean_steps is not None else "-"
+        print(f"{name:<30} {summary['successes']:>4}/{summary['episodes']:<4} {summary['success_rate']:>8.1%} {steps:>11} {summary['statuses']}")
+    print(f"\n{'task':<30} {'solved':>9} {'rate':>8} {'mean steps':>11} statuses")
+    for task, summary in report["tasks"].items(): line(task, summary)
+    line("OVERALL", report["overall"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run task episodes in parallel worker processes.")
+    parser.add_argument("--tasks", nargs="+", default=[config.DEFAULT_TASK])
+    parser.add_argument("--episodes", type=int, default=1, help="Episodes (seeds) per task.")
+    parser.add_argument("--workers", type=int, default=config.PARALLEL_NUM_WORKERS)
+    parser.add_argument("--timeout", type=float, default=config.PARALLEL_EPISODE_TIMEOUT_S)
+    args = parser.parse_args()
+
+    jobs = [(task, seed) for task in args.tasks for seed in range(args.episodes)]
+    runner = ParallelRunner(num_workers=args.workers, episode_timeout_s=args.timeout)
+    print_report(aggregate_results(runner.run(jobs)))
@@ -0,0 +1,66 @@
+# prefix_cache.py
+from collections import OrderedDict
+
+def kv_cache_nbytes(past_key_values):
+    """Best-effort size in bytes of a HuggingFace KV cache (Cache object or legacy tuples)."""
+    tensors = []
+    if hasattr(past_key_values, 'layers'): # transformers >= 4.54 Cache
+        for layer in past_key_values.layers:
+            tensors.extend(t for t in (getattr(layer, 'keys', None), getattr(layer, 'values', None)) if t is not None)
+    elif hasattr(past_key_values, 'key_cache'): # Older DynamicCache
+        tensors.extend(past_key_values.key_cache)
+        tensors.extend(past_key_values.value_cache)
+    else: # Legacy tuple of (key, value) per layer
+        for layer in past_key_values or ():
+            tensors.extend(layer)
+    return sum(t.numel() * t.element_size() for t in tensors if hasattr(t, 'numel'))
+
+class PrefixKVCache:
+    """LRU cache of prefilled KV states, keyed by the static prompt prefix text.
+
+    Bounded by entry count and total bytes; the least recently used prefix (e.g. the
+    previous task's) is evicted first.
+    """
+    def __init__(self, max_entries=2, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # prefix text -> (prefix_ids, past_key_values, nbytes)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, prefix):
+        """Returns (prefix_ids, past_key_values) or None. Callers must copy the KV before mutating it."""
+        entry = self._entries.get(prefix)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(prefix)
+        return entry[0], entry[1]
+
+    def put(self, prefix, prefix_ids, past_key_values):
+        nbytes = kv_cache_nbytes(past_key_values)
+        if self.max_bytes is not None and nbytes > self.max_bytes:
+            print(f"WARN: Prefix KV ({nbytes / 2**20:.1f} MiB) exceeds cache limit; not caching.")
+            return
+        if prefix in self._entries:
+            self.total_bytes -= self._entries.pop(prefix)[2]
+        self._entries[prefix] = (prefix_ids, past_key_values, nbytes)
+        self.total_bytes += nbytes
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+            _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.total_bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,6 @@
+# prompting.py
+# Prompt helpers with no heavy dependencies, so runners can import them without torch/transformers.
+
+def build_prompt_prefix(prompt_template: str, task_description: str) -> str:
+    """Returns the static part of the prompt (everything before the observation)."""
+    return prompt_template.split("{observation}")[0].format(task_description=task_description)
@@ -0,0 +1,122 @@
+# response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """Content-addressed prompt -> response cache for deterministic (greedy) generation.
+
+    Two tiers: an in-memory LRU of max_memory_entries, backed by an SQLite file bounded
+    to max_disk_bytes (least recently used rows are deleted first). Safe to share between
+    threads; several processes may share the same file (WAL mode). The file's size is tracked
+    as a running byte total, loaded at open and updated on every write; it is only re-summed
+    (picking up other processes' writes) when it crosses max_disk_bytes; eviction then goes
+    down to EVICT_TO of the limit, so a full cache is not re-summed on every write.
+    """
+    EVICT_TO = 0.9 # Fraction of max_disk_bytes left after an eviction pass
+    def __init__(self, path, max_memory_entries=1024, max_disk_bytes=256 * 2**20):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+        self._db = None
+        self._disk_bytes = 0 # Running SUM(size) of the responses table
+        if path:
+            if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+            self._db.commit()
+            self._disk_bytes = self._sum_sizes()
+
+    @staticmethod
+    def make_key(model_path, quantization, gen_kwargs, prompt, grammar_signature=None):
+        """Hash of everything that determines the greedy output."""
+        material = json.dumps(
+            {"model": model_path, "quantization": quantization, "gen_kwargs": gen_kwargs,
+             "grammar": grammar_signature, "prompt": prompt},
+            sort_keys=True, default=repr,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            self._remember(key, response)
+            if self._db is None: return
+            size = len(response.encode("utf-8")) + len(key)
+            replaced = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, size, time.time()),
+            )
+            self._disk_bytes += size - (replaced[0] if replaced else 0)
+            if self._disk_bytes > self.max_disk_bytes: self._evict_disk()
+            self._db.commit()
+
+    def _remember(self, key, response):
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _sum_sizes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict_disk(self):
+        """Deletes least recently used rows until the file is within EVICT_TO of max_disk_bytes."""
+        total = self._sum_sizes() # Exact again, including rows other processes wrote or deleted
+        if total <= self.max_disk_bytes:
+            self._disk_bytes = total
+            return
+        while total > self.EVICT_TO * self.max_disk_bytes:
+            row = self._db.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 1").fetchone()
+            if row is None: break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            total -= row[1]
+            self.disk_evictions += 1
+        self._disk_bytes = total
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits, "disk_hits": self.disk_hits, "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory), "disk_evictions": self.disk_evictions,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
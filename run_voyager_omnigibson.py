@@ -1,83 +1,280 @@
 # run_voyager_omnigibson.py
+import contextlib
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 import config
-from omnigibson_interface import OmniGibsonInterface
-from omnigibson_env import OmniGibsonEnv
-from llm_api import LLM_API
+from prompting import build_prompt_prefix
+from tracing import tracer, summarize, print_summary, export_trace
+from action_program import format_call
+from skill_library import SkillLibrary, goal_key
+from event_log import log, DEBUG
 
-def run_agent():
-    print("--- Starting Voyager-OmniGibson Run ---")
+def load_prompt_template(template_name=None):
+    if template_name is None:
+        template_name = config.PROGRAM_PROMPT_TEMPLATE_NAME if config.ACTION_PROGRAM_MODE else config.ACTION_PROMPT_TEMPLATE_NAME
+    prompt_template_path = os.path.join(config.PROMPT_DIR, template_name)
+    with open(prompt_template_path, 'r') as f:
+        return f.read()
 
-    # 1. Initialize Components
-    try:
-        print("Initializing LLM...")
-        llm = LLM_API()
-        print("Initializing Interface...")
-        interface = OmniGibsonInterface()
-        print("Initializing Env Wrapper...")
-        env = OmniGibsonEnv(interface)
-    except Exception as e:
-        print(f"FATAL: Failed to initialize components: {e}")
-        # Attempt cleanup if possible
-        if 'env' in locals() and env: env.close()
-        elif 'interface' in locals() and interface: interface.close()
-        return
+def open_skill_library():
+    if not config.SKILL_LIBRARY: return None
+    return SkillLibrary(config.SKILL_LIBRARY_PATH, similarity_threshold=config.SKILL_SIMILARITY_THRESHOLD,
+                        max_failures=config.SKILL_MAX_FAILURES)
+
+def _successful_calls(info):
+    """The calls of one env.step that succeeded (what a stored skill replays)."""
+    if 'calls' in info: return [c['call'] for c in info['calls'] if c['success']]
+    if info.get('action_success') and info.get('parsed_function'):
+        return [format_call(info['parsed_function'], info['parsed_args'])]
+    return []
+
+def replay_skill(env, skill):
+    """Replays a stored skill through env.step. Returns (solved, actions executed)."""
+    for i, action_code in enumerate(skill.actions):
+        observation, reward, done, info = env.step(action_code)
+        if done: return reward > 0, i + 1
+        if not info.get('action_success'):
+            log.info("skill_replay_failed", "Skill replay: {code} failed: {message}", code=action_code, message=info.get('action_message'))
+            return False, i + 1
+    return False, len(skill.actions)
+
+class Episode:
+    """State and bookkeeping of one episode: task setup, skill replay and skill storing, prompts,
+    step results and the result dict (task, status, success, steps, actions, wall_time_s).
+
+    run_episode() drives it with blocking calls; async_runner.AsyncEpisodeRunner drives the same
+    methods from coroutines, running the env-side ones (setup, env.step) on the env's thread.
+    """
+    def __init__(self, env, task_name, prompt_template, max_steps=config.MAX_STEPS_PER_TASK, skills=None):
+        self.env = env
+        self.task_name = task_name
+        self.prompt_template = prompt_template
+        self.max_steps = max_steps
+        self.skills = skills
+        self.start_time = time.time()
+        self.trace_mark = tracer.mark()
+        self.result = {"task": task_name, "status": "failed", "success": False, "steps": 0, "actions": 0}
+        self.max_new_tokens = config.PROGRAM_MAX_NEW_TOKENS if config.ACTION_PROGRAM_MODE else config.LLM_MAX_NEW_TOKENS
+        self.observation = None
+        self.task_description = None
+        self.prompt_prefix = None
+        self.goal_conditions, self.scene_id = None, None
+        self.executed_calls = []
+
+    @contextlib.contextmanager
+    def logged(self):
+        """Routes the episode's events (in this thread or asyncio task) to their own JSONL file (see event_log.py)."""
+        episode = log.begin_episode(self.task_name)
+        try:
+            yield self
+            log.info("episode_end", "Episode {episode}: {status} after {steps} LLM steps, {actions} actions in {wall_time_s:.1f} s",
+                     episode=episode, **{k: self.result.get(k) for k in ("task", "status", "success", "steps", "actions", "wall_time_s")})
+        finally:
+            log.end_episode()
+            log.flush() # Keep the console in order with the (synchronous) output that follows
+
+    def setup(self):
+        """Resets the env for the task and replays a stored skill if there is one. False if setup failed."""
+        try:
+            self.observation = self.env.reset(self.task_name)
+            self.task_description = self.env.get_task_goal_description()
+            self.prompt_prefix = build_prompt_prefix(self.prompt_template, self.task_description) # KV-cached by LLM_API
+            log.info("task_setup", "Task setup complete.", task=self.task_name, description=self.task_description)
+        except FileNotFoundError as e:
+            log.error("setup_error", "FATAL: Required file not found: {error}", error=str(e))
+            self.result.update(status="setup_error", error=str(e))
+            return False
+        except Exception as e:
+            log.error("setup_error", "FATAL: Error during task setup: {error}", error=str(e))
+            self.result.update(status="setup_error", error=str(e))
+            return False
+        if self.skills is not None: self._replay_skills()
+        log.info("task_start", "=== Starting Task: {task} ===\nGoal: {goal}", task=self.task_name, goal=self.task_description)
+        return True
+
+    def _replay_skills(self):
+        self.goal_conditions, self.scene_id = self.env.get_goal_conditions(), self.env.get_scene_id()
+        for skill, score in self.skills.lookup(self.goal_conditions, self.scene_id, self.task_description, config.SKILL_MAX_CANDIDATES):
+            log.info("skill_replay", "Replaying stored skill ({actions} actions, similarity {score:.2f})...", actions=len(skill.actions), score=score)
+            with tracer.span("skill_replay"):
+                solved, executed = replay_skill(self.env, skill)
+            self.skills.record_replay(skill, solved)
+            self.result["actions"] += executed
+            if solved:
+                log.info("task_succeeded", "=== Task '{task}' Succeeded by skill replay (no LLM calls) ===", task=self.task_name, skill_replayed=True)
+                self.result.update(status="success", success=True, skill_replayed=True)
+                if skill.key != goal_key(self.goal_conditions, self.scene_id): # Similar goal: store under this goal's key too
+                    self.skills.add(self.goal_conditions, self.scene_id, self.task_description, skill.actions)
+                return
+            log.info("skill_replay_unsolved", "Skill replay did not solve the task; resetting and falling back to the LLM.")
+            self.observation = self.env.reset(self.task_name)
+
+    def llm_steps(self):
+        """Step indices for the LLM loop (none once a skill replay solved the task)."""
+        return range(0 if self.result["success"] else self.max_steps)
+
+    def prompt(self, step):
+        log.info("step", "--- Step {step} / {max_steps} ---", step=step + 1, max_steps=self.max_steps)
+        log.debug("observation", "Current Observation:\n{observation}", observation=self.observation)
+        return self.prompt_template.format(task_description=self.task_description, observation=self.observation)
+
+    def generate_kwargs(self):
+        """Keyword arguments of llm.generate for this step's prompt."""
+        return {"max_new_tokens": self.max_new_tokens, "prefix": self.prompt_prefix, "grammar": self.env.get_action_grammar()}
+
+    def llm_failed(self, action_code):
+        """True (and the episode ends) if the LLM returned nothing or an error."""
+        if action_code and not action_code.startswith("Error:"): return False
+        log.warn("llm_failed", "LLM generation failed or returned error: {output}. Stopping task.", output=action_code)
+        self.result["status"] = "llm_error"
+        return True
+
+    def record_step(self, step, observation, reward, done, info):
+        """Books the outcome of env.step for LLM step `step`. True if the episode is over."""
+        self.observation = observation
+        self.result["steps"] = step + 1 # LLM calls
+        self.result["actions"] += info.get('num_executed', 0)
+        self.executed_calls += _successful_calls(info)
+
+        if log.enabled_for(DEBUG): log.debug("step_info", "Step Info: {info}", info=dict(info)) # Copied only when DEBUG is on
 
-    # 2. Load Task and Prompt Template
-    task_name = config.DEFAULT_TASK
+        if done and reward > 0:
+            log.info("task_succeeded", "=== Task '{task}' Succeeded in {steps} steps! ===", task=self.task_name, steps=step + 1)
+            self.result.update(status="success", success=True)
+            if self.skills is not None: self.skills.add(self.goal_conditions, self.scene_id, self.task_description, self.executed_calls)
+            return True
+        elif done:
+            log.warn("task_failed", "=== Task '{task}' Failed: Simulation error ===", task=self.task_name, reason="sim_error")
+            self.result["status"] = "sim_error"
+            return True
+        elif step == self.max_steps - 1:
+            log.info("task_failed", "=== Task '{task}' Failed: Reached max steps ({max_steps}) ===", task=self.task_name, reason="max_steps", max_steps=self.max_steps)
+            return True
+        return False
+
+    def finish(self, phase_timing=True):
+        """Completes the result dict (wall time; per-phase timing of the episode's spans if tracing)."""
+        self.result["wall_time_s"] = time.time() - self.start_time
+        if tracer.enabled and phase_timing:
+            self.result["phase_timing"] = summarize(tracer.spans(since=self.trace_mark))
+            log.flush()
+            print_summary(self.result["phase_timing"], title=f"Step timing for '{self.task_name}'")
+        return self.result
+
+def run_episode(env, llm, task_name, prompt_template, max_steps=config.MAX_STEPS_PER_TASK, skills=None):
+    """Runs one episode of task_name and returns a result dict (task, status, success, steps, actions, wall_time_s).
+
+    With a SkillLibrary, a stored skill for the same goal and scene is replayed first; the LLM
+    is only called if no skill solves the task, and a newly solved task is stored as a skill.
+    Events of the episode go to their own JSONL file (see event_log.py).
+    """
+    episode = Episode(env, task_name, prompt_template, max_steps, skills)
+    with episode.logged():
+        if episode.setup():
+            for step in episode.llm_steps():
+                prompt = episode.prompt(step)
+                with tracer.span("llm_generate", step=step):
+                    action_code = llm.generate(prompt, **episode.generate_kwargs())
+                if episode.llm_failed(action_code): break
+                # A single action, or a program in ACTION_PROGRAM_MODE
+                if episode.record_step(step, *env.step(action_code)): break
+        episode.finish()
+    return episode.result
+
+def load_llm():
+    """The LLM server client if configured, else an in-process LLM_API (torch/transformers imported here)."""
+    if config.LLM_SERVER_ADDRESS:
+        from llm_server import LLMClient
+        return LLMClient()
+    from llm_api import LLM_API
+    return LLM_API()
+
+def _timed(timings, name, fn):
+    start = time.perf_counter()
     try:
-        print(f"Resetting environment for task: {task_name}...")
-        observation = env.reset(task_name)
-        task_description = env.get_task_goal_description()
-        prompt_template_path = os.path.join(config.PROMPT_DIR, config.ACTION_PROMPT_TEMPLATE_NAME)
-        with open(prompt_template_path, 'r') as f:
-            prompt_template = f.read()
-        print("Task setup complete.")
-    except FileNotFoundError as e:
-        print(f"FATAL: Required file not found: {e}")
-        env.close(); return
-    except Exception as e:
-        print(f"FATAL: Error during task setup: {e}")
-        env.close(); return
+        with tracer.span(f"startup_{name}"):
+            return fn()
+    finally:
+        timings[name] = time.perf_counter() - start
 
-    # 3. Agent Loop
-    print(f"\n=== Starting Task: {task_name} ===")
-    print(f"Goal: {task_description}")
+def build_env():
+    from omnigibson_interface import OmniGibsonInterface # omnigibson is imported here, not at module import
+    from omnigibson_env import OmniGibsonEnv
+    print("Initializing Interface...")
+    interface = OmniGibsonInterface()
+    print("Initializing Env Wrapper...")
+    return OmniGibsonEnv(interface)
 
-    for step in range(config.MAX_STEPS_PER_TASK):
-        print(f"\n--- Step {step + 1} / {config.MAX_STEPS_PER_TASK} ---")
-        print(f"Current Observation:\n{observation}")
+def init_components(llm=None):
+    """Returns (llm, env), loading the LLM in a background thread while the simulator starts.
 
-        # Construct prompt
-        prompt = prompt_template.format(
-            task_description=task_description,
-            observation=observation,
-        )
+    The simulator (omnigibson import, Isaac Sim boot, scene load) stays on the calling thread;
+    weight loading is mostly file reads and device copies outside the GIL, so startup takes
+    about as long as the slower of the two (config.PARALLEL_STARTUP=False loads them in turn).
+    Prints a startup timing report.
+    """
+    start = time.perf_counter()
+    timings = {}
+    executor, llm_future = None, None
+    if llm is None and config.PARALLEL_STARTUP:
+        print("Initializing LLM (in the background)...")
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-init")
+        llm_future = executor.submit(_timed, timings, "llm", load_llm)
+    elif llm is None:
+        print("Initializing LLM...")
+        llm = _timed(timings, "llm", load_llm)
+    env = None
+    try:
+        env = _timed(timings, "simulator", build_env)
+        if llm_future is not None: llm = llm_future.result()
+    except Exception:
+        if env is not None: env.close()
+        raise
+    finally:
+        if executor is not None: executor.shutdown(wait=False) # Do not wait on a model load if the simulator failed
+    total = time.perf_counter() - start
+    parts = ", ".join(f"{name} {seconds:.1f} s" for name, seconds in timings.items())
+    print(f"Startup: {parts}; ready in {total:.1f} s (sequential would be {sum(timings.values()):.1f} s)")
+    return llm, env
 
-        # Get action from LLM
-        action_code = llm.generate(prompt) # Uses max_new_tokens from config
+def run_agent(llm=None, task_names=None):
+    """Runs task_names (default: config.DEFAULT_TASK) and returns their result dicts.
 
-        if not action_code or action_code.startswith("Error:"):
-            print(f"WARN: LLM generation failed or returned error: {action_code}. Stopping task.")
-            break # Stop if LLM fails
+    llm defaults to the LLM server client or an in-process LLM_API; any object with the same
+    generate() signature can be passed instead (e.g. the stub LLM of the offline benchmarks).
+    """
+    print("--- Starting Voyager-OmniGibson Run ---")
+    config.verify_paths(check_llm=llm is None and not config.LLM_SERVER_ADDRESS)
 
-        # Execute action in environment
-        observation, reward, done, info = env.step(action_code)
+    # 1. Initialize Components (simulator and LLM concurrently; heavy imports happen inside)
+    try:
+        llm, env = init_components(llm)
+    except Exception as e:
+        print(f"FATAL: Failed to initialize components: {e}")
+        return []
 
-        print(f"Step Info: {info}")
+    # 2. Load Prompt Template
+    try:
+        prompt_template = load_prompt_template()
+    except FileNotFoundError as e:
+        print(f"FATAL: Required file not found: {e}")
+        env.close(); return []
 
-        if done:
-            print(f"\n=== Task '{task_name}' Succeeded in {step + 1} steps! ===")
-            break
-        elif step == config.MAX_STEPS_PER_TASK - 1:
-            print(f"\n=== Task '{task_name}' Failed: Reached max steps ({config.MAX_STEPS_PER_TASK}) ===")
-            break
+    # 3. Run Tasks
+    skills = open_skill_library()
+    results = [run_episode(env, llm, task_name, prompt_template, skills=skills) for task_name in (task_names or [config.DEFAULT_TASK])]
+    if skills is not None: skills.close()
 
     # 4. Cleanup
+    if tracer.enabled: print(f"Trace written to: {export_trace(time.strftime('run_%Y%m%d_%H%M%S'))}")
+    if getattr(llm, 'response_cache', None): print(f"LLM response cache: {llm.response_cache.stats()}")
     print("Closing environment...")
     env.close()
+    log.flush() # Everything queued by the episodes is on the console and in the log files
     print("--- Run Finished ---")
+    return results
 
 if __name__ == "__main__":
     # Ensure running within the Apptainer context with headless flag
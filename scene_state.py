@@ -0,0 +1,74 @@
+# scene_state.py
+import time
+
+class SceneStateBackend:
+    """Captures and restores the full simulator state. Implementations: OmniGibson, fakes."""
+    def capture(self):
+        raise NotImplementedError
+
+    def restore(self, state):
+        raise NotImplementedError
+
+class OmniGibsonStateBackend(SceneStateBackend):
+    """Serialized whole-simulator state via og.sim.dump_state / og.sim.load_state."""
+    def capture(self):
+        import omnigibson as og
+        return og.sim.dump_state(serialized=True)
+
+    def restore(self, state):
+        import omnigibson as og
+        og.sim.load_state(state, serialized=True)
+
+class SceneStateStore:
+    """In-memory pristine states per scene, captured once after stabilization.
+
+    Restoring one replaces a full env.reset() between episodes of tasks in the same scene.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self._states = {} # scene_id -> captured state
+        self.num_restores = 0
+        self.restore_time_s = 0.0
+
+    def has(self, scene_id):
+        return scene_id in self._states
+
+    def capture(self, scene_id):
+        start_time = time.time()
+        self._states[scene_id] = self.backend.capture()
+        print(f"Captured pristine state for scene '{scene_id}' in {time.time() - start_time:.3f} seconds.")
+
+    def restore(self, scene_id):
+        start_time = time.time()
+        self.backend.restore(self._states[scene_id])
+        elapsed = time.time() - start_time
+        self.num_restores += 1
+        self.restore_time_s += elapsed
+        print(f"Restored scene '{scene_id}' state in {elapsed:.3f} seconds.")
+
+    def discard(self, scene_id):
+        self._states.pop(scene_id, None)
+
+def apply_initial_state(entries, find_object, resolve_state):
+    """Applies task initial_state entries ({object_name, type, value}) as deltas on the restored scene.
+
+    Returns the number of entries applied; invalid entries are reported and skipped.
+    """
+    applied = 0
+    for entry in entries or []:
+        obj_name = entry.get('object_name') if isinstance(entry, dict) else None
+        state_type = entry.get('type') if isinstance(entry, dict) else None
+        if not obj_name or not state_type:
+            print(f"WARN: Ignoring malformed initial_state entry: {entry}")
+            continue
+        obj = find_object(obj_name)
+        state_cls = resolve_state(state_type)
+        if obj is None or state_cls is None or state_cls not in obj.states:
+            print(f"WARN: Cannot apply initial_state {state_type} to '{obj_name}' (object or state not found).")
+            continue
+        try:
+            obj.states[state_cls].set_value(entry.get('value', True))
+            applied += 1
+        except Exception as e:
+            print(f"ERROR applying initial_state {state_type} to '{obj_name}': {e}")
+    return applied
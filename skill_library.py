@@ -0,0 +1,166 @@
+# skill_library.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+def goal_key(goal_conditions, scene_id):
+    """Content hash of a task's goal conditions and scene (exact-match key)."""
+    material = json.dumps({"goal": goal_conditions, "scene": scene_id}, sort_keys=True, default=repr)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+def _goal_leaves(goal_conditions):
+    """{(state type, object name): '[not ]op target'} of every leaf condition, with the evaluator's defaults."""
+    leaves = {}
+    def visit(node, negated):
+        if isinstance(node, list):
+            for child in node: visit(child, negated)
+        elif isinstance(node, dict):
+            if isinstance(node.get('type'), str) and isinstance(node.get('object_name'), str):
+                op, target = node.get('op'), node.get('target_value', True)
+                if op is None: op, target = "==", bool(target) # Boolean equality, as GoalEvaluator compares it
+                leaves[(node['type'].lower(), node['object_name'].lower())] = f"{'not ' if negated else ''}{op} {target}".lower()
+            for key, value in node.items():
+                if isinstance(value, (list, dict)): visit(value, negated != (key == "not"))
+    visit(goal_conditions, False)
+    return leaves
+
+def _goal_tokens(description, goal_conditions):
+    """Lower-case word tokens of the description plus the goal's state types, object names and
+    one 'type:object op target' token per condition (so 'lamp on' and 'lamp off' differ)."""
+    tokens = set(re.findall(r"[a-z0-9]+", (description or "").lower()))
+    for (state_type, object_name), target in _goal_leaves(goal_conditions).items():
+        tokens.update((state_type, object_name, f"{state_type}:{object_name} {target}"))
+    return frozenset(tokens)
+
+def _conflicts(leaves, other_leaves):
+    """True if both goals constrain the same state of the same object differently."""
+    return any(other_leaves.get(leaf, target) != target for leaf, target in leaves.items())
+
+class Skill:
+    __slots__ = ("key", "scene_id", "description", "actions", "successes", "failures", "tokens", "leaves")
+    def __init__(self, key, scene_id, description, actions, successes, failures, tokens, leaves):
+        self.key = key
+        self.scene_id = scene_id
+        self.description = description
+        self.actions = actions # Action calls, e.g. ["navigate_to_object('x')", "toggle_object('x')"]
+        self.successes = successes
+        self.failures = failures
+        self.tokens = tokens
+        self.leaves = leaves # See _goal_leaves
+
+class SkillLibrary:
+    """Verified action sequences keyed by (goal conditions, scene), persisted in SQLite.
+
+    lookup() returns the exact-key skill first, then skills of the same scene whose goal
+    tokens (description words, goal object names, state types and targets) are most similar
+    (Jaccard over an inverted token index). A similar skill is never returned if its goal sets
+    a state of one of the same objects to a different target. Skills whose replays keep
+    failing are dropped.
+    """
+    _COLUMNS = "key, scene_id, description, goal, actions, successes, failures"
+
+    def __init__(self, path, similarity_threshold=0.85, max_failures=3):
+        self.path = path
+        self.similarity_threshold = similarity_threshold
+        self.max_failures = max_failures
+        self._skills = {} # key -> Skill
+        self._index = {} # (scene_id, token) -> set of keys
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS skills (key TEXT PRIMARY KEY, scene_id TEXT, description TEXT, "
+                "goal TEXT NOT NULL, actions TEXT NOT NULL, successes INTEGER NOT NULL, failures INTEGER NOT NULL, updated REAL NOT NULL)"
+            )
+            self._db.commit()
+            for row in self._db.execute(f"SELECT {self._COLUMNS} FROM skills").fetchall(): self._remember(self._from_row(row))
+
+    @staticmethod
+    def _from_row(row):
+        key, scene_id, description, goal, actions, successes, failures = row
+        goal = json.loads(goal)
+        return Skill(key, scene_id, description, json.loads(actions), successes, failures, _goal_tokens(description, goal), _goal_leaves(goal))
+
+    def _load_key(self, key):
+        """Picks up a skill another process stored since this library was opened."""
+        if self._db is None: return
+        row = self._db.execute(f"SELECT {self._COLUMNS} FROM skills WHERE key = ?", (key,)).fetchone()
+        if row is not None: self._remember(self._from_row(row))
+
+    def __len__(self):
+        return len(self._skills)
+
+    def _remember(self, skill):
+        self._forget(skill.key)
+        self._skills[skill.key] = skill
+        for token in skill.tokens: self._index.setdefault((skill.scene_id, token), set()).add(skill.key)
+
+    def _forget(self, key):
+        skill = self._skills.pop(key, None)
+        if skill is None: return
+        for token in skill.tokens: self._index.get((skill.scene_id, token), set()).discard(key)
+
+    def lookup(self, goal_conditions, scene_id, description="", max_candidates=2):
+        """Returns up to max_candidates (skill, score) pairs, exact match (score 1.0) first."""
+        with self._lock:
+            key = goal_key(goal_conditions, scene_id)
+            if key not in self._skills: self._load_key(key)
+            candidates = [(self._skills[key], 1.0)] if key in self._skills else []
+            tokens = _goal_tokens(description, goal_conditions)
+            leaves = _goal_leaves(goal_conditions)
+            overlap = {}
+            for token in tokens:
+                for other in self._index.get((scene_id, token), ()):
+                    if other != key: overlap[other] = overlap.get(other, 0) + 1
+            scored = []
+            for other, shared in overlap.items():
+                skill = self._skills[other]
+                score = shared / len(tokens | skill.tokens)
+                if score >= self.similarity_threshold and not _conflicts(leaves, skill.leaves): scored.append((skill, score))
+            scored.sort(key=lambda item: (-item[1], -item[0].successes))
+            return (candidates + scored)[:max_candidates]
+
+    def add(self, goal_conditions, scene_id, description, actions):
+        """Stores (or replaces) the verified action sequence for this goal and scene."""
+        if not actions: return None
+        key = goal_key(goal_conditions, scene_id)
+        with self._lock:
+            previous = self._skills.get(key)
+            successes = previous.successes + 1 if previous is not None else 1
+            skill = Skill(key, scene_id, description, list(actions), successes, 0,
+                          _goal_tokens(description, goal_conditions), _goal_leaves(goal_conditions))
+            self._remember(skill)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO skills (key, scene_id, description, goal, actions, successes, failures, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, scene_id, description, json.dumps(goal_conditions, default=repr), json.dumps(skill.actions), successes, 0, time.time()),
+                )
+                self._db.commit()
+        return skill
+
+    def record_replay(self, skill, success):
+        """Counts a replay outcome; a skill failing max_failures times in a row is removed."""
+        with self._lock:
+            if success: skill.successes += 1; skill.failures = 0
+            else: skill.failures += 1
+            drop = skill.failures >= self.max_failures
+            if drop: self._forget(skill.key)
+            if self._db is not None:
+                if drop: self._db.execute("DELETE FROM skills WHERE key = ?", (skill.key,))
+                else: self._db.execute("UPDATE skills SET successes = ?, failures = ?, updated = ? WHERE key = ?",
+                                       (skill.successes, skill.failures, time.time(), skill.key))
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
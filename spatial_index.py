@@ -0,0 +1,96 @@
+# spatial_index.py
+import numpy as np
+
+class SceneSpatialIndex:
+    """Array-backed index of scene object poses for fast radius queries.
+
+    Poses of every object are held in contiguous NumPy arrays. Static (fixed-base)
+    objects are bucketed into a uniform grid once, at build time; only movable
+    objects are re-read from the simulator by refresh().
+    """
+    def __init__(self, objects, cell_size=4.0, exclude=None):
+        self.cell_size = float(cell_size)
+        self.objects = [
+            obj for obj in objects
+            if obj is not exclude and hasattr(obj, 'name') and hasattr(obj, 'get_position_orientation')
+        ]
+        self.names = [obj.name for obj in self.objects]
+        self.name_to_id = {name: i for i, name in enumerate(self.names)}
+
+        num_objects = len(self.objects)
+        self.positions = np.zeros((num_objects, 3), dtype=np.float64)
+        self.orientations = np.zeros((num_objects, 4), dtype=np.float64)
+        self.orientations[:, 3] = 1.0 # Identity quaternion (x, y, z, w)
+        self.valid = np.zeros(num_objects, dtype=bool) # False if the pose could not be read
+
+        static_mask = np.array([self._is_static(obj) for obj in self.objects], dtype=bool)
+        self.static_ids = np.flatnonzero(static_mask)
+        self.movable_ids = np.flatnonzero(~static_mask)
+
+        self._read_poses(range(num_objects))
+        self._build_grid()
+
+    def __len__(self):
+        return len(self.objects)
+
+    @staticmethod
+    def _is_static(obj):
+        """Fixed-base objects (walls, cabinets, switches, ...) never move under physics."""
+        return bool(getattr(obj, 'fixed_base', False))
+
+    def _read_poses(self, ids):
+        for i in ids:
+            try:
+                pos, orn = self.objects[i].get_position_orientation()
+                self.positions[i] = np.asarray(pos, dtype=np.float64)[:3]
+                self.orientations[i] = np.asarray(orn, dtype=np.float64)[:4]
+                self.valid[i] = True
+            except Exception:
+                self.valid[i] = False # Skip object in queries if pose is unavailable
+
+    def _build_grid(self):
+        """Buckets valid static objects by grid cell: {(ix, iy, iz): ids}."""
+        self._grid = {}
+        static_ids = self.static_ids[self.valid[self.static_ids]]
+        if static_ids.size == 0:
+            return
+        cells = np.floor(self.positions[static_ids] / self.cell_size).astype(np.int64)
+        unique_cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        order = np.argsort(inverse, kind='stable')
+        splits = np.cumsum(np.bincount(inverse, minlength=len(unique_cells)))[:-1]
+        for cell, ids in zip(unique_cells, np.split(static_ids[order], splits)):
+            self._grid[tuple(cell)] = ids
+
+    def refresh(self):
+        """Re-reads the poses of movable objects. Call once per simulation step."""
+        self._read_poses(self.movable_ids)
+
+    def _static_candidates(self, center, radius):
+        lo = np.floor((center - radius) / self.cell_size).astype(np.int64)
+        hi = np.floor((center + radius) / self.cell_size).astype(np.int64)
+        num_cells = int(np.prod(hi - lo + 1))
+        if num_cells > len(self._grid):
+            # Query box covers more cells than exist; scanning the grid is cheaper
+            buckets = self._grid.values()
+        else:
+            buckets = []
+            for ix in range(lo[0], hi[0] + 1):
+                for iy in range(lo[1], hi[1] + 1):
+                    for iz in range(lo[2], hi[2] + 1):
+                        ids = self._grid.get((ix, iy, iz))
+                        if ids is not None:
+                            buckets.append(ids)
+        return list(buckets)
+
+    def query_radius(self, center, radius):
+        """Returns (ids, distances) of objects strictly closer than radius to center."""
+        center = np.asarray(center, dtype=np.float64)[:3]
+        candidate_parts = self._static_candidates(center, radius)
+        candidate_parts.append(self.movable_ids[self.valid[self.movable_ids]])
+        candidates = np.concatenate(candidate_parts) if candidate_parts else np.empty(0, dtype=np.int64)
+        if candidates.size == 0:
+            return candidates, np.empty(0, dtype=np.float64)
+        dists = np.linalg.norm(self.positions[candidates] - center, axis=1)
+        in_range = dists < radius
+        return candidates[in_range], dists[in_range]
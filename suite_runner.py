@@ -0,0 +1,78 @@
+# suite_runner.py
+# Runs every task in TASK_CONFIG_DIR, grouped by scene so each scene is built at most once
+# per worker. Usage: python suite_runner.py --episodes 2 --workers 2
+import argparse
+import glob
+import os
+import yaml
+
+import config
+from parallel_runner import ParallelRunner, aggregate_results, print_report
+
+def discover_tasks(task_dir=config.TASK_CONFIG_DIR):
+    """Returns (task_name, scene_id) for every task YAML in task_dir.
+
+    Tasks without a scene_id run in the scene of the environment config.
+    """
+    tasks = []
+    default_scene = None
+    for path in sorted(glob.glob(os.path.join(task_dir, "*.yaml"))):
+        task_name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, 'r') as f:
+                task_config = yaml.safe_load(f) or {}
+        except Exception as e:
+            print(f"WARN: Skipping task '{task_name}': cannot parse {path}: {e}")
+            continue
+        scene_id = task_config.get('scene_id')
+        if not scene_id:
+            if default_scene is None:
+                from env_config import load_env_config, scene_id_of
+                default_scene = scene_id_of(load_env_config())
+            scene_id = default_scene
+        tasks.append((task_name, scene_id))
+    return tasks
+
+def group_by_scene(tasks):
+    """scene_id -> task names, largest groups first."""
+    groups = {}
+    for task_name, scene_id in tasks:
+        groups.setdefault(scene_id, []).append(task_name)
+    return dict(sorted(groups.items(), key=lambda item: -len(item[1])))
+
+def build_jobs(tasks, episodes=1):
+    """(task, seed, scene_id) jobs, contiguous per scene."""
+    return [
+        (task_name, seed, scene_id)
+        for scene_id, task_names in group_by_scene(tasks).items()
+        for task_name in task_names
+        for seed in range(episodes)
+    ]
+
+def print_scene_report(results, num_scenes):
+    loads = {}
+    for r in results:
+        if r.get("scene_load"): loads[r.get("scene")] = loads.get(r.get("scene"), 0) + 1
+    print(f"\nScenes: {num_scenes}, scene loads: {sum(loads.values())} ({len(results)} episodes)")
+    for scene_id, count in sorted(loads.items(), key=lambda item: str(item[0])):
+        print(f"  {scene_id}: loaded {count}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all tasks in TASK_CONFIG_DIR, grouped by scene.")
+    parser.add_argument("--task-dir", default=config.TASK_CONFIG_DIR)
+    parser.add_argument("--tasks", nargs="+", help="Only run these tasks.")
+    parser.add_argument("--episodes", type=int, default=1, help="Episodes (seeds) per task.")
+    parser.add_argument("--workers", type=int, default=config.PARALLEL_NUM_WORKERS)
+    parser.add_argument("--timeout", type=float, default=config.PARALLEL_EPISODE_TIMEOUT_S)
+    args = parser.parse_args()
+
+    tasks = discover_tasks(args.task_dir)
+    if args.tasks: tasks = [t for t in tasks if t[0] in args.tasks]
+    groups = group_by_scene(tasks)
+    for scene_id, task_names in groups.items():
+        print(f"Scene '{scene_id}': {', '.join(task_names)}")
+    jobs = build_jobs(tasks, args.episodes)
+    runner = ParallelRunner(num_workers=args.workers, episode_timeout_s=args.timeout)
+    results = runner.run(jobs)
+    print_report(aggregate_results(results))
+    print_scene_report(results, len(groups))
@@ -0,0 +1,133 @@
+# tracing.py
+import itertools
+import json
+import os
+import threading
+import time
+
+import config
+
+class _NullSpan:
+    """Shared no-op context manager returned while tracing is disabled."""
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start_ns")
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.record(self.name, self.start_ns, args=self.args)
+        return False
+
+class Tracer:
+    """Fixed-size ring buffer of timed spans (name, start_ns, dur_ns, thread id, args).
+
+    Use `with tracer.span("phase"):` around a block, or `start = tracer.now()` ...
+    `tracer.record("phase", start)` in hot paths. While disabled, span() returns a shared
+    no-op object and now()/record() are skipped by the `if tracer.enabled` guard at call sites.
+    When the buffer is full the oldest spans are overwritten.
+    """
+    def __init__(self, capacity=config.TRACE_BUFFER_SIZE, enabled=config.TRACE_ENABLED):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._buffer = [None] * capacity
+        self._counter = itertools.count() # next() is atomic under the GIL
+        self._written = 0
+        self._origin_ns = time.perf_counter_ns()
+
+    @staticmethod
+    def now():
+        return time.perf_counter_ns()
+
+    def span(self, name, **args):
+        if not self.enabled: return _NULL_SPAN
+        return _Span(self, name, args or None)
+
+    def record(self, name, start_ns, end_ns=None, args=None):
+        if not self.enabled: return
+        if end_ns is None: end_ns = time.perf_counter_ns()
+        index = next(self._counter)
+        self._buffer[index % self.capacity] = (name, start_ns, end_ns - start_ns, threading.get_ident(), args)
+        self._written = index + 1
+
+    def mark(self):
+        """Position in the span stream; pass to spans(since=...) to get what was recorded after it."""
+        return self._written
+
+    def spans(self, since=0):
+        """Recorded spans in order, oldest first (spans already overwritten are skipped)."""
+        end = self._written
+        start = max(since, end - self.capacity)
+        return [self._buffer[i % self.capacity] for i in range(start, end) if self._buffer[i % self.capacity] is not None]
+
+    def clear(self):
+        self._buffer = [None] * self.capacity
+        self._counter = itertools.count()
+        self._written = 0
+
+    def export_chrome_trace(self, path, spans=None):
+        """Writes spans as Chrome trace JSON (open in chrome://tracing or Perfetto)."""
+        spans = self.spans() if spans is None else spans
+        pid = os.getpid()
+        events = [
+            {"name": name, "ph": "X", "ts": (start - self._origin_ns) / 1e3, "dur": dur / 1e3,
+             "pid": pid, "tid": tid, "args": args or {}}
+            for name, start, dur, tid, args in spans
+        ]
+        _makedirs_for(path)
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export_jsonl(self, path, spans=None):
+        """Writes one JSON object per span (times in microseconds since the tracer was created)."""
+        spans = self.spans() if spans is None else spans
+        _makedirs_for(path)
+        with open(path, 'w') as f:
+            for name, start, dur, tid, args in spans:
+                f.write(json.dumps({"name": name, "start_us": (start - self._origin_ns) / 1e3, "dur_us": dur / 1e3,
+                                    "tid": tid, "args": args or {}}) + "\n")
+
+def _makedirs_for(path):
+    if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+
+def _percentile(sorted_values, q):
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def summarize(spans):
+    """Per-phase count, total, p50 and p95 (milliseconds)."""
+    by_name = {}
+    for name, _, dur, _, _ in spans:
+        by_name.setdefault(name, []).append(dur / 1e6)
+    summary = {}
+    for name, durations in by_name.items():
+        durations.sort()
+        summary[name] = {"count": len(durations), "total_ms": sum(durations),
+                         "p50_ms": _percentile(durations, 0.5), "p95_ms": _percentile(durations, 0.95)}
+    return summary
+
+def print_summary(summary, title="Step timing"):
+    print(f"\n{title}:\n{'phase':<18} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'total ms':>10}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{name:<18} {s['count']:>6} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['total_ms']:>10.1f}")
+
+def export_trace(basename, spans=None):
+    """Writes <TRACE_DIR>/<basename>.json (Chrome trace) and .jsonl; returns the two paths."""
+    chrome_path = os.path.join(config.TRACE_DIR, basename + ".json")
+    jsonl_path = os.path.join(config.TRACE_DIR, basename + ".jsonl")
+    tracer.export_chrome_trace(chrome_path, spans)
+    tracer.export_jsonl(jsonl_path, spans)
+    return chrome_path, jsonl_path
+
+tracer = Tracer() # Process-wide tracer; enable with config.TRACE_ENABLED (or tracer.enabled = True)
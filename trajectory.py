@@ -0,0 +1,203 @@
+# trajectory.py
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+import config
+
+MAGIC = b"VTRAJ\x01\n\x00" # File header (8 bytes)
+CHUNK_TAG = b"CHNK"
+_CHUNK_HEAD = struct.Struct("<4sI") # tag, header JSON length
+
+# Row columns: name -> numpy dtype, or "str" for UTF-8 text
+COLUMNS = {
+    "episode": "<i4", "step": "<i4", "task": "str", "scene": "str",
+    "action_code": "str", "calls": "str", # calls: JSON [[call, success, message], ...]
+    "success": "u1", "message": "str", "reward": "<f4", "done": "u1",
+    "robot_x": "<f4", "robot_y": "<f4", "robot_z": "<f4", "robot_yaw": "<f4",
+    "state_delta": "str", # JSON {object name: {state: value}} of tracked states changed by this step
+    "sim_ticks": "<i4", "action_wall_s": "<f4", "step_wall_s": "<f4",
+}
+
+def _encode_column(kind, values):
+    if kind != "str": return np.asarray(values, dtype=kind).tobytes()
+    data = [v.encode("utf-8") for v in values]
+    lengths = np.array([len(d) for d in data], dtype="<u4")
+    return lengths.tobytes() + b"".join(data)
+
+def _decode_column(kind, raw, rows):
+    if kind != "str": return np.frombuffer(raw, dtype=kind, count=rows)
+    lengths = np.frombuffer(raw, dtype="<u4", count=rows)
+    values, pos = [], lengths.nbytes
+    for length in lengths.tolist():
+        values.append(raw[pos:pos + length].decode("utf-8"))
+        pos += length
+    return values
+
+def _yaw(quaternion):
+    x, y, z, w = quaternion
+    return float(np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z)))
+
+class StateDiffer:
+    """Tracked object states that changed between consecutive snapshots, as {name: {state: value}}."""
+    def __init__(self):
+        self._index = None
+        self._classes = None
+        self._values = None
+
+    def diff(self, snapshot):
+        if snapshot is None: return {}
+        comparable = self._index is snapshot.index and self._classes == snapshot.state_classes
+        values = snapshot.state_values
+        delta = {}
+        if comparable:
+            changed = (values != self._values) & ~(np.isnan(values) & np.isnan(self._values))
+            for obj_id, col in zip(*np.nonzero(changed)):
+                value = values[obj_id, col]
+                delta.setdefault(snapshot.index.names[obj_id], {})[snapshot.state_classes[col].__name__] = (
+                    None if np.isnan(value) else float(value))
+        self._index, self._classes, self._values = snapshot.index, list(snapshot.state_classes), values.copy()
+        return delta
+
+class TrajectoryRecorder:
+    """Append-only columnar episode log: one row per OmniGibsonEnv.step.
+
+    Rows are buffered and written every chunk_rows rows (and on flush/close) as a chunk:
+    a small JSON header followed by each column compressed separately with zlib. Chunks are
+    only ever appended, so a crash loses at most the buffered rows and a truncated last
+    chunk is skipped by the reader.
+    """
+    def __init__(self, path, chunk_rows=256, compression_level=6):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.compression_level = compression_level
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0: self._file.write(MAGIC)
+        self._rows = {name: [] for name in COLUMNS}
+        self._differ = StateDiffer()
+        self.episode = -1
+        self._task, self._scene, self._step = "", "", 0
+        self.rows_written = 0
+        self.bytes_written = 0
+
+    def begin_episode(self, task_name, scene_id, snapshot=None):
+        self.episode += 1
+        self._task, self._scene, self._step = task_name, scene_id or "", 0
+        self._differ.diff(snapshot) # Baseline for the first step's delta
+
+    def record_step(self, action_code, info, reward, done, snapshot, step_wall_s):
+        if 'calls' in info:
+            calls = [[c['call'], c['success'], c['message']] for c in info['calls']]
+        elif info.get('parsed_function'):
+            args = ", ".join(repr(a) for a in info['parsed_args'])
+            calls = [[f"{info['parsed_function']}({args})", bool(info.get('action_success')), info.get('action_message', "")]]
+        else:
+            calls = []
+        pos, orn = (snapshot.robot_pos, snapshot.robot_orn) if snapshot is not None else (np.zeros(3), np.array([0.0, 0.0, 0.0, 1.0]))
+        row = {
+            "episode": self.episode, "step": self._step, "task": self._task, "scene": self._scene,
+            "action_code": action_code or "", "calls": json.dumps(calls),
+            "success": bool(info.get('action_success')), "message": str(info.get('action_message', "")),
+            "reward": reward, "done": bool(done),
+            "robot_x": pos[0], "robot_y": pos[1], "robot_z": pos[2], "robot_yaw": _yaw(orn),
+            "state_delta": json.dumps(self._differ.diff(snapshot), sort_keys=True),
+            "sim_ticks": int(info.get('action_sim_ticks', 0)), "action_wall_s": float(info.get('action_wall_time_s', 0.0)),
+            "step_wall_s": step_wall_s,
+        }
+        for name, value in row.items(): self._rows[name].append(value)
+        self._step += 1
+        if len(self._rows["episode"]) >= self.chunk_rows: self.flush()
+
+    def flush(self):
+        rows = len(self._rows["episode"])
+        if rows == 0 or self._file is None: return
+        blobs, columns = [], []
+        for name, kind in COLUMNS.items():
+            blob = zlib.compress(_encode_column(kind, self._rows[name]), self.compression_level)
+            blobs.append(blob)
+            columns.append([name, kind, len(blob)])
+        header = json.dumps({"rows": rows, "columns": columns, "time": time.time()}).encode("utf-8")
+        chunk = _CHUNK_HEAD.pack(CHUNK_TAG, len(header)) + header + b"".join(blobs)
+        self._file.write(chunk)
+        self._file.flush()
+        self.rows_written += rows
+        self.bytes_written += len(chunk)
+        self._rows = {name: [] for name in COLUMNS}
+
+    def close(self):
+        if self._file is None: return
+        self.flush()
+        self._file.close()
+        self._file = None
+        print(f"Trajectory: {self.rows_written} steps ({self.bytes_written / 1024:.1f} KiB) written to {self.path}")
+
+class TrajectoryReader:
+    """Memory-mapped reader; columns are decompressed on first access, only for the columns asked for."""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if size and self._map[:len(MAGIC)] != MAGIC: raise ValueError(f"Not a trajectory file: {path}")
+        self._chunks = [] # (rows, {name: (kind, offset, length)})
+        pos = len(MAGIC)
+        while pos + _CHUNK_HEAD.size <= size:
+            tag, header_len = _CHUNK_HEAD.unpack_from(self._map, pos)
+            if tag != CHUNK_TAG or pos + _CHUNK_HEAD.size + header_len > size: break
+            header = json.loads(bytes(self._map[pos + _CHUNK_HEAD.size:pos + _CHUNK_HEAD.size + header_len]))
+            offset = pos + _CHUNK_HEAD.size + header_len
+            columns = {}
+            for name, kind, length in header["columns"]:
+                columns[name] = (kind, offset, length)
+                offset += length
+            if offset > size: break # Truncated by a crash mid-write
+            self._chunks.append((header["rows"], columns))
+            pos = offset
+        if pos < size: print(f"WARN: Ignoring {size - pos} trailing bytes of an incomplete chunk in {path}.")
+        self._cache = {}
+
+    def __len__(self):
+        return sum(rows for rows, _ in self._chunks)
+
+    def column(self, name):
+        """All values of a column: a numpy array, or a list of str for text columns."""
+        if name not in self._cache:
+            parts = []
+            for rows, columns in self._chunks:
+                kind, offset, length = columns[name]
+                parts.append(_decode_column(kind, zlib.decompress(self._map[offset:offset + length]), rows))
+            kind = COLUMNS[name]
+            if kind == "str": self._cache[name] = [v for part in parts for v in part]
+            else: self._cache[name] = np.concatenate(parts) if parts else np.zeros(0, dtype=kind)
+        return self._cache[name]
+
+    def episodes(self):
+        """[{episode, task, scene, steps, first_row, solved}] in file order."""
+        episode_ids = self.column("episode")
+        if len(episode_ids) == 0: return []
+        tasks, scenes, done, reward = self.column("task"), self.column("scene"), self.column("done"), self.column("reward")
+        starts = np.flatnonzero(np.r_[True, episode_ids[1:] != episode_ids[:-1]])
+        ends = np.r_[starts[1:], len(episode_ids)]
+        return [{"episode": int(episode_ids[s]), "task": tasks[s], "scene": scenes[s], "steps": int(e - s),
+                 "first_row": int(s), "solved": bool(done[e - 1] and reward[e - 1] > 0)} for s, e in zip(starts, ends)]
+
+    def rows(self, first_row, count, columns=None):
+        """Row dicts for rows [first_row, first_row + count), with the given columns (default: all)."""
+        names = list(columns or COLUMNS)
+        data = {name: self.column(name)[first_row:first_row + count] for name in names}
+        return [{name: (data[name][i].item() if hasattr(data[name][i], 'item') else data[name][i]) for name in names}
+                for i in range(min(count, len(self) - first_row))]
+
+    def close(self):
+        self._cache.clear()
+        if isinstance(self._map, mmap.mmap): self._map.close()
+        self._file.close()
+
+def default_trajectory_path():
+    return os.path.join(config.TRAJECTORY_DIR, f"{time.strftime('run_%Y%m%d_%H%M%S')}_{os.getpid()}.vtraj")
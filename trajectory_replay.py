@@ -0,0 +1,95 @@
+# trajectory_replay.py
+# Re-runs recorded trajectories (see trajectory.py) through OmniGibsonEnv.step without the LLM,
+# comparing action results and object-state deltas with the recording and timing the
+# simulator side of every step. --summary reads the file only (no simulator needed).
+# Run: python trajectory_replay.py trajectories/run_....vtraj [--episodes 0 2] [--summary]
+import argparse
+import json
+import statistics
+import time
+
+import config
+from trajectory import TrajectoryReader, StateDiffer
+
+def summarize_file(reader):
+    """Per-task episode counts, success rate and recorded step timings, read column by column."""
+    step_wall = reader.column("step_wall_s")
+    by_task = {}
+    for episode in reader.episodes():
+        stats = by_task.setdefault(episode["task"], {"episodes": 0, "solved": 0, "steps": 0, "step_wall_s": []})
+        stats["episodes"] += 1
+        stats["solved"] += episode["solved"]
+        stats["steps"] += episode["steps"]
+        stats["step_wall_s"].extend(step_wall[episode["first_row"]:episode["first_row"] + episode["steps"]].tolist())
+    return by_task
+
+def print_file_summary(reader):
+    by_task = summarize_file(reader)
+    print(f"{reader.path}: {len(reader)} steps, {sum(s['episodes'] for s in by_task.values())} episodes")
+    for task, stats in sorted(by_task.items()):
+        walls = stats["step_wall_s"]
+        median_ms = 1e3 * statistics.median(walls) if walls else 0.0
+        print(f"  {task}: {stats['solved']}/{stats['episodes']} solved, {stats['steps']} steps, "
+              f"median step {median_ms:.1f} ms (simulator side)")
+
+def replay_episode(env, reader, episode):
+    """Replays one recorded episode. Returns a dict with mismatches and recorded vs replayed step times."""
+    rows = reader.rows(episode["first_row"], episode["steps"])
+    if episode["scene"] and episode["scene"] != env.get_scene_id():
+        env.interface.switch_scene(episode["scene"])
+    env.reset(episode["task"])
+    differ = StateDiffer()
+    differ.diff(env.interface.snapshot)
+    mismatches, replay_wall = [], []
+    for row in rows:
+        start_time = time.perf_counter()
+        observation, reward, done, info = env.step(row["action_code"])
+        replay_wall.append(time.perf_counter() - start_time)
+        delta = differ.diff(env.interface.snapshot)
+        expected = {"success": bool(row["success"]), "done": bool(row["done"]), "state_delta": json.loads(row["state_delta"])}
+        got = {"success": bool(info.get('action_success')), "done": bool(done), "state_delta": delta}
+        for key in expected:
+            if expected[key] != got[key]:
+                mismatches.append({"step": row["step"], "field": key, "recorded": expected[key], "replayed": got[key]})
+    return {
+        "episode": episode["episode"], "task": episode["task"], "steps": len(rows), "mismatches": mismatches,
+        "recorded_step_s": sum(row["step_wall_s"] for row in rows), "replayed_step_s": sum(replay_wall),
+    }
+
+def replay_file(env, reader, episode_ids=None):
+    episodes = [e for e in reader.episodes() if episode_ids is None or e["episode"] in episode_ids]
+    results = []
+    for episode in episodes:
+        result = replay_episode(env, reader, episode)
+        status = "OK" if not result["mismatches"] else f"{len(result['mismatches'])} MISMATCHES"
+        print(f"Episode {result['episode']} ({result['task']}, {result['steps']} steps): {status}; "
+              f"simulator time {result['replayed_step_s']:.3f} s (recorded {result['recorded_step_s']:.3f} s)")
+        for mismatch in result["mismatches"][:5]: print(f"  step {mismatch['step']} {mismatch['field']}: "
+                                                        f"recorded {mismatch['recorded']!r}, replayed {mismatch['replayed']!r}")
+        results.append(result)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded trajectories without the LLM.")
+    parser.add_argument("path")
+    parser.add_argument("--episodes", type=int, nargs="*", help="Episode ids to replay (default: all).")
+    parser.add_argument("--summary", action="store_true", help="Only summarize the file; do not start the simulator.")
+    args = parser.parse_args()
+
+    reader = TrajectoryReader(args.path)
+    print_file_summary(reader)
+    if args.summary: return
+    config.TRAJECTORY_RECORDING = False # Do not record the replay itself
+    config.SKILL_LIBRARY = False
+    from run_voyager_omnigibson import build_env
+    env = build_env()
+    try:
+        results = replay_file(env, reader, set(args.episodes) if args.episodes else None)
+    finally:
+        env.close()
+        reader.close()
+    failed = sum(1 for r in results if r["mismatches"])
+    print(f"Replayed {len(results)} episodes: {len(results) - failed} matched, {failed} diverged.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# world_snapshot.py
+import itertools
+import numpy as np
+
+MOVE_TOLERANCE = 1e-4 # meters; smaller position changes do not mark an object as changed
+
+class WorldSnapshot:
+    """Consistent, array-backed view of the scene captured once per simulation step.
+
+    Observation building, goal checking and action execution all read from the same
+    snapshot instead of querying the simulator separately. Object ids are the ids of
+    the SceneSpatialIndex the snapshot was captured from.
+
+    changed_ids holds the ids of objects whose tracked states changed or that moved
+    since the snapshot with sequence number base_seq; it is None when there is no
+    comparable previous snapshot (everything must be treated as changed).
+    """
+    _seq_counter = itertools.count()
+
+    def __init__(self, index, robot_pos, robot_orn, state_classes, state_values, state_support,
+                 changed_ids=None, base_seq=None):
+        self.seq = next(WorldSnapshot._seq_counter)
+        self.base_seq = base_seq
+        self.changed_ids = changed_ids
+        self.index = index
+        self.robot_pos = robot_pos
+        self.robot_orn = robot_orn
+        self.state_classes = list(state_classes)
+        self.state_columns = {state_cls: col for col, state_cls in enumerate(self.state_classes)}
+        self.state_values = state_values # (num_objects, num_states), NaN where the object lacks the state
+        self._state_support = state_support # {state_cls: ids of objects that have the state}
+        self._movable_positions = index.positions[index.movable_ids].copy()
+
+    @classmethod
+    def capture(cls, index, robot, state_classes, previous=None):
+        """Refreshes the index and reads robot pose and tracked object states in one pass."""
+        index.refresh()
+        try:
+            robot_pos, robot_orn = robot.get_position_orientation()
+            robot_pos = np.asarray(robot_pos, dtype=np.float64)[:3]
+            robot_orn = np.asarray(robot_orn, dtype=np.float64)[:4]
+        except Exception as e:
+            print(f"WARN: Could not get robot pose: {e}")
+            robot_pos, robot_orn = np.zeros(3), np.array([0.0, 0.0, 0.0, 1.0]) # Default if error
+
+        state_classes = list(state_classes)
+        comparable = previous is not None and previous.index is index and previous.state_classes == state_classes
+        if comparable:
+            state_support = previous._state_support # Which objects have which states never changes
+        else:
+            state_support = {
+                state_cls: np.array([i for i, obj in enumerate(index.objects) if cls._has_state(obj, state_cls)], dtype=np.int64)
+                for state_cls in state_classes
+            }
+
+        state_values = np.full((len(index), len(state_classes)), np.nan)
+        for col, state_cls in enumerate(state_classes):
+            for obj_id in state_support[state_cls]:
+                try:
+                    state_values[obj_id, col] = float(index.objects[obj_id].states[state_cls].get_value())
+                except Exception:
+                    pass # Leave as NaN; treated as unknown
+
+        changed_ids, base_seq = None, None
+        if comparable:
+            changed_ids, base_seq = cls._diff(index, state_values, previous), previous.seq
+        return cls(index, robot_pos, robot_orn, state_classes, state_values, state_support,
+                   changed_ids=changed_ids, base_seq=base_seq)
+
+    @staticmethod
+    def _diff(index, state_values, previous):
+        """Ids of objects whose tracked states differ from, or that moved since, previous."""
+        prev_values = previous.state_values
+        both_nan = np.isnan(state_values) & np.isnan(prev_values)
+        state_changed = np.flatnonzero(((state_values != prev_values) & ~both_nan).any(axis=1))
+        displacement = np.abs(index.positions[index.movable_ids] - previous._movable_positions)
+        moved = index.movable_ids[(displacement > MOVE_TOLERANCE).any(axis=1)]
+        return frozenset(state_changed.tolist()) | frozenset(moved.tolist())
+
+    @staticmethod
+    def _has_state(obj, state_cls):
+        try:
+            return state_cls in obj.states
+        except Exception:
+            return False
+
+    # --- Object lookup ---
+    @property
+    def objects(self):
+        return self.index.objects
+
+    def object_id(self, name):
+        return self.index.name_to_id.get(name)
+
+    def get_object(self, name):
+        obj_id = self.object_id(name)
+        return self.index.objects[obj_id] if obj_id is not None else None
+
+    def position(self, obj_id):
+        return self.index.positions[obj_id]
+
+    # --- States ---
+    def is_tracked(self, state_cls):
+        return state_cls in self.state_columns
+
+    def has_state(self, obj_id, state_cls):
+        col = self.state_columns.get(state_cls)
+        return col is not None and not np.isnan(self.state_values[obj_id, col])
+
+    def state_value(self, obj_id, state_cls):
+        """Returns the captured value of a tracked state, or None if unknown/untracked."""
+        col = self.state_columns.get(state_cls)
+        if col is None: return None
+        value = self.state_values[obj_id, col]
+        return None if np.isnan(value) else value
+
+    # --- Spatial queries ---
+    def nearby(self, radius):
+        """Returns (ids, distances) of objects closer than radius to the robot."""
+        return self.index.query_radius(self.robot_pos, radius)